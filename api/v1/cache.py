@@ -1,22 +1,120 @@
+import hashlib
 import json
 import logging
+import threading
+import time
+import uuid
 from datetime import datetime, timezone
 
 from django_redis import get_redis_connection
 
 logger = logging.getLogger(__name__)
 
+SORT_LATEST = "latest"
+SORT_TOP = "top"
+# Upper bound on one inline rebuild of the ranking index; the lock expires
+# after this if the rebuilding process dies.
+RESCORE_LOCK_TTL = 120
+
+# KEYS: lock key. ARGV: token. Deletes the lock only if `token` still holds it,
+# so a rebuild that outlived its TTL can't drop another caller's lock.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class IndexBuilding(Exception):
+    """The ranking index is being rebuilt by another request; serve from the DB."""
+
+# One-round-trip page read: member ids, total and object blobs together. Object
+# keys are derived from members, so this assumes a single (non-cluster) Redis.
+PAGE_SCRIPT = """
+local members = redis.call('ZREVRANGE', KEYS[1], ARGV[1], ARGV[2])
+local total = redis.call('ZCARD', KEYS[1])
+local blobs = {}
+for i, member in ipairs(members) do
+    blobs[i] = redis.call('GET', ARGV[3] .. string.match(member, ':(.*)$'))
+end
+return {total, members, blobs}
+"""
+
+
+def _parse_iso(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class RawScoreRanking:
+    """Ranks by the stored `score` as-is; never needs re-scoring."""
+
+    time_dependent = False
+    horizon_seconds = None
+
+    def __call__(self, data, now):
+        return float(data.get("score") or 0.0)
+
+
+class DecayedScoreRanking:
+    """
+    `score * 0.5 ** (age / half_life)`. Items older than `horizon_hours` drop out
+    of the index entirely, which keeps the periodic re-score bounded to the
+    recent window instead of the whole feed.
+    """
+
+    time_dependent = True
+
+    def __init__(self, half_life_hours=24.0, horizon_hours=None):
+        self.half_life_seconds = float(half_life_hours) * 3600
+        if horizon_hours is None:
+            horizon_hours = float(half_life_hours) * 7
+        self.horizon_seconds = float(horizon_hours) * 3600
+
+    def __call__(self, data, now):
+        ts = _parse_iso(data.get("timestamp"))
+        if ts is None:
+            return None
+        age = max(0.0, now - ts)
+        if age > self.horizon_seconds:
+            return None
+        return float(data.get("score") or 0.0) * 0.5 ** (age / self.half_life_seconds)
+
 
 class SortedSetCache:
 
-    def __init__(self, prefix, model, serialize_fn, ttl=60 * 60 * 24 * 7):
+    def __init__(self, prefix, model, serialize_fn, ttl=60 * 60 * 24 * 7, ranking=None,
+                 fields=None, projections=None):
         self.sorted_set_key = f"{prefix}:all"
         self.obj_key_prefix = f"{prefix}:obj:"
+        self.proj_key_prefix = f"{prefix}:proj:"
+        # Bumped on every write; feeds version-derived ETags.
+        self.version_key = f"{prefix}:version"
         self.member_prefix = prefix
         self.model = model
         self.serialize_fn = serialize_fn
         self.ttl = ttl
         self._populated = False  # avoids redundant ZCARD on every request
+        # gthread workers share this instance; one thread warms, the rest wait.
+        self._warm_lock = threading.Lock()
+        # Optional second index ordered by ranking(data, now) instead of timestamp.
+        # A ranking returning None keeps the item out of the index.
+        self.ranking = ranking
+        self.top_key = f"{prefix}:top"
+        self.rescored_at_key = f"{prefix}:top:rescored_at"
+        self.rescore_lock_key = f"{prefix}:top:rescore_lock"
+        # Every key serialize_fn emits (validates ?fields=), plus named subsets
+        # stored as separate compact blobs so hot projections skip the full object.
+        self.fields = tuple(fields or ())
+        self.projections = {name: tuple(f) for name, f in (projections or {}).items()}
 
     def _redis(self):
         return get_redis_connection("default")
@@ -28,6 +126,68 @@ class SortedSetCache:
     def _serialize(self, obj):
         return json.dumps(self.serialize_fn(obj))
 
+    def _proj_key(self, name, obj_id):
+        return f"{self.proj_key_prefix}{name}:{obj_id}"
+
+    @staticmethod
+    def project(data, fields):
+        return {f: data.get(f) for f in fields}
+
+    def _dump_projection(self, data, fields):
+        return json.dumps(self.project(data, fields), separators=(",", ":"), ensure_ascii=False)
+
+    def resolve_fields(self, raw):
+        """
+        Turn a ?fields= value (a projection name or a comma-separated list) into
+        a tuple of field names; None means the full object. Raises ValueError.
+        """
+        if raw is None or not str(raw).strip():
+            return None
+        raw = str(raw).strip()
+        if raw in self.projections:
+            return self.projections[raw]
+        if not self.fields:
+            raise ValueError("fields is not supported for this resource")
+        requested = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+        unknown = [f for f in requested if f not in self.fields]
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(unknown)}")
+        if not requested:
+            raise ValueError("fields must not be empty")
+        return requested
+
+    def _projection_for(self, fields):
+        """Name of the smallest stored projection covering `fields`, or None."""
+        wanted = set(fields)
+        best = None
+        for name, proj in self.projections.items():
+            if wanted <= set(proj) and (best is None or len(proj) < len(self.projections[best])):
+                best = name
+        return best
+
+    def _queue_add(self, pipe, obj, now):
+        data = self.serialize_fn(obj)
+        member = self._member_key(obj.id)
+        pipe.zadd(self.sorted_set_key, {member: self._score(obj)})
+        pipe.set(self._obj_key(obj.id), json.dumps(data), ex=self.ttl)
+        for name, proj in self.projections.items():
+            pipe.set(self._proj_key(name, obj.id), self._dump_projection(data, proj), ex=self.ttl)
+        if self.ranking is not None:
+            rank = self.ranking(data, now)
+            if rank is None:
+                pipe.zrem(self.top_key, member)
+            else:
+                pipe.zadd(self.top_key, {member: rank})
+
+    def _queue_remove(self, pipe, obj_id):
+        member = self._member_key(obj_id)
+        pipe.zrem(self.sorted_set_key, member)
+        if self.ranking is not None:
+            pipe.zrem(self.top_key, member)
+        pipe.delete(self._obj_key(obj_id))
+        for name in self.projections:
+            pipe.delete(self._proj_key(name, obj_id))
+
     def _deserialize(self, raw):
         if raw is None:
             return None
@@ -53,11 +213,11 @@ class SortedSetCache:
         r = self._redis()
         qs = self.model.objects.all().order_by("-timestamp")
         count = 0
+        now = time.time()
         pipe = r.pipeline()
 
         for obj in qs.iterator(chunk_size=500):
-            pipe.zadd(self.sorted_set_key, {self._member_key(obj.id): self._score(obj)})
-            pipe.set(self._obj_key(obj.id), self._serialize(obj), ex=self.ttl)
+            self._queue_add(pipe, obj, now)
             count += 1
 
             if count % 1000 == 0:
@@ -66,6 +226,9 @@ class SortedSetCache:
 
         if count % 1000 != 0:
             pipe.execute()
+        r.incr(self.version_key)
+        if self.ranking is not None:
+            r.set(self.rescored_at_key, now)
 
         logger.info("%s cache warmed: %d items", self.member_prefix, count)
         return count
@@ -76,20 +239,22 @@ class SortedSetCache:
     def ensure(self):
         if self._populated:
             return
-        if not self.is_populated():
-            logger.info("%s cache empty, warming from DB...", self.member_prefix)
-            self.warm()
-        self._populated = True
-
-    def _backfill(self, r, members, items):
+        with self._warm_lock:
+            if self._populated:
+                return
+            if not self.is_populated():
+                logger.info("%s cache empty, warming from DB...", self.member_prefix)
+                self.warm()
+            self._populated = True
+
+    def _load_full(self, r, ids):
+        found = {}
         missing_ids = []
-        raw_objects = r.mget([self._obj_key(self._extract_id(m)) for m in members])
-
-        for i, raw in enumerate(raw_objects):
+        for obj_id, raw in zip(ids, r.mget([self._obj_key(obj_id) for obj_id in ids])):
             if raw is not None:
-                items.append(self._deserialize(raw))
+                found[obj_id] = self._deserialize(raw)
             else:
-                missing_ids.append(int(self._extract_id(members[i])))
+                missing_ids.append(int(obj_id))
 
         if missing_ids:
             logger.warning("Backfilling %d missing %s objects from DB", len(missing_ids), self.member_prefix)
@@ -97,27 +262,77 @@ class SortedSetCache:
             for obj in self.model.objects.filter(id__in=missing_ids):
                 data = self._serialize(obj)
                 pipe.set(self._obj_key(obj.id), data, ex=self.ttl)
-                items.append(self._deserialize(data))
+                found[str(obj.id)] = self._deserialize(data)
             pipe.execute()
+        return found
+
+    def _backfill(self, r, members, items, fields=None):
+        ids = [self._extract_id(m) for m in members]
+        found = {}
+
+        name = self._projection_for(fields) if fields else None
+        if name is not None:
+            raw_projected = r.mget([self._proj_key(name, obj_id) for obj_id in ids])
+            for obj_id, raw in zip(ids, raw_projected):
+                if raw is not None:
+                    found[obj_id] = self._deserialize(raw)
+
+        pending = [obj_id for obj_id in ids if obj_id not in found]
+        if pending:
+            full = self._load_full(r, pending)
+            if name is not None and full:
+                # Projection blob expired or predates the projection: rebuild it.
+                pipe = r.pipeline()
+                for obj_id, data in full.items():
+                    pipe.set(self._proj_key(name, obj_id), self._dump_projection(data, self.projections[name]), ex=self.ttl)
+                pipe.execute()
+            found.update(full)
+
+        for obj_id in ids:
+            data = found.get(obj_id)
+            if data is not None:
+                items.append(self.project(data, fields) if fields else data)
+
+    def supports_sort(self, sort):
+        return sort == SORT_LATEST or (sort == SORT_TOP and self.ranking is not None)
+
+    def _index_key(self, r, sort):
+        if sort == SORT_LATEST:
+            return self.sorted_set_key
+        if not self.supports_sort(sort):
+            raise ValueError(f"unsupported sort: {sort}")
+        # First read after deploy/flush: the ranking index has never been built.
+        # One request rebuilds it; concurrent ones raise IndexBuilding meanwhile.
+        if not r.exists(self.rescored_at_key):
+            token = uuid.uuid4().hex
+            if not r.set(self.rescore_lock_key, token, nx=True, ex=RESCORE_LOCK_TTL):
+                raise IndexBuilding(self.top_key)
+            try:
+                self.rescore()
+            finally:
+                r.eval(RELEASE_LOCK_SCRIPT, 1, self.rescore_lock_key, token)
+        return self.top_key
 
-    def get_paginated(self, page=1, limit=10):
+    def get_paginated(self, page=1, limit=10, sort=SORT_LATEST, fields=None):
         self.ensure()
         r = self._redis()
+        key = self._index_key(r, sort)
         start = (page - 1) * limit
-        members = r.zrevrange(self.sorted_set_key, start, start + limit - 1)
-        total = r.zcard(self.sorted_set_key)
+        members = r.zrevrange(key, start, start + limit - 1)
+        total = r.zcard(key)
 
         # Guard: if Redis was wiped externally, re-warm automatically
-        if total == 0 and self._populated:
+        if total == 0 and self._populated and r.zcard(self.sorted_set_key) == 0:
             logger.warning("%s Redis appears wiped, re-warming...", self.member_prefix)
             self._populated = False
             self.ensure()
-            members = r.zrevrange(self.sorted_set_key, start, start + limit - 1)
-            total = r.zcard(self.sorted_set_key)
+            key = self._index_key(r, sort)
+            members = r.zrevrange(key, start, start + limit - 1)
+            total = r.zcard(key)
 
         items = []
         if members:
-            self._backfill(r, members, items)
+            self._backfill(r, members, items, fields)
 
         return {
             "items": items,
@@ -127,48 +342,151 @@ class SortedSetCache:
             "pages": self._calc_pages(total, limit),
         }
 
-    def get_all(self, max_items=10000):
+    def queue_page(self, pipe, page=1, limit=10):
+        """Queue a chronological page read on `pipe`; decode it with read_page()."""
+        start = (page - 1) * limit
+        pipe.eval(PAGE_SCRIPT, 1, self.sorted_set_key, start, start + limit - 1, self.obj_key_prefix)
+
+    def read_page(self, r, reply, page=1, limit=10):
+        total, members, blobs = reply
+        items = []
+        missing = []
+        for member, raw in zip(members, blobs):
+            if raw is None:
+                missing.append(member)
+            else:
+                items.append(self._deserialize(raw))
+        if missing:
+            # Rare (object TTL shorter than the sorted set entry); keep page order.
+            items = []
+            self._backfill(r, members, items)
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "pages": self._calc_pages(total, limit),
+        }
+
+    def get_all(self, max_items=10000, sort=SORT_LATEST, fields=None):
         self.ensure()
         r = self._redis()
-        members = r.zrevrange(self.sorted_set_key, 0, max_items - 1)
-        total = r.zcard(self.sorted_set_key)
+        key = self._index_key(r, sort)
+        members = r.zrevrange(key, 0, max_items - 1)
+        total = r.zcard(key)
 
         # Guard: if Redis was wiped externally, re-warm automatically
-        if total == 0 and self._populated:
+        if total == 0 and self._populated and r.zcard(self.sorted_set_key) == 0:
             logger.warning("%s Redis appears wiped, re-warming...", self.member_prefix)
             self._populated = False
             self.ensure()
-            members = r.zrevrange(self.sorted_set_key, 0, max_items - 1)
-            total = r.zcard(self.sorted_set_key)
+            key = self._index_key(r, sort)
+            members = r.zrevrange(key, 0, max_items - 1)
+            total = r.zcard(key)
 
         items = []
         if members:
-            self._backfill(r, members, items)
+            self._backfill(r, members, items, fields)
 
         return {"items": items, "total": total}
 
+    @staticmethod
+    def encode_cursor(score, skip):
+        return f"{score!r}:{int(skip)}"
+
+    @staticmethod
+    def decode_cursor(raw):
+        """Parse a continuation cursor into (score, skip). Raises ValueError."""
+        score_raw, sep, skip_raw = str(raw or "").rpartition(":")
+        if not sep:
+            raise ValueError("malformed cursor")
+        score = float(score_raw)
+        skip = int(skip_raw)
+        if skip < 0:
+            raise ValueError("malformed cursor")
+        return score, skip
+
+    def get_window(self, since=None, until=None, limit=10, cursor=None, fields=None):
+        """
+        Newest-first read of items scored between `since` and `until` (epoch
+        seconds, inclusive) via ZREVRANGEBYSCORE ... LIMIT.
+
+        The cursor is (score, skip): the score of the last item returned and how
+        many items sharing that exact score were already served, so timestamp
+        ties never get skipped or repeated across pages.
+        """
+        self.ensure()
+        r = self._redis()
+
+        max_score = "+inf" if until is None else until
+        min_score = "-inf" if since is None else since
+        skip = 0
+        if cursor is not None:
+            cursor_score, cursor_skip = cursor
+            if until is None or cursor_score <= until:
+                max_score = cursor_score
+                skip = cursor_skip
+
+        rows = r.zrevrangebyscore(
+            self.sorted_set_key, max_score, min_score,
+            start=skip, num=limit + 1, withscores=True,
+        )
+
+        # Guard: if Redis was wiped externally, re-warm automatically
+        if not rows and self._populated and r.zcard(self.sorted_set_key) == 0:
+            logger.warning("%s Redis appears wiped, re-warming...", self.member_prefix)
+            self._populated = False
+            self.ensure()
+            rows = r.zrevrangebyscore(
+                self.sorted_set_key, max_score, min_score,
+                start=skip, num=limit + 1, withscores=True,
+            )
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit and page:
+            last_score = page[-1][1]
+            same_score = sum(1 for _, score in page if score == last_score)
+            if max_score == last_score:
+                same_score += skip
+            next_cursor = self.encode_cursor(last_score, same_score)
+
+        items = []
+        if page:
+            self._backfill(r, [member for member, _ in page], items, fields)
+
+        return {
+            "items": items,
+            "count": len(items),
+            "limit": limit,
+            "since": since,
+            "until": until,
+            "next_cursor": next_cursor,
+        }
+
     def add(self, obj):
         r = self._redis()
         pipe = r.pipeline()
-        pipe.zadd(self.sorted_set_key, {self._member_key(obj.id): self._score(obj)})
-        pipe.set(self._obj_key(obj.id), self._serialize(obj), ex=self.ttl)
+        self._queue_add(pipe, obj, time.time())
+        pipe.incr(self.version_key)
         pipe.execute()
         logger.info("Added %s:%d to cache", self.member_prefix, obj.id)
 
     def add_many(self, objects):
         r = self._redis()
+        now = time.time()
         pipe = r.pipeline()
         for obj in objects:
-            pipe.zadd(self.sorted_set_key, {self._member_key(obj.id): self._score(obj)})
-            pipe.set(self._obj_key(obj.id), self._serialize(obj), ex=self.ttl)
+            self._queue_add(pipe, obj, now)
+        pipe.incr(self.version_key)
         pipe.execute()
         logger.info("Added %d %s items to cache", len(objects), self.member_prefix)
 
     def delete(self, obj_id):
         r = self._redis()
         pipe = r.pipeline()
-        pipe.zrem(self.sorted_set_key, self._member_key(obj_id))
-        pipe.delete(self._obj_key(obj_id))
+        self._queue_remove(pipe, obj_id)
+        pipe.incr(self.version_key)
         pipe.execute()
         logger.info("Deleted %s:%d from cache", self.member_prefix, obj_id)
 
@@ -176,8 +494,8 @@ class SortedSetCache:
         r = self._redis()
         pipe = r.pipeline()
         for obj_id in obj_ids:
-            pipe.zrem(self.sorted_set_key, self._member_key(obj_id))
-            pipe.delete(self._obj_key(obj_id))
+            self._queue_remove(pipe, obj_id)
+        pipe.incr(self.version_key)
         pipe.execute()
         logger.info("Deleted %d %s items from cache", len(obj_ids), self.member_prefix)
 
@@ -190,21 +508,84 @@ class SortedSetCache:
         members = r.zrange(self.sorted_set_key, 0, -1)
         pipe = r.pipeline()
         for m in members:
-            pipe.delete(self._obj_key(self._extract_id(m)))
+            obj_id = self._extract_id(m)
+            pipe.delete(self._obj_key(obj_id))
+            for name in self.projections:
+                pipe.delete(self._proj_key(name, obj_id))
         pipe.delete(self.sorted_set_key)
+        pipe.delete(self.top_key, self.rescored_at_key)
+        pipe.incr(self.version_key)
         pipe.execute()
         self._populated = False  # reset so ensure() re-checks after flush
         logger.info("Flushed %s cache", self.member_prefix)
 
+    def rescore(self, batch_size=500):
+        """
+        Recompute the ranking index in chunks of `batch_size`, pipelining one
+        ZADD batch per chunk. Time-dependent rankings only walk the horizon
+        window of the chronological index and drop everything that aged out.
+        Returns the number of items ranked.
+        """
+        if self.ranking is None:
+            return 0
+        r = self._redis()
+        now = time.time()
+        horizon = self.ranking.horizon_seconds
+        min_score = "-inf" if horizon is None else now - horizon
+
+        ranked = 0
+        offset = 0
+        while True:
+            members = r.zrevrangebyscore(
+                self.sorted_set_key, "+inf", min_score, start=offset, num=batch_size,
+            )
+            if not members:
+                break
+            items = []
+            self._backfill(r, members, items)
+            ranks = {}
+            for data in items:
+                rank = self.ranking(data, now)
+                if rank is not None:
+                    ranks[self._member_key(data["id"])] = rank
+            pipe = r.pipeline()
+            if ranks:
+                pipe.zadd(self.top_key, ranks)
+            stale = [m for m in members if m.decode("utf-8") not in ranks]
+            if stale:
+                pipe.zrem(self.top_key, *stale)
+            pipe.execute()
+            ranked += len(ranks)
+            offset += len(members)
+            if len(members) < batch_size:
+                break
+
+        if horizon is not None:
+            # Items that crossed the horizon since the previous pass.
+            previous = r.get(self.rescored_at_key)
+            lower = "-inf" if previous is None else float(previous) - horizon
+            aged_out = r.zrangebyscore(self.sorted_set_key, lower, f"({min_score}")
+            for i in range(0, len(aged_out), batch_size):
+                r.zrem(self.top_key, *aged_out[i:i + batch_size])
+
+        r.set(self.rescored_at_key, now)
+        logger.info("%s ranking rescored: %d items", self.member_prefix, ranked)
+        return ranked
+
     def stats(self):
         r = self._redis()
         total = r.zcard(self.sorted_set_key)
         mem = r.info("memory")
-        return {
+        result = {
             "total_items": total,
             "redis_used_memory": mem.get("used_memory_human", "unknown"),
             "redis_peak_memory": mem.get("used_memory_peak_human", "unknown"),
         }
+        if self.ranking is not None:
+            rescored_at = r.get(self.rescored_at_key)
+            result["ranked_items"] = r.zcard(self.top_key)
+            result["ranking_rescored_at"] = float(rescored_at) if rescored_at else None
+        return result
 
 
 class MetadataCache:
@@ -225,6 +606,12 @@ class MetadataCache:
             logger.info("Metadata cache MISS (%s)", self.KEY)
             return None
         logger.info("Metadata cache HIT (%s)", self.KEY)
+        return self.decode(raw)
+
+    def queue_get(self, pipe):
+        pipe.get(self.KEY)
+
+    def decode(self, raw):
         if isinstance(raw, bytes):
             raw = raw.decode("utf-8")
         return json.loads(raw)
@@ -264,6 +651,102 @@ class MetadataCache:
         }
 
 
+class BootstrapBundle:
+    """
+    Metadata plus the first page of each feed, read in one pipelined round
+    trip. The ETag comes from the feed version counters and a digest of the
+    cached metadata blob, so it is known without serializing the body.
+    """
+
+    def __init__(self, metadata_cache, metadata_loader, feeds):
+        self.metadata_cache = metadata_cache
+        self.metadata_loader = metadata_loader
+        self.feeds = feeds
+
+    def _redis(self):
+        return get_redis_connection("default")
+
+    def get(self, limit=10):
+        """Returns (payload, etag)."""
+        for cache in self.feeds.values():
+            cache.ensure()
+
+        r = self._redis()
+        pipe = r.pipeline()
+        self.metadata_cache.queue_get(pipe)
+        for cache in self.feeds.values():
+            cache.queue_page(pipe, page=1, limit=limit)
+            pipe.get(cache.version_key)
+        replies = pipe.execute()
+
+        raw_metadata = replies[0]
+        if raw_metadata is None:
+            logger.info("Bootstrap metadata MISS, rebuilding")
+            metadata = self.metadata_loader()
+            raw_metadata = json.dumps(metadata)
+        else:
+            metadata = self.metadata_cache.decode(raw_metadata)
+        if isinstance(raw_metadata, str):
+            raw_metadata = raw_metadata.encode("utf-8")
+
+        payload = {"metadata": metadata}
+        version_parts = [str(limit), hashlib.sha1(raw_metadata).hexdigest()]
+        for i, (name, cache) in enumerate(self.feeds.items()):
+            page_reply, version = replies[1 + 2 * i], replies[2 + 2 * i]
+            page = cache.read_page(r, page_reply, page=1, limit=limit)
+            if page["total"] == 0:
+                # Goes through get_paginated's wiped-Redis guard.
+                page = cache.get_paginated(page=1, limit=limit)
+            payload[name] = page
+            if isinstance(version, bytes):
+                version = version.decode("utf-8")
+            version_parts.append(f"{name}={version or 0}")
+
+        etag = 'W/"%s"' % hashlib.sha1("|".join(version_parts).encode("utf-8")).hexdigest()[:24]
+        return payload, etag
+
+
+class SearchResultCache:
+    """
+    Short-TTL cache of normalized search results. Writes to the model bump a
+    generation counter instead of scanning for keys; entries cached under an
+    older generation are never read again and simply expire.
+    """
+
+    def __init__(self, prefix, ttl=120):
+        self.generation_key = f"{prefix}:search:gen"
+        self.key_prefix = f"{prefix}:search:"
+        self.ttl = ttl
+
+    def _redis(self):
+        return get_redis_connection("default")
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(str(query or "").lower().split())
+
+    def _key(self, generation, query, page, limit):
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}{generation}:{digest}:{page}:{limit}"
+
+    def get(self, query, page, limit):
+        """Returns (generation, data); data is None on a miss."""
+        r = self._redis()
+        generation = int(r.get(self.generation_key) or 0)
+        raw = r.get(self._key(generation, query, page, limit))
+        if raw is None:
+            return generation, None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return generation, json.loads(raw)
+
+    def set(self, generation, query, page, limit, data):
+        self._redis().set(self._key(generation, query, page, limit), json.dumps(data), ex=self.ttl)
+
+    def invalidate(self):
+        self._redis().incr(self.generation_key)
+
+
 class WorkerTokenHandler:
     """
     Central token handler for Cloudflare Worker JWT tokens.
@@ -1,5 +1,9 @@
 import logging
 
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db.models import Q
+
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -7,13 +11,22 @@ from rest_framework.views import APIView
 from portal.models import (
     News, Videos, Categories, Topics, Divisions, Videopublishers, Sourcealias,
 )
-from .cache import SortedSetCache, MetadataCache
+from .cache import (
+    BootstrapBundle,
+    DecayedScoreRanking,
+    MetadataCache,
+    RawScoreRanking,
+    SearchResultCache,
+    SortedSetCache,
+)
 from .serializers import (
     NewsDetailSerializer, VideoDetailSerializer,
     CategorySerializer, TopicSerializer, DivisionSerializer, VideoPublisherSerializer,
     SourceAliasSerializer,
 )
 from .views import (
+    MAX_LIMIT,
+    _parse_int,
     CachedListView,
     CachedCreateView,
     CachedDeleteView,
@@ -25,6 +38,20 @@ from .views import (
 logger = logging.getLogger(__name__)
 
 
+NEWS_FIELDS = (
+    "id", "title", "summary", "source", "imageurl",
+    "timestamp", "score", "topic_id", "category_id", "division_id",
+)
+# Headline list screens never render the summary, which dominates payload size.
+NEWS_PROJECTIONS = {
+    "headline": tuple(f for f in NEWS_FIELDS if f != "summary"),
+}
+VIDEO_FIELDS = (
+    "id", "title", "videourl", "source", "publisher_id",
+    "timestamp", "score", "thumbnailurl",
+)
+
+
 def _news_serializer(obj):
     return {
         "id": obj.id,
@@ -53,9 +80,63 @@ def _video_serializer(obj):
     }
 
 
-news_cache = SortedSetCache(prefix="news", model=News, serialize_fn=_news_serializer)
-video_cache = SortedSetCache(prefix="video", model=Videos, serialize_fn=_video_serializer)
+def _ranking(half_life_hours):
+    if half_life_hours and half_life_hours > 0:
+        return DecayedScoreRanking(half_life_hours=half_life_hours)
+    return RawScoreRanking()
+
+
+news_cache = SortedSetCache(
+    prefix="news", model=News, serialize_fn=_news_serializer,
+    ranking=_ranking(settings.NEWS_TOP_HALF_LIFE_HOURS),
+    fields=NEWS_FIELDS, projections=NEWS_PROJECTIONS,
+)
+video_cache = SortedSetCache(
+    prefix="video", model=Videos, serialize_fn=_video_serializer,
+    ranking=_ranking(settings.VIDEO_TOP_HALF_LIFE_HOURS),
+    fields=VIDEO_FIELDS,
+)
 metadata_cache = MetadataCache()
+news_search_cache = SearchResultCache(prefix="news")
+
+SEARCH_MIN_LENGTH = 2
+SEARCH_MAX_LENGTH = 200
+
+
+def filter_news_search(queryset, query):
+    """
+    Full-text match on title + summary OR trigram word match on either field.
+    Both branches are served by the GIN indexes on `news`.
+    """
+    search_query = SearchQuery(query, config=News.SEARCH_CONFIG, search_type="websearch")
+    return queryset.annotate(
+        search=SearchVector("title", "summary", config=News.SEARCH_CONFIG),
+    ).filter(
+        Q(search=search_query)
+        | Q(title__trigram_word_similar=query)
+        | Q(summary__trigram_word_similar=query)
+    )
+
+
+def search_news(query, page=1, limit=20):
+    search_query = SearchQuery(query, config=News.SEARCH_CONFIG, search_type="websearch")
+    qs = filter_news_search(News.objects.all(), query).annotate(
+        rank=SearchRank(
+            SearchVector("title", "summary", config=News.SEARCH_CONFIG), search_query,
+        ) + TrigramWordSimilarity(query, "title"),
+    ).order_by("-rank", "-timestamp")
+
+    start = (page - 1) * limit
+    rows = list(qs[start:start + limit + 1])
+    items = [_news_serializer(obj) for obj in rows[:limit]]
+    return {
+        "items": items,
+        "count": len(items),
+        "query": query,
+        "page": page,
+        "limit": limit,
+        "has_more": len(rows) > limit,
+    }
 
 
 def build_metadata_payload():
@@ -90,12 +171,57 @@ def rebuild_metadata_cache():
     return data
 
 
+bootstrap_bundle = BootstrapBundle(
+    metadata_cache,
+    rebuild_metadata_cache,
+    feeds={"news": news_cache, "videos": video_cache},
+)
+
+
 class NewsListView(CachedListView):
     cache = news_cache
     serializer_class = NewsDetailSerializer
     model = News
 
 
+class NewsSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = news_search_cache.normalize(request.query_params.get("q"))
+        if len(query) < SEARCH_MIN_LENGTH:
+            return Response({"error": f"q must be at least {SEARCH_MIN_LENGTH} characters"}, status=400)
+        query = query[:SEARCH_MAX_LENGTH]
+        page = _parse_int(request.query_params.get("page"), default=1, min_val=1)
+        limit = _parse_int(request.query_params.get("limit"), default=20, min_val=1, max_val=MAX_LIMIT)
+
+        generation = None
+        try:
+            generation, cached = news_search_cache.get(query, page, limit)
+            if cached is not None:
+                return self._respond(cached)
+        except Exception:
+            logger.warning("News search Redis read failed, querying DB")
+
+        try:
+            data = search_news(query, page=page, limit=limit)
+        except Exception:
+            logger.exception("News search query failed")
+            return Response({"error": "Service unavailable"}, status=503)
+
+        if generation is not None:
+            try:
+                news_search_cache.set(generation, query, page, limit, data)
+            except Exception:
+                logger.warning("Failed to write news search results to Redis")
+        return self._respond(data)
+
+    def _respond(self, data):
+        response = Response(data)
+        response["Cache-Control"] = "s-maxage=60, stale-while-revalidate=30"
+        return response
+
+
 class NewsCreateView(CachedCreateView):
     cache = news_cache
     serializer_class = NewsDetailSerializer
@@ -180,3 +306,41 @@ class MetadataListView(APIView):
             return Response({"error": "Service unavailable"}, status=503)
 
 
+class BootstrapView(APIView):
+    """Metadata, the first news page and the first videos page in one call for app cold start."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        limit = _parse_int(request.query_params.get("limit"), default=10, min_val=1, max_val=MAX_LIMIT)
+        try:
+            data, etag = bootstrap_bundle.get(limit=limit)
+        except Exception:
+            logger.exception("Bootstrap Redis read failed, falling back to DB")
+            return self._from_db(limit)
+
+        if_none_match = request.headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]:
+            response = Response(status=304)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        response["Cache-Control"] = "s-maxage=1800, stale-while-revalidate=120"
+        return response
+
+    def _from_db(self, limit):
+        try:
+            data = {"metadata": build_metadata_payload()}
+            for name, model, cache in (("news", News, news_cache), ("videos", Videos, video_cache)):
+                total = model.objects.count()
+                rows = model.objects.order_by("-timestamp")[:limit]
+                data[name] = {
+                    "items": [cache.serialize_fn(obj) for obj in rows],
+                    "total": total,
+                    "page": 1,
+                    "limit": limit,
+                    "pages": (total + limit - 1) // limit,
+                }
+            return Response(data)
+        except Exception:
+            logger.exception("Bootstrap DB fallback failed")
+            return Response({"error": "Service unavailable"}, status=503)
@@ -2,6 +2,7 @@ from django.urls import path
 
 from .resources import (
     NewsListView,
+    NewsSearchView,
     NewsCreateView,
     NewsDeleteView,
     NewsCacheStatsView,
@@ -14,10 +15,12 @@ from .resources import (
     VideoCacheWarmView,
     VideoCacheFlushView,
     MetadataListView,
+    BootstrapView,
 )
 
 urlpatterns = [
     path("news/", NewsListView.as_view(), name="news_list"),
+    path("news/search/", NewsSearchView.as_view(), name="news_search"),
     path("news/create/", NewsCreateView.as_view(), name="news_create"),
     path("news/<int:pk>/delete/", NewsDeleteView.as_view(), name="news_delete"),
     path("news/delete/", NewsDeleteView.as_view(), name="news_delete_batch"),
@@ -34,4 +37,5 @@ urlpatterns = [
     path("videos/cache/flush/", VideoCacheFlushView.as_view(), name="video_cache_flush"),
 
     path("metadata/", MetadataListView.as_view(), name="metadata_list"),
+    path("bootstrap/", BootstrapView.as_view(), name="bootstrap"),
 ]
@@ -1,9 +1,15 @@
 import logging
+import math
+from datetime import datetime, timezone
 
+from django.db.models import CharField
+from django.db.models.functions import Cast, Collate
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .cache import SORT_LATEST, SORT_TOP, IndexBuilding, SortedSetCache
+
 logger = logging.getLogger(__name__)
 
 MAX_LIMIT = 100
@@ -22,6 +28,60 @@ def _parse_int(value, default=1, min_val=None, max_val=None):
     return result
 
 
+def _check_epoch(value, label):
+    """Reject nan/inf and epochs a datetime can't hold; both paths convert them."""
+    if not math.isfinite(value):
+        raise ValueError(f"invalid {label}: {value}")
+    try:
+        datetime.fromtimestamp(value, tz=timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        raise ValueError(f"{label} out of range: {value}")
+    return value
+
+
+def _parse_timestamp(value):
+    """Accept epoch seconds or an ISO-8601 datetime; returns epoch seconds or None."""
+    if value is None or str(value).strip() == "":
+        return None
+    raw = str(value).strip()
+    try:
+        epoch = float(raw)
+    except ValueError:
+        epoch = None
+    if epoch is not None:
+        return _check_epoch(epoch, "timestamp")
+    try:
+        parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"invalid timestamp: {raw}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _parse_window(params):
+    """Returns get_window kwargs when since/until/cursor is present, else None."""
+    if not any(params.get(key) for key in ("since", "until", "cursor")):
+        return None
+    since = _parse_timestamp(params.get("since"))
+    until = _parse_timestamp(params.get("until"))
+    if since is not None and until is not None and since > until:
+        raise ValueError("since must not be after until")
+    cursor = None
+    if params.get("cursor"):
+        cursor = SortedSetCache.decode_cursor(params.get("cursor"))
+        _check_epoch(cursor[0], "cursor")
+    limit = _parse_int(params.get("limit"), default=10, min_val=1, max_val=MAX_LIMIT)
+    return {"since": since, "until": until, "limit": limit, "cursor": cursor}
+
+
+def _parse_sort(params, cache):
+    sort = (params.get("sort") or SORT_LATEST).strip().lower()
+    if not cache.supports_sort(sort):
+        raise ValueError(f"unsupported sort: {sort}")
+    return sort
+
+
 class CachedListView(APIView):
     # Require DRF token auth for reads as well as writes.
     permission_classes = [IsAuthenticated]
@@ -31,13 +91,25 @@ class CachedListView(APIView):
 
     def get(self, request):
         try:
-            if request.query_params.get("all", "").lower() == "true":
-                result = self.cache.get_all(max_items=MAX_ALL)
+            window = _parse_window(request.query_params)
+            sort = _parse_sort(request.query_params, self.cache)
+            fields = self.cache.resolve_fields(request.query_params.get("fields"))
+            if window is not None and sort != SORT_LATEST:
+                raise ValueError("since/until/cursor only support sort=latest")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        try:
+            if window is not None:
+                result = self.cache.get_window(**window, fields=fields)
+                response = Response(result)
+            elif request.query_params.get("all", "").lower() == "true":
+                result = self.cache.get_all(max_items=MAX_ALL, sort=sort, fields=fields)
                 response = Response(result)
             else:
                 page = _parse_int(request.query_params.get("page"), default=1, min_val=1)
                 limit = _parse_int(request.query_params.get("limit"), default=10, min_val=1, max_val=MAX_LIMIT)
-                result = self.cache.get_paginated(page=page, limit=limit)
+                result = self.cache.get_paginated(page=page, limit=limit, sort=sort, fields=fields)
                 response = Response(result)
 
             # CDN cache directive: s-maxage=1800 tells CF to cache for 30 min.
@@ -47,17 +119,78 @@ class CachedListView(APIView):
             response["Cache-Control"] = "s-maxage=1800, stale-while-revalidate=120"
             return response
 
+        except IndexBuilding:
+            return self._fallback(request, sort, fields)
         except Exception:
             logger.exception("%s list failed, falling back to DB", self.model.__name__)
-            return self._fallback(request)
+            if window is not None:
+                return self._window_fallback(window, fields)
+            return self._fallback(request, sort, fields)
 
-    def _fallback(self, request):
+    def _serialize_rows(self, rows, fields):
+        if fields:
+            # Project from the cache's shape so ?fields= names match the cached response.
+            return [self.cache.project(self.cache.serialize_fn(obj), fields) for obj in rows]
+        return self.serializer_class(rows, many=True).data
+
+    def _window_fallback(self, window, fields=None):
+        try:
+            since, until, limit = window["since"], window["until"], window["limit"]
+            # Break timestamp ties the way ZREVRANGEBYSCORE does (members
+            # "prefix:<id>" in reverse byte order), so a cursor issued by either
+            # path continues correctly on the other.
+            member_order = Collate(Cast("id", CharField()), "C").desc()
+            qs = self.model.objects.order_by("-timestamp", member_order)
+            if since is not None:
+                qs = qs.filter(timestamp__gte=datetime.fromtimestamp(since, tz=timezone.utc))
+            if until is not None:
+                qs = qs.filter(timestamp__lte=datetime.fromtimestamp(until, tz=timezone.utc))
+
+            skip = 0
+            cursor = window["cursor"]
+            if cursor is not None and (until is None or cursor[0] <= until):
+                cursor_score, skip = cursor
+                qs = qs.filter(timestamp__lte=datetime.fromtimestamp(cursor_score, tz=timezone.utc))
+
+            rows = list(qs[skip:skip + limit + 1])
+            page = rows[:limit]
+            next_cursor = None
+            if len(rows) > limit and page:
+                last_ts = page[-1].timestamp
+                same_ts = sum(1 for obj in page if obj.timestamp == last_ts)
+                if skip and last_ts.timestamp() == cursor[0]:
+                    same_ts += skip
+                next_cursor = self.cache.encode_cursor(last_ts.timestamp(), same_ts)
+
+            data = self._serialize_rows(page, fields)
+            return Response({
+                "items": data,
+                "count": len(data),
+                "limit": limit,
+                "since": since,
+                "until": until,
+                "next_cursor": next_cursor,
+            })
+        except Exception:
+            logger.exception("DB fallback also failed")
+            return Response({"error": "Service unavailable"}, status=503)
+
+    def _fallback(self, request, sort=SORT_LATEST, fields=None):
         try:
             page = _parse_int(request.query_params.get("page"), default=1, min_val=1)
             limit = _parse_int(request.query_params.get("limit"), default=10, min_val=1, max_val=MAX_LIMIT)
             get_all = request.query_params.get("all", "").lower() == "true"
 
-            qs = self.model.objects.order_by("-timestamp")
+            if sort == SORT_TOP:
+                # Decay can't be expressed cheaply in SQL; approximate with raw
+                # score inside the ranking horizon.
+                qs = self.model.objects.order_by("-score", "-timestamp")
+                horizon = self.cache.ranking.horizon_seconds
+                if horizon is not None:
+                    cutoff = datetime.now(timezone.utc).timestamp() - horizon
+                    qs = qs.filter(timestamp__gte=datetime.fromtimestamp(cutoff, tz=timezone.utc))
+            else:
+                qs = self.model.objects.order_by("-timestamp")
             total = qs.count()
 
             if get_all:
@@ -66,7 +199,7 @@ class CachedListView(APIView):
                 start = (page - 1) * limit
                 qs = qs[start:start + limit]
 
-            data = self.serializer_class(qs, many=True).data
+            data = self._serialize_rows(qs, fields)
             return Response({
                 "items": data,
                 "total": total,
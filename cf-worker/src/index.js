@@ -3,6 +3,7 @@ const WORKER_SWR = 600;
 const CDN_CACHE_TTL = 1800-60;
 const METADATA_CDN_TTL = 1800-60;
 const NEWS_ALL_CDN_TTL = 86400-60;
+const NEWS_SEARCH_CDN_TTL = 60;
 // Dedicated Worker microcache name.
 const MICROCACHE_NAME = "worker-microcache";
 const TOKEN_EXPIRY = 7200;
@@ -10,6 +11,10 @@ const X_CACHE_WORKER = "0";
 const X_CACHE_CDN = "1";
 const X_CACHE_ORIGIN = "2";
 const LIVE_FEED_DEFAULT_ADMIN_HUB = "europe";
+const LIVE_FEED_MAX_PUBLISH_BATCH = 50;
+// How long a hub remembers broadcast (category, sequence) pairs; covers the
+// admin side's 1s/5s fanout retries with plenty of margin.
+const LIVE_FEED_BROADCAST_DEDUPE_MS = 10 * 60_000;
 const LIVE_FEED_HUBS = {
   apac: { name: "hub-v3-apac", locationHint: "apac" },
   europe: { name: "hub-v4-europe", locationHint: "weur" },
@@ -299,11 +304,42 @@ function getCDNTTL(url) {
   const pathNormalized = url.pathname.replace(/\/+$/, "");
   const isMetadata = pathNormalized === "/api/v1/metadata";
   const isNewsAll = pathNormalized === "/api/v1/news" && url.searchParams.get("all")?.toLowerCase() === "true";
+  const isNewsSearch = pathNormalized === "/api/v1/news/search";
   if (isMetadata) return METADATA_CDN_TTL;
   if (isNewsAll) return NEWS_ALL_CDN_TTL;
+  if (isNewsSearch) return NEWS_SEARCH_CDN_TTL;
   return CDN_CACHE_TTL;
 }
 
+// `?fields=id,title` and `?fields=title,id` are the same projection; rewrite to one
+// canonical form so the microcache and CF cache (both keyed on the full URL) share it.
+function canonicalizeFieldsParam(url) {
+  const raw = url.searchParams.get("fields");
+  if (raw === null) return;
+  const fields = [...new Set(raw.split(",").map((f) => f.trim()).filter(Boolean))].sort();
+  if (fields.length === 0) {
+    url.searchParams.delete("fields");
+  } else {
+    url.searchParams.set("fields", fields.join(","));
+  }
+  url.searchParams.sort();
+}
+
+// Cached entries are keyed without request headers, so conditional GETs are
+// answered here against the stored ETag.
+function notModified(request, response, env) {
+  const etag = response.headers.get("ETag");
+  const ifNoneMatch = request.headers.get("If-None-Match");
+  if (!etag || !ifNoneMatch) return null;
+  const tags = ifNoneMatch.split(",").map((t) => t.trim());
+  if (!tags.includes("*") && !tags.includes(etag)) return null;
+  const headers = new Headers({ ETag: etag });
+  const cacheControl = response.headers.get("Cache-Control");
+  if (cacheControl) headers.set("Cache-Control", cacheControl);
+  for (const [k, v] of Object.entries(getCORSHeaders(env))) headers.set(k, v);
+  return new Response(null, { status: 304, headers });
+}
+
 function isCDNHitStatus(status) {
   return ["HIT", "REVALIDATED", "UPDATING", "STALE"].includes((status || "").toUpperCase());
 }
@@ -367,6 +403,7 @@ const WARM_ENDPOINTS = [
   "/api/v1/videos/?page=1&limit=50",
   "/api/v1/videos/?page=2&limit=50",
   "/api/v1/metadata",
+  "/api/v1/bootstrap",
   "/api/v1/news/?all=true",
 ];
 
@@ -542,6 +579,56 @@ function validatePublishItemShape(item) {
   if (typeof item.title !== "string" || !item.title.trim()) return "item.title is required";
   return null;
 }
+
+function validateFanoutVersionsShape(versions) {
+  if (!isPlainObject(versions)) return "versions must be an object";
+  for (const [categoryId, version] of Object.entries(versions)) {
+    if (!parsePositiveInt(categoryId)) return "versions keys must be positive integer ids";
+    if (!Number.isSafeInteger(version) || version <= 0) return `versions.${categoryId} must be a positive integer`;
+  }
+  return null;
+}
+
+function validateFanoutDeltaShape(delta) {
+  if (!isPlainObject(delta)) return "delta must be a JSON object";
+
+  const entries = Object.entries(delta);
+  if (entries.length === 0) return "delta must contain at least one category id";
+
+  for (const [categoryId, entry] of entries) {
+    if (!parsePositiveInt(categoryId)) return "delta keys must be positive integer ids";
+    if (!isPlainObject(entry)) return `delta.${categoryId} must be an object`;
+    if (!Number.isSafeInteger(entry.base_version) || entry.base_version < 0) {
+      return `delta.${categoryId}.base_version must be a non-negative integer`;
+    }
+    if (!Number.isSafeInteger(entry.version) || entry.version <= entry.base_version) {
+      return `delta.${categoryId}.version must be greater than base_version`;
+    }
+    if (!parsePositiveInt(entry.limit)) return `delta.${categoryId}.limit must be a positive integer`;
+    if (!Array.isArray(entry.items) || entry.items.length === 0) {
+      return `delta.${categoryId}.items must be a non-empty array`;
+    }
+    for (const item of entry.items) {
+      if (!isPlainObject(item)) return `delta.${categoryId} items must be objects`;
+      if (!parsePositiveInt(item.seq_id)) return `delta.${categoryId} item.seq_id must be a positive integer`;
+      if (typeof item.title !== "string" || !item.title.trim()) return `delta.${categoryId} item.title is required`;
+    }
+  }
+  return null;
+}
+
+function validatePublishItemsShape(items) {
+  if (!Array.isArray(items) || items.length === 0) return "items must be a non-empty array";
+  if (items.length > LIVE_FEED_MAX_PUBLISH_BATCH) {
+    return `items must contain at most ${LIVE_FEED_MAX_PUBLISH_BATCH} entries`;
+  }
+  for (let i = 0; i < items.length; i++) {
+    const itemError = validatePublishItemShape(items[i]);
+    if (itemError) return `items[${i}]: ${itemError}`;
+  }
+  return null;
+}
+
 function getUserJWT(request) {
   const authHeader = request.headers.get("Authorization") || "";
   if (!authHeader.startsWith("Bearer ")) return "";
@@ -679,6 +766,27 @@ export class LiveFeedRegionalHubV3 {
           updated_at TEXT NOT NULL
         )
       `);
+      this.sql.exec(`
+        CREATE TABLE IF NOT EXISTS fanout_versions (
+          category_id TEXT PRIMARY KEY,
+          version INTEGER NOT NULL
+        )
+      `);
+      this.sql.exec(`
+        CREATE TABLE IF NOT EXISTS broadcast_seen (
+          category_id TEXT NOT NULL,
+          sequence_id INTEGER NOT NULL,
+          seen_at INTEGER NOT NULL,
+          PRIMARY KEY (category_id, sequence_id)
+        )
+      `);
+      this.sql.exec("CREATE INDEX IF NOT EXISTS broadcast_seen_at ON broadcast_seen (seen_at)");
+      this.sql.exec(`
+        CREATE TABLE IF NOT EXISTS admin_fence (
+          id INTEGER PRIMARY KEY CHECK (id = 1),
+          fence INTEGER NOT NULL
+        )
+      `);
       this.sql.exec(
         `INSERT INTO fanout_state (id, payload_json, updated_at)
          VALUES (1, ?, ?)
@@ -754,6 +862,175 @@ export class LiveFeedRegionalHubV3 {
     );
   }
 
+  // Ownership fencing: the admin side stamps writes with the token from its
+  // Redis lease. A token below the highest seen comes from a stale owner and
+  // is rejected; unstamped writes are accepted for older clients.
+  checkFence(fence) {
+    if (fence === undefined || fence === null) return { ok: true };
+    const value = Number(fence);
+    if (!Number.isSafeInteger(value) || value <= 0) return { ok: false, current: null };
+
+    const row = this.sql.exec("SELECT fence FROM admin_fence WHERE id = 1").toArray()[0];
+    const current = row ? Number(row.fence) : 0;
+    if (value < current) return { ok: false, current };
+    if (value > current) {
+      this.sql.exec(
+        `INSERT INTO admin_fence (id, fence) VALUES (1, ?)
+         ON CONFLICT(id) DO UPDATE SET fence = excluded.fence`,
+        value
+      );
+    }
+    return { ok: true };
+  }
+
+  readFanoutVersions() {
+    const versions = {};
+    for (const row of this.sql.exec("SELECT category_id, version FROM fanout_versions")) {
+      versions[row.category_id] = row.version;
+    }
+    return versions;
+  }
+
+  // replace=true drops versions for categories not listed (whole-state writes).
+  writeFanoutVersions(versions, replace = false) {
+    if (replace) this.sql.exec("DELETE FROM fanout_versions");
+    for (const [categoryId, version] of Object.entries(versions || {})) {
+      this.sql.exec(
+        `INSERT INTO fanout_versions (category_id, version)
+         VALUES (?, ?)
+         ON CONFLICT(category_id) DO UPDATE SET version = excluded.version`,
+        String(categoryId),
+        version
+      );
+    }
+  }
+
+  readFanoutCategories() {
+    const current = this.readFanout();
+    if (isPlainObject(current) && current.type === "snapshot" && isPlainObject(current.category)) {
+      return current;
+    }
+    return { type: "snapshot", category: {} };
+  }
+
+  // Replace only the categories present in the snapshot, recording their versions.
+  mergeFanout(snapshot, versions) {
+    const state = this.readFanoutCategories();
+    Object.assign(state.category, snapshot.category);
+    this.writeFanout(state);
+    this.writeFanoutVersions(versions);
+  }
+
+  // Append delta entries where the hub holds base_version; report the rest.
+  applyFanoutDelta(delta) {
+    const held = this.readFanoutVersions();
+    const state = this.readFanoutCategories();
+    const applied = {};
+    const versions = {};
+    const mismatched = [];
+
+    for (const [categoryId, entry] of Object.entries(delta)) {
+      if (held[categoryId] === entry.version) {
+        // Resent delta we already applied (publish retry): ack, don't resync.
+        versions[categoryId] = entry.version;
+        continue;
+      }
+      if (held[categoryId] !== entry.base_version) {
+        mismatched.push(categoryId);
+        versions[categoryId] = held[categoryId] ?? 0;
+        continue;
+      }
+
+      const rawExisting = state.category[categoryId];
+      const existing = Array.isArray(rawExisting) ? rawExisting : rawExisting ? [rawExisting] : [];
+      const incoming = new Set(entry.items.map((item) => Number(item.seq_id)));
+      const merged = existing
+        .filter((item) => !incoming.has(Number(item?.seq_id)))
+        .concat(entry.items)
+        .sort((a, b) => Number(a.seq_id) - Number(b.seq_id));
+      state.category[categoryId] = merged.slice(-parsePositiveInt(entry.limit));
+      applied[categoryId] = entry.version;
+      versions[categoryId] = entry.version;
+    }
+
+    if (Object.keys(applied).length > 0) {
+      this.writeFanout(state);
+      this.writeFanoutVersions(applied);
+    }
+    return { versions, mismatched };
+  }
+
+  // Shared by publish_item / publish_items. Returns { error } or ack fields.
+  applyPublishFanout(payload) {
+    const ack = { versions: {}, mismatched: [] };
+
+    if (Object.prototype.hasOwnProperty.call(payload, "snapshot")) {
+      const snapshotError = validateSnapshotShape(payload.snapshot);
+      if (snapshotError) return { error: snapshotError };
+
+      const hasVersions = Object.prototype.hasOwnProperty.call(payload, "versions");
+      if (hasVersions) {
+        const versionsError = validateFanoutVersionsShape(payload.versions);
+        if (versionsError) return { error: versionsError };
+      }
+
+      try {
+        if (hasVersions) {
+          this.mergeFanout(payload.snapshot, payload.versions);
+          Object.assign(ack.versions, payload.versions);
+        } else {
+          // Legacy full-state publish: versions no longer describe what we hold.
+          this.writeFanout(payload.snapshot);
+          this.writeFanoutVersions({}, true);
+        }
+      } catch {
+        return { error: "Failed to save snapshot" };
+      }
+    }
+
+    if (Object.prototype.hasOwnProperty.call(payload, "delta")) {
+      const deltaError = validateFanoutDeltaShape(payload.delta);
+      if (deltaError) return { error: deltaError };
+
+      try {
+        const result = this.applyFanoutDelta(payload.delta);
+        Object.assign(ack.versions, result.versions);
+        ack.mismatched = result.mismatched;
+      } catch {
+        return { error: "Failed to save snapshot" };
+      }
+    }
+
+    return ack;
+  }
+
+  // Drop items this hub already broadcast. Sequence ids come from per-instance
+  // blocks, so they are not ordered across publishers and a high-water mark
+  // would discard live items; remember recent pairs instead.
+  claimBroadcast(items) {
+    const now = Date.now();
+    this.sql.exec("DELETE FROM broadcast_seen WHERE seen_at < ?", now - LIVE_FEED_BROADCAST_DEDUPE_MS);
+    const fresh = [];
+    for (const item of items) {
+      const categoryId = String(item.category_id);
+      const sequenceId = Number(item.sequence_id);
+      const seen = this.sql.exec(
+        "SELECT 1 FROM broadcast_seen WHERE category_id = ? AND sequence_id = ?",
+        categoryId,
+        sequenceId
+      ).toArray();
+      if (seen.length > 0) continue;
+      this.sql.exec(
+        "INSERT INTO broadcast_seen (category_id, sequence_id, seen_at) VALUES (?, ?, ?)",
+        categoryId,
+        sequenceId,
+        now
+      );
+      fresh.push(item);
+    }
+    return fresh;
+  }
+
   sendConnected(socket) {
     const payload = {
       type: "connected",
@@ -768,12 +1045,17 @@ export class LiveFeedRegionalHubV3 {
     this.sendJSON(socket, payload);
   }
 
-  sendHubUsers(socket) {
-    this.sendJSON(socket, {
+  sendHubUsers(socket, requestId = "") {
+    const payload = {
       type: "hub_users",
       hub: this.hub,
       ...this.getCounts(),
-    });
+    };
+    // Echo the caller's correlation id so it can match the reply to its request.
+    if (typeof requestId === "string" && requestId && requestId.length <= 128) {
+      payload.request_id = requestId;
+    }
+    this.sendJSON(socket, payload);
   }
 
   broadcastPayload(payload) {
@@ -856,7 +1138,19 @@ export class LiveFeedRegionalHubV3 {
     const type = String(payload?.type || "").trim();
 
     if (type === "get_live_users") {
-      this.sendHubUsers(socket);
+      this.sendHubUsers(socket, payload.request_id);
+      return;
+    }
+
+    const fence = this.checkFence(payload.fence);
+    if (!fence.ok) {
+      this.sendJSON(socket, {
+        type: "error",
+        code: "stale_fence",
+        error: "Stale ownership fence; a newer admin owns this hub",
+        fence: payload.fence,
+        current: fence.current,
+      });
       return;
     }
 
@@ -872,15 +1166,52 @@ export class LiveFeedRegionalHubV3 {
         return;
       }
 
+      const versions = Object.prototype.hasOwnProperty.call(payload, "versions") ? payload.versions : {};
+      const versionsError = validateFanoutVersionsShape(versions);
+      if (versionsError) {
+        this.sendJSON(socket, { type: "error", error: versionsError });
+        return;
+      }
+
       try {
         this.writeFanout(payload.snapshot);
+        this.writeFanoutVersions(versions, true);
       } catch {
         this.sendJSON(socket, { type: "error", error: "Failed to save snapshot" });
         return;
       }
 
       this.broadcastPayload(payload.snapshot);
-      this.sendJSON(socket, { type: "set_broadcast_ack", hub: this.hub, ...this.getCounts() });
+      this.sendJSON(socket, { type: "set_broadcast_ack", hub: this.hub, versions, ...this.getCounts() });
+      return;
+    }
+
+    if (type === "sync_snapshot") {
+      // Resync after a delta version mismatch: store only, clients already have the items.
+      const snapshotError = validateSnapshotShape(payload.snapshot);
+      if (snapshotError) {
+        this.sendJSON(socket, { type: "error", error: snapshotError });
+        return;
+      }
+      const versionsError = validateFanoutVersionsShape(payload.versions);
+      if (versionsError) {
+        this.sendJSON(socket, { type: "error", error: versionsError });
+        return;
+      }
+
+      try {
+        this.mergeFanout(payload.snapshot, payload.versions);
+      } catch {
+        this.sendJSON(socket, { type: "error", error: "Failed to save snapshot" });
+        return;
+      }
+
+      this.sendJSON(socket, {
+        type: "sync_snapshot_ack",
+        hub: this.hub,
+        versions: payload.versions,
+        ...this.getCounts(),
+      });
       return;
     }
 
@@ -896,23 +1227,50 @@ export class LiveFeedRegionalHubV3 {
         return;
       }
 
-      if (Object.prototype.hasOwnProperty.call(payload, "snapshot")) {
-        const snapshotError = validateSnapshotShape(payload.snapshot);
-        if (snapshotError) {
-          this.sendJSON(socket, { type: "error", error: snapshotError });
-          return;
-        }
+      const fanout = this.applyPublishFanout(payload);
+      if (fanout.error) {
+        this.sendJSON(socket, { type: "error", error: fanout.error });
+        return;
+      }
 
-        try {
-          this.writeFanout(payload.snapshot);
-        } catch {
-          this.sendJSON(socket, { type: "error", error: "Failed to save snapshot" });
-          return;
-        }
+      const duplicates = this.claimBroadcast([payload.item]).length === 0 ? 1 : 0;
+      if (!duplicates) this.broadcastPayload(payload.item);
+      this.sendJSON(socket, {
+        type: "publish_item_ack",
+        hub: this.hub,
+        duplicates,
+        ...fanout,
+        ...this.getCounts(),
+      });
+      return;
+    }
+
+    if (type === "publish_items") {
+      const itemsError = validatePublishItemsShape(payload.items);
+      if (itemsError) {
+        this.sendJSON(socket, { type: "error", error: itemsError });
+        return;
+      }
+
+      const fanout = this.applyPublishFanout(payload);
+      if (fanout.error) {
+        this.sendJSON(socket, { type: "error", error: fanout.error });
+        return;
       }
 
-      this.broadcastPayload(payload.item);
-      this.sendJSON(socket, { type: "publish_item_ack", hub: this.hub, ...this.getCounts() });
+      // Clients only understand single "message" payloads, so unpack the batch.
+      const fresh = this.claimBroadcast(payload.items);
+      for (const item of fresh) {
+        this.broadcastPayload(item);
+      }
+      this.sendJSON(socket, {
+        type: "publish_items_ack",
+        hub: this.hub,
+        count: payload.items.length,
+        duplicates: payload.items.length - fresh.length,
+        ...fanout,
+        ...this.getCounts(),
+      });
       return;
     }
 
@@ -975,6 +1333,7 @@ export default {
       return corsJSON({ error: authResult.error }, 401, env);
     }
 
+    canonicalizeFieldsParam(url);
     const microcache = await caches.open(MICROCACHE_NAME);
     const cacheKey = new Request(url.toString(), { method: "GET" });
     let response = await microcache.match(cacheKey);
@@ -982,6 +1341,8 @@ export default {
     if (response) {
       _counts.WORKER++;
       maybeFlushAnalytics(env);
+      const unchanged = notModified(request, response, env);
+      if (unchanged) return unchanged;
       const r = new Response(response.body, response);
       r.headers.set("X-Cache", X_CACHE_WORKER);
       for (const [k, v] of Object.entries(getCORSHeaders(env))) r.headers.set(k, v);
@@ -1001,13 +1362,14 @@ export default {
     }
 
     const toClient = new Response(response.body, response);
-    toClient.headers.set("Cache-Control", `s-maxage=${WORKER_CACHE_TTL}, stale-while-revalidate=${WORKER_SWR}`);
+    const microTtl = Math.min(WORKER_CACHE_TTL, cdnTtl);
+    toClient.headers.set("Cache-Control", `s-maxage=${microTtl}, stale-while-revalidate=${Math.min(WORKER_SWR, microTtl)}`);
     toClient.headers.set("X-Cache", layer);
     for (const [k, v] of Object.entries(getCORSHeaders(env))) toClient.headers.set(k, v);
     ctx.waitUntil(
       microcache.put(cacheKey, toClient.clone()).then(() => maybeFlushAnalytics(env))
     );
-    return toClient;
+    return notModified(request, toClient, env) || toClient;
   },
   async scheduled(_event, env, ctx) {
     ctx.waitUntil(warmCache(env, "cron"));
@@ -20,4 +20,8 @@ app.conf.beat_schedule = {
         'task': 'portal.tasks.openai_poll_batch_jobs',
         'schedule': 60.0,
     },
+    'rescore-ranked-feeds': {
+        'task': 'portal.tasks.rescore_ranked_feeds',
+        'schedule': 300.0,
+    },
 }
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'corsheaders',
@@ -347,6 +348,12 @@ ORIGIN_PATH_SECRET = config('ORIGIN_PATH_SECRET', default='')
 WORKER_BASE_URL = config('WORKER_BASE_URL', default='https://glimpseapp.net')
 APP_SECRET = config('APP_SECRET', default='')
 LIVE_FEED_ADMIN_TOKEN = config('LIVE_FEED_ADMIN_TOKEN', default='')
+# Let web/Celery processes own hub sockets and pipeline runners. Turn off when
+# `manage.py run_live_feed_agent` runs as its own service; everything else then
+# routes hub commands to the agent through Redis.
+LIVE_FEED_IN_PROCESS_AGENTS = config('LIVE_FEED_IN_PROCESS_AGENTS', default=True, cast=bool)
+# Open dashboard event streams per web process; each holds a gunicorn thread.
+LIVE_FEED_EVENT_STREAMS = config('LIVE_FEED_EVENT_STREAMS', default=2, cast=int)
 
 # OpenAI API key (required for AI features)
 # Model settings are configured per-pipeline via the Pipeline Manager UI
@@ -381,6 +388,10 @@ if not REDIS_URL or REDIS_URL == 'none':
         }
     }
 
+# "sort=top" ranking: score decayed with this half-life (hours). 0 ranks by raw score.
+NEWS_TOP_HALF_LIFE_HOURS = config('NEWS_TOP_HALF_LIFE_HOURS', default=12.0, cast=float)
+VIDEO_TOP_HALF_LIFE_HOURS = config('VIDEO_TOP_HALF_LIFE_HOURS', default=24.0, cast=float)
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -14,7 +14,7 @@ from unfold.forms import AdminPasswordChangeForm, UserChangeForm, UserCreationFo
 from rest_framework.authtoken.admin import TokenAdmin as DRFTokenAdmin
 from rest_framework.authtoken.models import TokenProxy
 
-from api.v1.resources import news_cache, video_cache, metadata_cache, rebuild_metadata_cache
+from api.v1.resources import news_cache, video_cache, metadata_cache, rebuild_metadata_cache, filter_news_search
 from .models import (
     Categories,
     Divisions,
@@ -29,6 +29,7 @@ from .models import (
     Videopublishers,
     Videos,
 )
+from .live_feed.fanout import fanout_window
 from .openai.jobs import cancel_openai_job
 from .youtube import validate_youtube_shorts_url
 
@@ -377,6 +378,17 @@ class NewsAdmin(ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # ILIKE '%term%' can't use an index; route text through the same
+        # GIN-backed search as the API and match full URLs on source exactly.
+        # An unindexed OR on source would force a sequential scan again.
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.startswith(('http://', 'https://')):
+            return queryset.filter(source=term), False
+        return filter_news_search(queryset, term), False
+
 
 admin.site.register(News, NewsAdmin)
 
@@ -508,6 +520,15 @@ class LiveFeedPublishedItemAdmin(ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        fanout_window.invalidate(obj.category_id)
+
+    def delete_queryset(self, request, queryset):
+        category_ids = set(queryset.values_list('category_id', flat=True))
+        super().delete_queryset(request, queryset)
+        fanout_window.invalidate(*category_ids)
+
 
 admin.site.register(LiveFeedPublishedItem, LiveFeedPublishedItemAdmin)
 
@@ -19,6 +19,8 @@ class PortalConfig(AppConfig):
         disable_flag = os.environ.get('DISABLE_LIVE_FEED_PIPELINES', '').strip().lower()
         if disable_flag in {'1', 'true', 'yes', 'on'}:
             return False
+        if not getattr(settings, 'LIVE_FEED_IN_PROCESS_AGENTS', True):
+            return False
 
         blocked_commands = {
             'makemigrations',
@@ -27,6 +29,9 @@ class PortalConfig(AppConfig):
             'shell',
             'dbshell',
             'test',
+            # Starts the monitor itself, after switching to agent mode.
+            'run_live_feed_agent',
+            'benchmark_pipeline_http',
         }
         if len(sys.argv) > 1 and sys.argv[1] in blocked_commands:
             return False
@@ -44,7 +49,7 @@ class PortalConfig(AppConfig):
 
     def ready(self):
         from api.v1.signals import register_cache, register_invalidator
-        from api.v1.resources import news_cache, video_cache, rebuild_metadata_cache
+        from api.v1.resources import news_cache, video_cache, news_search_cache, rebuild_metadata_cache
         from .models import (
             News,
             Videos,
@@ -57,6 +62,7 @@ class PortalConfig(AppConfig):
 
         register_cache(News, news_cache)
         register_cache(Videos, video_cache)
+        register_invalidator(News, news_search_cache.invalidate)
 
         metadata_models = (
             Categories,
@@ -68,6 +74,13 @@ class PortalConfig(AppConfig):
         for model in metadata_models:
             register_invalidator(model, rebuild_metadata_cache)
 
+        from .live_feed.fanout import fanout_window
+        fanout_window.connect_signals()
+        from .live_feed.events import live_feed_events
+        live_feed_events.connect_signals()
+        from .live_feed.pipeline_config import pipeline_config_notifier
+        pipeline_config_notifier.connect_signals()
+
         # Ensure metadata Redis cache is synchronized from DB on every Django start.
         try:
             logger.info("Metadata startup sync: rebuilding cache from database")
@@ -0,0 +1,160 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FLUSH_INTERVAL_SECONDS = 5.0
+COUNTER_BUCKET_SECONDS = 60
+COUNTER_BUCKET_TTL_SECONDS = 2 * 60 * 60
+COUNTER_MAX_BUFFERED_EVENTS = 100_000
+
+
+class CounterAggregator:
+    """
+    In-process buffer for hot-path counters. `incr` only appends to a deque
+    (atomic under the GIL, no lock); a background thread drains it every
+    `interval` seconds and writes everything in one Redis pipeline:
+
+        {prefix}global              field -> total
+        {prefix}hub:{hub}           field -> total
+        {prefix}minute:{bucket}     field and "{hub}:{field}" -> count in that minute
+
+    Minute buckets are keyed by epoch minute and expire after `bucket_ttl`.
+    `on_flush(pipe, totals, minutes)` can queue more commands on the same
+    MULTI, so anything it writes lands atomically with the increments.
+    """
+
+    def __init__(self, redis_factory: Callable, prefix: str, totals_ttl: int,
+                 interval: float = COUNTER_FLUSH_INTERVAL_SECONDS,
+                 bucket_ttl: int = COUNTER_BUCKET_TTL_SECONDS,
+                 on_flush: Optional[Callable[[object, Counter, Dict[int, Counter]], None]] = None):
+        self._redis = redis_factory
+        self._on_flush = on_flush
+        self.prefix = prefix
+        self.totals_ttl = totals_ttl
+        self.interval = interval
+        self.bucket_ttl = bucket_ttl
+        self._events = deque()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        atexit.register(self.flush)
+
+    def global_key(self) -> str:
+        return f'{self.prefix}global'
+
+    def hub_key(self, hub: str) -> str:
+        return f'{self.prefix}hub:{hub}'
+
+    def bucket_key(self, minute: int) -> str:
+        return f'{self.prefix}minute:{minute}'
+
+    def incr(self, hub: str, field: str, amount: int = 1):
+        self._events.append((int(time.time()) // COUNTER_BUCKET_SECONDS, hub, field, int(amount)))
+        if self._thread is None or not self._thread.is_alive():
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='live-feed-counter-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def _drain(self) -> List[Tuple[int, str, str, int]]:
+        events = []
+        while True:
+            try:
+                events.append(self._events.popleft())
+            except IndexError:
+                return events
+
+    def pending(self) -> Counter:
+        """Global totals not yet flushed, per field."""
+        totals = Counter()
+        for _, _, field, amount in list(self._events):
+            totals[field] += amount
+        return totals
+
+    def flush(self) -> int:
+        """Write buffered increments to Redis. Returns the number of events flushed."""
+        with self._flush_lock:
+            events = self._drain()
+            if not events:
+                return 0
+
+            totals = Counter()
+            per_hub: Dict[str, Counter] = {}
+            buckets: Dict[int, Counter] = {}
+            minutes: Dict[int, Counter] = {}
+            for minute, hub, field, amount in events:
+                totals[field] += amount
+                per_hub.setdefault(hub, Counter())[field] += amount
+                minutes.setdefault(minute, Counter())[field] += amount
+                bucket = buckets.setdefault(minute, Counter())
+                bucket[field] += amount
+                bucket[f'{hub}:{field}'] += amount
+
+            try:
+                pipe = self._redis().pipeline(transaction=self._on_flush is not None)
+                self._queue_hincrby(pipe, self.global_key(), totals, self.totals_ttl)
+                for hub, counts in per_hub.items():
+                    self._queue_hincrby(pipe, self.hub_key(hub), counts, self.totals_ttl)
+                for minute, counts in buckets.items():
+                    self._queue_hincrby(pipe, self.bucket_key(minute), counts, self.bucket_ttl)
+                if self._on_flush is not None:
+                    self._on_flush(pipe, totals, minutes)
+                pipe.execute()
+            except Exception as e:
+                # Put the events back so the next flush retries them, unless
+                # Redis has been down long enough for the buffer to balloon.
+                if len(self._events) + len(events) <= COUNTER_MAX_BUFFERED_EVENTS:
+                    self._events.extendleft(reversed(events))
+                    logger.warning("Counter flush failed (%d events kept): %s", len(events), e)
+                else:
+                    logger.warning("Counter flush failed (%d events dropped): %s", len(events), e)
+                return 0
+            return len(events)
+
+    @staticmethod
+    def _queue_hincrby(pipe, key: str, counts: Counter, ttl: int):
+        for field, amount in counts.items():
+            if amount:
+                pipe.hincrby(key, field, amount)
+        pipe.expire(key, ttl)
+
+    def read_buckets(self, minutes: int, fields: Iterable[str]) -> List[dict]:
+        """Per-minute global counts for the last `minutes` minutes, oldest first."""
+        fields = tuple(fields)
+        current = int(time.time()) // COUNTER_BUCKET_SECONDS
+        window = list(range(current - minutes + 1, current + 1))
+        pipe = self._redis().pipeline(transaction=False)
+        for minute in window:
+            pipe.hmget(self.bucket_key(minute), fields)
+        replies = pipe.execute()
+
+        series = []
+        for minute, values in zip(window, replies):
+            row = {'minute': datetime.fromtimestamp(minute * COUNTER_BUCKET_SECONDS, tz=timezone.utc).isoformat()}
+            for field, value in zip(fields, values):
+                row[field] = int(value or 0)
+            series.append(row)
+        return series
+
+    def clear(self, hubs: Iterable[str]):
+        self._drain()
+        r = self._redis()
+        keys = [self.global_key()] + [self.hub_key(hub) for hub in hubs]
+        keys.extend(r.scan_iter(match=f'{self.prefix}minute:*', count=500))
+        r.delete(*keys)
@@ -0,0 +1,449 @@
+"""
+Single asyncio event loop that multiplexes every hub WebSocket.
+
+One daemon thread runs the loop. Each hub is a task with its own outbound
+queue, heartbeat and jittered reconnect; callers on other threads go through
+the thread-safe methods on `HubEngine`. Handler callbacks (Redis/ORM work,
+all blocking) run on a single dispatch thread so the loop never stalls and
+per-hub message order is preserved.
+
+`AsyncWebSocket` only moves bytes over asyncio streams and does the HTTP
+upgrade. Frame encoding, masking and frame validation are websocket-client's
+`ABNF`, the same library the pipelines use, which has no asyncio transport.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import random
+import ssl
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from websocket import ABNF, WebSocketProtocolException
+
+logger = logging.getLogger(__name__)
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+CONNECT_TIMEOUT_SECONDS = 15.0
+PING_INTERVAL_SECONDS = 30.0
+PING_TIMEOUT_SECONDS = 20.0
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+OUTBOUND_QUEUE_SIZE = 1000
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+FACADE_TIMEOUT_SECONDS = 5.0
+
+OP_CONTINUATION = ABNF.OPCODE_CONT
+OP_TEXT = ABNF.OPCODE_TEXT
+OP_BINARY = ABNF.OPCODE_BINARY
+OP_CLOSE = ABNF.OPCODE_CLOSE
+OP_PING = ABNF.OPCODE_PING
+OP_PONG = ABNF.OPCODE_PONG
+
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_INVALID_DATA = 1007
+CLOSE_TOO_LARGE = 1009
+
+
+class WebSocketClosed(Exception):
+    def __init__(self, code: Optional[int] = None, reason: str = ''):
+        super().__init__(f'WebSocket closed (code={code}) {reason}'.strip())
+        self.code = code
+        self.reason = reason
+
+
+class AsyncWebSocket:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._write_lock = asyncio.Lock()
+        self.last_seen = time.monotonic()
+
+    @classmethod
+    async def connect(cls, url: str, headers: Optional[dict] = None,
+                      timeout: float = CONNECT_TIMEOUT_SECONDS) -> 'AsyncWebSocket':
+        """Open the TCP/TLS connection and complete the upgrade, all within `timeout`."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('ws', 'wss') or not parts.hostname:
+            raise ValueError(f'Unsupported WebSocket URL: {url}')
+        secure = parts.scheme == 'wss'
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host,
+                port,
+                ssl=ssl.create_default_context() if secure else None,
+                server_hostname=host if secure else None,
+            ),
+            timeout,
+        )
+        try:
+            head, key = await asyncio.wait_for(cls._handshake(reader, writer, host, port, parts.port, path, headers),
+                                               timeout)
+            cls._check_handshake(head, key)
+        except BaseException:
+            writer.close()
+            raise
+        return cls(reader, writer)
+
+    @staticmethod
+    async def _handshake(reader, writer, host, port, explicit_port, path, headers):
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        lines = [
+            f'GET {path} HTTP/1.1',
+            f'Host: {host if explicit_port is None else f"{host}:{port}"}',
+            'Upgrade: websocket',
+            'Connection: Upgrade',
+            f'Sec-WebSocket-Key: {key}',
+            'Sec-WebSocket-Version: 13',
+        ]
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+        return await reader.readuntil(b'\r\n\r\n'), key
+
+    @staticmethod
+    def _check_handshake(head: bytes, key: str):
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        status = status_line.split(' ', 2)
+        response_headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(':')
+            if sep:
+                response_headers[name.strip().lower()] = value.strip()
+
+        expected_accept = base64.b64encode(
+            hashlib.sha1((key + WS_GUID).encode('ascii')).digest()
+        ).decode('ascii')
+        if len(status) < 2 or status[1] != '101':
+            raise ConnectionError(f'Handshake rejected: {status_line}')
+        if response_headers.get('sec-websocket-accept') != expected_accept:
+            raise ConnectionError('Handshake failed: bad Sec-WebSocket-Accept')
+
+    async def _send_frame(self, opcode: int, payload: bytes = b''):
+        # ABNF picks the length encoding and masks with a fresh key per frame.
+        data = ABNF.create_frame(payload, opcode).format()
+        async with self._write_lock:
+            self._writer.write(data)
+            await self._writer.drain()
+
+    async def send_text(self, text: str):
+        await self._send_frame(OP_TEXT, text.encode('utf-8'))
+
+    async def ping(self):
+        await self._send_frame(OP_PING)
+
+    async def _fail(self, code: int, reason: str):
+        """Close with `code` (RFC 6455 7.1.7) and raise."""
+        try:
+            await asyncio.wait_for(self._send_frame(OP_CLOSE, struct.pack('!H', code) + reason.encode('utf-8')), 2.0)
+        except Exception:
+            pass
+        raise WebSocketClosed(code, reason)
+
+    async def _read_frame(self) -> ABNF:
+        try:
+            first, second = await self._reader.readexactly(2)
+            length = second & 0x7F
+            if length == 126:
+                (length,) = struct.unpack('!H', await self._reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack('!Q', await self._reader.readexactly(8))
+            masked = bool(second & 0x80)
+            if length > MAX_MESSAGE_BYTES:
+                await self._fail(CLOSE_TOO_LARGE, 'message too large')
+            mask = await self._reader.readexactly(4) if masked else None
+            payload = await self._reader.readexactly(length) if length else b''
+        except asyncio.IncompleteReadError:
+            raise WebSocketClosed(None, 'connection dropped')
+        self.last_seen = time.monotonic()
+        if mask:
+            payload = ABNF.mask(mask, payload)
+        return ABNF(
+            fin=first >> 7 & 1, rsv1=first >> 6 & 1, rsv2=first >> 5 & 1, rsv3=first >> 4 & 1,
+            opcode=first & 0x0F, mask_value=0, data=payload,
+        )
+
+    async def recv(self):
+        """Next complete message: str for text, bytes for binary. Control frames are handled here."""
+        fragments = []
+        message_opcode = None
+        size = 0
+        while True:
+            frame = await self._read_frame()
+            opcode = frame.opcode
+            try:
+                frame.validate()
+            except WebSocketProtocolException as e:
+                await self._fail(CLOSE_PROTOCOL_ERROR, str(e))
+            if opcode >= OP_CLOSE and (not frame.fin or len(frame.data) > 125):
+                await self._fail(CLOSE_PROTOCOL_ERROR, 'invalid control frame')
+
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, frame.data)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                code = struct.unpack('!H', frame.data[:2])[0] if len(frame.data) >= 2 else None
+                try:
+                    await self._send_frame(OP_CLOSE, frame.data[:2])
+                except Exception:
+                    pass
+                raise WebSocketClosed(code, frame.data[2:].decode('utf-8', errors='replace'))
+
+            if opcode in (OP_TEXT, OP_BINARY):
+                if message_opcode is not None:
+                    await self._fail(CLOSE_PROTOCOL_ERROR, 'new message before previous one finished')
+                fragments = [frame.data]
+                message_opcode = opcode
+                size = len(frame.data)
+            elif message_opcode is None:
+                await self._fail(CLOSE_PROTOCOL_ERROR, 'continuation without a message')
+            else:
+                fragments.append(frame.data)
+                size += len(frame.data)
+            if size > MAX_MESSAGE_BYTES:
+                await self._fail(CLOSE_TOO_LARGE, 'message too large')
+
+            if frame.fin:
+                data = b''.join(fragments)
+                if message_opcode == OP_BINARY:
+                    return data
+                try:
+                    return data.decode('utf-8')
+                except UnicodeDecodeError:
+                    await self._fail(CLOSE_INVALID_DATA, 'invalid UTF-8 in text message')
+
+    async def close(self, code: int = 1000):
+        try:
+            await asyncio.wait_for(self._send_frame(OP_CLOSE, struct.pack('!H', code)), 2.0)
+        except Exception:
+            pass
+        self._writer.close()
+        try:
+            await asyncio.wait_for(self._writer.wait_closed(), 2.0)
+        except Exception:
+            pass
+
+
+class _HubSession:
+    def __init__(self, hub: str, url: str, headers: dict, handler):
+        self.hub = hub
+        self.url = url
+        self.headers = headers
+        self.handler = handler
+        self.outbound: asyncio.Queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self.inflight: Optional[str] = None
+        self.connected = threading.Event()
+        self.stopping = False
+        self.attempt = 0
+        self.ws: Optional[AsyncWebSocket] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class HubEngine:
+    """
+    Owns the event loop thread and one session per hub. Handlers implement
+    on_open(), on_message(text), on_error(error), on_close(code, was_connected)
+    and on_reconnect() -> bool (False stops the session).
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._sessions: Dict[str, _HubSession] = {}
+        self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='live-feed-dispatch')
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is not None and self._thread and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run, name='live-feed-hub-engine', daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread = loop, thread
+            return loop
+
+    def _call(self, coro, timeout: float = FACADE_TIMEOUT_SECONDS):
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=timeout)
+
+    # Thread-safe facade ---------------------------------------------------
+
+    def open(self, hub: str, url: str, headers: dict, handler) -> bool:
+        return self._call(self._open(hub, url, headers, handler))
+
+    def close(self, hub: str) -> bool:
+        try:
+            return self._call(self._close(hub))
+        except Exception:
+            logger.exception("Failed to close hub session %s", hub)
+            return False
+
+    def send(self, hub: str, text: str) -> bool:
+        try:
+            return self._call(self._enqueue(hub, text))
+        except Exception:
+            logger.exception("Failed to enqueue message for %s", hub)
+            return False
+
+    def is_connected(self, hub: str) -> bool:
+        session = self._sessions.get(hub)
+        return bool(session and session.connected.is_set())
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {hub: session.outbound.qsize() for hub, session in list(self._sessions.items())}
+
+    # Loop side ------------------------------------------------------------
+
+    def _dispatch(self, fn, *args):
+        def run():
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("Hub handler %s failed", getattr(fn, '__name__', fn))
+        return self._loop.run_in_executor(self._dispatcher, run)
+
+    async def _open(self, hub, url, headers, handler) -> bool:
+        session = self._sessions.get(hub)
+        if session and session.task and not session.task.done():
+            # Already running (possibly waiting out a backoff); it will reconnect.
+            return True
+        session = _HubSession(hub, url, headers, handler)
+        self._sessions[hub] = session
+        session.task = asyncio.create_task(self._run_session(session), name=f'live-feed-hub:{hub}')
+        return True
+
+    async def _close(self, hub) -> bool:
+        session = self._sessions.pop(hub, None)
+        if session is None:
+            return False
+        session.stopping = True
+        session.connected.clear()
+        if session.ws is not None:
+            await session.ws.close()
+        if session.task is not None:
+            session.task.cancel()
+            await asyncio.gather(session.task, return_exceptions=True)
+        return True
+
+    async def _enqueue(self, hub, text) -> bool:
+        session = self._sessions.get(hub)
+        if session is None or not session.connected.is_set():
+            return False
+        try:
+            session.outbound.put_nowait(text)
+        except asyncio.QueueFull:
+            logger.error("Outbound queue full for %s; dropping message", hub)
+            return False
+        return True
+
+    async def _run_session(self, session: _HubSession):
+        while not session.stopping:
+            was_connected = False
+            close_code = None
+            try:
+                session.ws = await AsyncWebSocket.connect(session.url, session.headers, CONNECT_TIMEOUT_SECONDS)
+                was_connected = True
+                session.attempt = 0
+                session.connected.set()
+                self._dispatch(session.handler.on_open)
+                await self._pump(session, session.ws)
+            except asyncio.CancelledError:
+                raise
+            except WebSocketClosed as e:
+                close_code = e.code
+            except Exception as e:
+                self._dispatch(session.handler.on_error, str(e) or e.__class__.__name__)
+            finally:
+                session.connected.clear()
+                if session.ws is not None and not session.stopping:
+                    await session.ws.close()
+                session.ws = None
+
+            if session.stopping:
+                break
+            self._dispatch(session.handler.on_close, close_code, was_connected)
+
+            delay = min(RECONNECT_BASE_DELAY * (2 ** session.attempt), RECONNECT_MAX_DELAY)
+            delay = random.uniform(delay / 2, delay)
+            session.attempt += 1
+            logger.info("Scheduling reconnect for %s in %.1fs", session.hub, delay)
+            await asyncio.sleep(delay)
+            if session.stopping:
+                break
+            proceed = await self._dispatch_result(session.handler.on_reconnect)
+            if not proceed:
+                break
+
+        if self._sessions.get(session.hub) is session and not session.stopping:
+            self._sessions.pop(session.hub, None)
+
+    async def _dispatch_result(self, fn):
+        try:
+            return await self._loop.run_in_executor(self._dispatcher, fn)
+        except Exception:
+            logger.exception("Hub handler %s failed", getattr(fn, '__name__', fn))
+            return False
+
+    async def _pump(self, session: _HubSession, ws: AsyncWebSocket):
+        tasks = [
+            asyncio.create_task(self._read_loop(session, ws)),
+            asyncio.create_task(self._write_loop(session, ws)),
+            asyncio.create_task(self._heartbeat_loop(ws)),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            task.result()
+
+    async def _read_loop(self, session: _HubSession, ws: AsyncWebSocket):
+        while True:
+            message = await ws.recv()
+            self._dispatch(session.handler.on_message, message)
+
+    async def _write_loop(self, session: _HubSession, ws: AsyncWebSocket):
+        while True:
+            # A frame that failed mid-send is retried first after reconnect.
+            if session.inflight is None:
+                session.inflight = await session.outbound.get()
+            await ws.send_text(session.inflight)
+            session.inflight = None
+
+    async def _heartbeat_loop(self, ws: AsyncWebSocket):
+        while True:
+            await asyncio.sleep(PING_INTERVAL_SECONDS)
+            sent_at = time.monotonic()
+            await ws.ping()
+            await asyncio.sleep(PING_TIMEOUT_SECONDS)
+            if ws.last_seen < sent_at:
+                raise WebSocketClosed(None, 'ping timeout')
+
+
+hub_engine = HubEngine()
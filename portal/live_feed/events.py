@@ -0,0 +1,212 @@
+import json
+import logging
+import random
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django_redis import get_redis_connection
+
+from .models import LiveFeedLog, LiveFeedPipelineLog
+
+logger = logging.getLogger(__name__)
+
+REDIS_EVENTS_STREAM = 'live_feed:events'
+EVENT_STREAM_MAXLEN = 5000
+EVENT_READ_COUNT = 200
+EVENT_HEARTBEAT_SECONDS = 15
+EVENT_CONNECTION_MAX_SECONDS = 120
+EVENT_RETRY_MS = 3000
+# Sent with `busy` when a process is already at its stream limit: come back
+# later, spread out so refused tabs don't all return together.
+EVENT_BUSY_RETRY_MS = 30_000
+
+
+class LiveFeedEventStream:
+    """
+    Dashboard event log on a capped Redis Stream. Writers XADD small JSON
+    events (hub state, log rows, feed items, snapshots, cost deltas); each
+    open dashboard tails the stream over SSE, using the entry id as the SSE
+    `id` so a reconnect resumes from `Last-Event-ID`.
+
+    A resume id older than the oldest retained entry gets a `reset` event,
+    telling the client to reload from the REST endpoints.
+
+    Every open stream holds a web thread and a Redis connection, so each
+    process serves at most `max_streams` at once (LIVE_FEED_EVENT_STREAMS,
+    default 2). Beyond that a client gets `busy` and a long `retry`, and the
+    dashboard falls back to a REST reload until it gets a slot.
+    """
+
+    def __init__(self, key: str = REDIS_EVENTS_STREAM, maxlen: int = EVENT_STREAM_MAXLEN,
+                 max_streams: Optional[int] = None):
+        self.key = key
+        self.maxlen = maxlen
+        if max_streams is None:
+            max_streams = getattr(settings, 'LIVE_FEED_EVENT_STREAMS', 2)
+        self.max_streams = max(1, int(max_streams))
+        self._slots = threading.BoundedSemaphore(self.max_streams)
+
+    def _redis(self):
+        return get_redis_connection("default")
+
+    @staticmethod
+    def _decode(value) -> str:
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='ignore')
+        return '' if value is None else str(value)
+
+    @staticmethod
+    def _parse_id(entry_id: str) -> Optional[Tuple[int, int]]:
+        ms, _, seq = str(entry_id or '').partition('-')
+        try:
+            return int(ms), int(seq or 0)
+        except ValueError:
+            return None
+
+    def emit(self, event: str, data, pipe=None):
+        """Append one event; queued on `pipe` if given, otherwise sent now and never raises."""
+        fields = {'event': event, 'data': json.dumps(data, separators=(',', ':'), default=str)}
+        if pipe is not None:
+            pipe.xadd(self.key, fields, maxlen=self.maxlen, approximate=True)
+            return
+        try:
+            self._redis().xadd(self.key, fields, maxlen=self.maxlen, approximate=True)
+        except Exception as e:
+            logger.debug("Live feed event %s not emitted: %s", event, e)
+
+    def latest_id(self, r=None) -> str:
+        """Id of the newest entry, or '0-0' if the stream is empty."""
+        return self.entry_id((r or self._redis()).xrevrange(self.key, count=1))
+
+    def entry_id(self, reply) -> str:
+        """Id from an `XREVRANGE key + - COUNT 1` reply (e.g. one queued on a pipeline)."""
+        return self._decode(reply[0][0]) if reply else '0-0'
+
+    def read(self, last_id: str, block_ms: int, count: int = EVENT_READ_COUNT) -> List[Tuple[str, str, str]]:
+        """Entries after `last_id` as (id, event, raw JSON data), waiting up to `block_ms`."""
+        reply = self._redis().xread({self.key: last_id}, count=count, block=block_ms)
+        entries = []
+        for _, stream_entries in reply or []:
+            for entry_id, fields in stream_entries:
+                decoded = {self._decode(k): self._decode(v) for k, v in fields.items()}
+                entries.append((self._decode(entry_id), decoded.get('event') or 'message', decoded.get('data') or '{}'))
+        return entries
+
+    def _resolve_start(self, last_event_id: str) -> Tuple[str, bool]:
+        """Where to start reading, and whether the client has missed trimmed events."""
+        r = self._redis()
+        resume = self._parse_id(last_event_id)
+        if resume is None:
+            return self.latest_id(r), False
+
+        oldest = r.xrange(self.key, count=1)
+        if not oldest:
+            return '0-0', resume != (0, 0)
+        oldest_id = self._parse_id(self._decode(oldest[0][0]))
+        return last_event_id, oldest_id is not None and resume < oldest_id
+
+    @staticmethod
+    def format(event: str, data: str, event_id: Optional[str] = None) -> str:
+        lines = []
+        if event_id:
+            lines.append(f'id: {event_id}')
+        lines.append(f'event: {event}')
+        lines.extend(f'data: {line}' for line in data.split('\n'))
+        return '\n'.join(lines) + '\n\n'
+
+    def sse(self, last_event_id: str = '',
+            max_seconds: float = EVENT_CONNECTION_MAX_SECONDS) -> Iterator[str]:
+        """
+        SSE body for one client. Ends after `max_seconds` (less up to a
+        quarter, so tabs opened together don't reconnect together) so a
+        worker thread is never held indefinitely; EventSource reconnects with
+        Last-Event-ID.
+        """
+        # Taken inside the generator: Django only closes (and so releases)
+        # generators that have started.
+        if not self._slots.acquire(blocking=False):
+            yield f'retry: {EVENT_BUSY_RETRY_MS + random.randint(0, EVENT_BUSY_RETRY_MS)}\n\n'
+            yield self.format('busy', json.dumps({'max_streams': self.max_streams}))
+            return
+        try:
+            yield from self._tail(last_event_id, max_seconds * random.uniform(0.75, 1.0))
+        finally:
+            self._slots.release()
+
+    def _tail(self, last_event_id: str, max_seconds: float) -> Iterator[str]:
+        yield f'retry: {EVENT_RETRY_MS}\n\n'
+        try:
+            cursor, missed = self._resolve_start(last_event_id)
+        except Exception as e:
+            logger.warning("Live feed event stream unavailable: %s", e)
+            yield self.format('unavailable', json.dumps({'error': str(e)}))
+            return
+
+        if missed:
+            yield self.format('reset', '{}', cursor)
+
+        deadline = time.monotonic() + max_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            block_ms = int(min(remaining, EVENT_HEARTBEAT_SECONDS) * 1000) or 1
+            try:
+                entries = self.read(cursor, block_ms)
+            except Exception as e:
+                logger.warning("Live feed event read failed: %s", e)
+                yield self.format('unavailable', json.dumps({'error': str(e)}))
+                return
+
+            if not entries:
+                yield ': keepalive\n\n'
+                continue
+            for entry_id, event, data in entries:
+                cursor = entry_id
+                yield self.format(event, data, entry_id)
+
+    def connect_signals(self):
+        """Push hub and pipeline log rows as they are written, whatever the call site."""
+        post_save.connect(self._on_log_saved, sender=LiveFeedLog, dispatch_uid='live_feed_events_log')
+        post_save.connect(self._on_pipeline_log_saved, sender=LiveFeedPipelineLog, dispatch_uid='live_feed_events_pipeline_log')
+
+    def _emit_on_commit(self, event: str, data: dict):
+        try:
+            transaction.on_commit(lambda: self.emit(event, data))
+        except Exception as e:
+            logger.debug("Live feed event %s not scheduled: %s", event, e)
+
+    def _on_log_saved(self, sender, instance, created, **kwargs):
+        if not created:
+            return
+        self._emit_on_commit('log', {
+            'id': instance.id,
+            'hub': instance.hub,
+            'event_type': instance.event_type,
+            'level': instance.level,
+            'level_display': instance.get_level_display(),
+            'message': instance.message,
+            'details': instance.details,
+            'created_at': instance.created_at.isoformat() if instance.created_at else None,
+        })
+
+    def _on_pipeline_log_saved(self, sender, instance, created, **kwargs):
+        if not created:
+            return
+        self._emit_on_commit('pipeline_log', {
+            'id': instance.id,
+            'pipeline_id': instance.pipeline_id,
+            'event_type': instance.event_type,
+            'level': instance.level,
+            'level_display': instance.get_level_display(),
+            'message': instance.message,
+            'details': instance.details or {},
+            'created_at': instance.created_at.isoformat() if instance.created_at else None,
+        })
+
+
+live_feed_events = LiveFeedEventStream()
@@ -0,0 +1,277 @@
+import json
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django_redis import get_redis_connection
+
+from portal.models import Categories
+from .models import LiveFeedPublishedItem
+
+logger = logging.getLogger(__name__)
+
+REDIS_FANOUT_PREFIX = 'live_feed:fanout:'
+REDIS_SEQUENCE_PREFIX = 'live_feed:seq:'
+FANOUT_WINDOW_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Append only when the window is warm; a cold window is rebuilt from the DB on
+# the next read, which already includes the new row. Returns {version, limit},
+# or {0, 0} when cold.
+APPEND_SCRIPT = """
+local limit = tonumber(redis.call('GET', KEYS[2]))
+if not limit then
+    return {0, 0}
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(limit + 1))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return {redis.call('INCR', KEYS[3]), limit}
+"""
+
+# Allocates the item's sequence id and appends it in the same round trip, so
+# ids are strictly increasing per category across processes and the window
+# order matches allocation order. The counter never falls behind the clock
+# (ms), keeping ids above the timestamp-based ids stored before the counter.
+# ARGV[2] is the fanout JSON without its leading '{"seq_id":N'; the member is
+# assembled here with the same compact layout `_dump` produces.
+# Returns {sequence_id, version, limit}; version and limit are 0 when cold.
+PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[4])
+local floor = tonumber(ARGV[1])
+if seq < floor then
+    redis.call('SET', KEYS[4], floor)
+    seq = floor
+end
+local limit = tonumber(redis.call('GET', KEYS[2]))
+if not limit then
+    return {seq, 0, 0}
+end
+redis.call('ZADD', KEYS[1], seq, '{"seq_id":' .. string.format('%d', seq) .. ARGV[2])
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(limit + 1))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return {seq, redis.call('INCR', KEYS[3]), limit}
+"""
+
+# A rebuild starts a new version epoch no lower than the current time in ms,
+# so versions never repeat even if the counter key is lost.
+BUMP_VERSION_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+local floor = tonumber(ARGV[1])
+if version < floor then
+    redis.call('SET', KEYS[1], floor)
+    version = floor
+end
+return version
+"""
+
+
+class FanoutWindow:
+    """
+    Per-category sorted set (score = sequence_id) of ready-to-send fanout
+    dicts, capped at the category's initial_fanout_limit. The `:limit` key
+    marks the window as warm and records the cap it was built with.
+
+    `:version` increases by one per append and jumps on every rebuild; hubs
+    use it to tell whether a publish delta applies to the window they hold.
+    It is never expired or invalidated.
+    """
+
+    def __init__(self, prefix: str = REDIS_FANOUT_PREFIX, ttl: int = FANOUT_WINDOW_TTL_SECONDS,
+                 sequence_prefix: str = REDIS_SEQUENCE_PREFIX):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.sequence_prefix = sequence_prefix
+        # Last clock-based id handed out per category while Redis is down.
+        self._fallback_ids: Dict[int, int] = {}
+        self._fallback_lock = threading.Lock()
+
+    def _redis(self):
+        return get_redis_connection("default")
+
+    def _items_key(self, category_id: int) -> str:
+        return f'{self.prefix}{int(category_id)}'
+
+    def _limit_key(self, category_id: int) -> str:
+        return f'{self.prefix}{int(category_id)}:limit'
+
+    def _version_key(self, category_id: int) -> str:
+        return f'{self.prefix}{int(category_id)}:version'
+
+    def _sequence_key(self, category_id: int) -> str:
+        return f'{self.sequence_prefix}{int(category_id)}'
+
+    @staticmethod
+    def _dump(fanout_item: dict) -> str:
+        return json.dumps(fanout_item, separators=(',', ':'), ensure_ascii=False)
+
+    def publish(self, category_id: int, fanout_item: dict) -> Tuple[int, int, int]:
+        """
+        Allocate the next sequence id for a new item and add it to the window
+        if warm. Sets `seq_id` on `fanout_item` and returns
+        (sequence_id, version, limit); version and limit are 0 when cold.
+        """
+        fields = {key: value for key, value in fanout_item.items() if key != 'seq_id'}
+        rest = self._dump(fields)[1:]
+        rest = ',' + rest if fields else rest
+        try:
+            sequence_id, version, limit = self._redis().eval(
+                PUBLISH_SCRIPT, 4,
+                self._items_key(category_id), self._limit_key(category_id),
+                self._version_key(category_id), self._sequence_key(category_id),
+                int(time.time() * 1000), rest, self.ttl,
+            )
+            sequence_id, version, limit = int(sequence_id), int(version), int(limit)
+        except Exception as e:
+            # Keep publishing on clock-based ids; unique within this process
+            # only until Redis is back. The spool re-appends once stored.
+            logger.warning("Sequence allocation failed for category=%s: %s", category_id, e)
+            sequence_id, version, limit = self._fallback_sequence(category_id), 0, 0
+        fanout_item['seq_id'] = sequence_id
+        return sequence_id, version, limit
+
+    def _fallback_sequence(self, category_id: int) -> int:
+        category_id = int(category_id)
+        with self._fallback_lock:
+            sequence_id = max(int(time.time() * 1000), self._fallback_ids.get(category_id, 0) + 1)
+            self._fallback_ids[category_id] = sequence_id
+            return sequence_id
+
+    def append(self, category_id: int, fanout_item: dict) -> Tuple[int, int]:
+        """
+        Add an item that already has its sequence id (a spooled row stored
+        after its window went cold) to a warm window. Returns the window's new
+        (version, limit), or (0, 0) if the window is cold.
+        """
+        try:
+            version, limit = self._redis().eval(
+                APPEND_SCRIPT, 3,
+                self._items_key(category_id), self._limit_key(category_id), self._version_key(category_id),
+                int(fanout_item['seq_id']), self._dump(fanout_item), self.ttl,
+            )
+            return int(version), int(limit)
+        except Exception as e:
+            logger.warning("Fanout window append failed for category=%s: %s", category_id, e)
+            return 0, 0
+
+    def read(self, category_ids: Iterable[int]) -> Dict[int, Tuple[int, List[dict]]]:
+        """
+        (version, items) for each category, items in ascending sequence_id,
+        read in one round trip. Cold windows are rebuilt from the DB.
+        """
+        category_ids = list(dict.fromkeys(int(cid) for cid in category_ids))
+        if not category_ids:
+            return {}
+
+        r = self._redis()
+        pipe = r.pipeline(transaction=False)
+        for category_id in category_ids:
+            pipe.get(self._limit_key(category_id))
+            pipe.get(self._version_key(category_id))
+            pipe.zrange(self._items_key(category_id), 0, -1)
+        replies = pipe.execute()
+
+        windows = {}
+        for index, category_id in enumerate(category_ids):
+            limit, version, members = replies[3 * index:3 * index + 3]
+            if limit is None or version is None:
+                windows[category_id] = self.rebuild(category_id, r=r)
+            else:
+                windows[category_id] = (int(version), [json.loads(member) for member in members])
+        return windows
+
+    def get_many(self, category_ids: Iterable[int]) -> Dict[int, List[dict]]:
+        """Fanout items per category; categories with no items are omitted."""
+        return {
+            category_id: items
+            for category_id, (_, items) in self.read(category_ids).items()
+            if items
+        }
+
+    def get(self, category_id: int, limit: Optional[int] = None) -> List[dict]:
+        """
+        Fanout items for one category. An explicit `limit` is a manual re-seed
+        with a custom size, so it reads the DB and leaves the window alone.
+        """
+        if limit is not None:
+            category = Categories.objects.filter(id=category_id).first()
+            if not category:
+                return []
+            return [
+                item.to_fanout_dict()
+                for item in LiveFeedPublishedItem.get_initial_fanout_items(category, limit=limit)
+            ]
+        return self.get_many([category_id]).get(int(category_id), [])
+
+    def rebuild(self, category_id: int, r=None) -> Tuple[int, List[dict]]:
+        """Reload the window from the DB (cold start or after invalidation)."""
+        category = Categories.objects.filter(id=category_id).first()
+        if not category:
+            self.invalidate(category_id)
+            return 0, []
+
+        limit = category.initial_fanout_limit
+        items = [
+            item.to_fanout_dict()
+            for item in LiveFeedPublishedItem.get_initial_fanout_items(category, limit=limit)
+        ]
+
+        r = r or self._redis()
+        items_key = self._items_key(category_id)
+        pipe = r.pipeline()
+        pipe.delete(items_key)
+        if items:
+            pipe.zadd(items_key, {self._dump(item): int(item['seq_id']) for item in items})
+            pipe.expire(items_key, self.ttl)
+        pipe.set(self._limit_key(category_id), limit, ex=self.ttl)
+        pipe.eval(BUMP_VERSION_SCRIPT, 1, self._version_key(category_id), int(time.time() * 1000))
+        version = pipe.execute()[-1]
+        return int(version), items
+
+    def invalidate(self, *category_ids: int):
+        keys = []
+        for category_id in category_ids:
+            keys.extend((self._items_key(category_id), self._limit_key(category_id)))
+        if not keys:
+            return
+        try:
+            self._redis().delete(*keys)
+        except Exception as e:
+            logger.warning("Fanout window invalidate failed for categories=%s: %s", category_ids, e)
+
+    def invalidate_all(self):
+        try:
+            r = self._redis()
+            keys = [
+                key for key in r.scan_iter(match=f'{self.prefix}*', count=500)
+                if not (key.decode() if isinstance(key, bytes) else key).endswith(':version')
+            ]
+            if keys:
+                r.delete(*keys)
+        except Exception as e:
+            logger.warning("Fanout window invalidate_all failed: %s", e)
+
+    def connect_signals(self):
+        """
+        Drop a category's window when its config (initial_fanout_limit) changes.
+        Published item deletes invalidate explicitly at the call sites, which
+        keeps LiveFeedPublishedItem bulk deletes on Django's fast-delete path.
+        """
+        post_save.connect(self._on_category_change, sender=Categories, dispatch_uid='live_feed_fanout_category_save')
+        post_delete.connect(self._on_category_change, sender=Categories, dispatch_uid='live_feed_fanout_category_delete')
+
+    def _on_category_change(self, sender, instance, **kwargs):
+        if not instance.live_feed_type or instance.live_feed_type <= 0:
+            return
+        category_id = instance.id
+        try:
+            transaction.on_commit(lambda: self.invalidate(category_id))
+        except Exception as e:
+            logger.warning("Fanout window invalidate not scheduled for category=%s: %s", category_id, e)
+
+
+fanout_window = FanoutWindow()
@@ -0,0 +1,74 @@
+import time
+from typing import Callable, Tuple
+
+# KEYS: lease key, fence key. ARGV: owner, ttl seconds, fence floor (ms).
+# Extends the lease if `owner` holds it, takes it if it is free, and returns
+# {fencing token, 1 if newly taken}; {0, 0} if someone else holds it. A new
+# holder always gets a larger token. The floor keeps tokens increasing even if
+# the fence key is lost (e.g. evicted under allkeys-lru).
+ACQUIRE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and current ~= ARGV[1] then
+    return {0, 0}
+end
+local token = tonumber(redis.call('GET', KEYS[2]))
+if current and token then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return {token, 0}
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+token = redis.call('INCR', KEYS[2])
+local floor = tonumber(ARGV[3])
+if token < floor then
+    redis.call('SET', KEYS[2], floor)
+    token = floor
+end
+return {token, current and 0 or 1}
+"""
+
+# KEYS: lease key. ARGV: owner. Deletes the lease only if `owner` holds it.
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+    """
+    Ownership leases with fencing tokens, one round trip per call. The lease
+    key holds the owner id (so plain GETs still tell who owns it); the
+    `:fence` key next to it holds the last token issued and never expires.
+
+    Holders attach their token to anything they send on the owner's behalf;
+    a receiver that remembers the highest token seen can drop a stale
+    owner's late writes.
+    """
+
+    def __init__(self, redis_factory: Callable, ttl: int):
+        self._redis = redis_factory
+        self.ttl = ttl
+
+    @staticmethod
+    def fence_key(key: str) -> str:
+        return f'{key}:fence'
+
+    def acquire(self, key: str, owner: str) -> Tuple[int, bool]:
+        """(token, newly_taken); token is 0 if another owner holds the lease."""
+        token, fresh = self._redis().eval(
+            ACQUIRE_SCRIPT, 2, key, self.fence_key(key),
+            owner, int(self.ttl), int(time.time() * 1000),
+        )
+        return int(token), bool(fresh)
+
+    def renew(self, key: str, owner: str) -> Tuple[int, bool]:
+        """
+        Same as acquire: extends our lease, or re-takes it under a new token if
+        it expired. A 0 token means the lease was lost to another owner.
+        """
+        return self.acquire(key, owner)
+
+    def release(self, key: str, owner: str) -> bool:
+        """Delete the lease if `owner` still holds it."""
+        return bool(self._redis().eval(RELEASE_SCRIPT, 1, key, owner))
@@ -4,16 +4,25 @@ import os
 import threading
 import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Dict, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+from functools import partial
 
-import websocket
 from dateutil.parser import parse as parse_datetime
 from django.conf import settings
 from django_redis import get_redis_connection
 
 from portal.models import Categories
+from .counters import CounterAggregator
+from .engine import hub_engine
+from .events import live_feed_events
+from .fanout import fanout_window
+from .lease import RedisLease
+from .replica import HubStateReplica
+from .spool import PublishSpool
+from .telemetry import TELEMETRY_COUNTERS, HubTelemetry
 from .models import LiveFeedLog, LiveFeedPublishedItem
 
 logger = logging.getLogger(__name__)
@@ -26,22 +35,60 @@ HUBS = {
 }
 
 INACTIVITY_TIMEOUT_SECONDS = 12 * 60 * 60
-RECONNECT_BASE_DELAY = 1.0
-RECONNECT_MAX_DELAY = 30.0
 
 REDIS_KEY_PREFIX = 'live_feed:hub:'
 REDIS_COSTS_PREFIX = 'live_feed:costs:'
 REDIS_OWNER_SUFFIX = ':owner'
+REDIS_FANOUT_VERSIONS_SUFFIX = ':fanout_versions'
 REDIS_COMMAND_PREFIX = 'live_feed:cmd:'
+REDIS_COMMAND_METRICS_KEY = 'live_feed:cmd:metrics'
+COMMAND_GROUP = 'hub-owners'
 REDIS_INSTANCE_HEARTBEAT_PREFIX = 'live_feed:inst:'
 REDIS_INSTANCE_HEARTBEAT_SUFFIX = ':heartbeat'
+REDIS_PUBLISH_METRICS_KEY = 'live_feed:publish:metrics'
+REDIS_AGENT_HANDOFF_KEY = 'live_feed:agent:handoff'
 
 OWNER_TTL_SECONDS = 180
 COMMAND_QUEUE_TTL_SECONDS = 600
+COMMAND_STREAM_MAXLEN = 1000
+COMMAND_BATCH_SIZE = 50
+COMMAND_BLOCK_MS = 1000
+# Routed commands older than this are acked without running (e.g. a stale
+# disconnect picked up by a new owner long after it was sent).
+COMMAND_MAX_AGE_SECONDS = 120
+COMMAND_RECLAIM_INTERVAL_SECONDS = 5
+COMMAND_RECLAIM_MIN_IDLE_MS = 5000
 SESSION_COSTS_TTL_SECONDS = 24 * 60 * 60
+COST_RATE_WINDOW_MINUTES = 5
+COST_SERIES_MINUTES = 30
 HUB_STATE_TTL_SECONDS = 15 * 60
 INSTANCE_HEARTBEAT_TTL_SECONDS = 60
 
+LIVE_USERS_REPLY_TIMEOUT_SECONDS = 1.5
+
+# Publishes to the same target within this window go out as one frame per hub.
+PUBLISH_COALESCE_WINDOW_SECONDS = 0.05
+PUBLISH_COALESCE_MAX_ITEMS = 50
+PUBLISH_RESULT_TIMEOUT_SECONDS = 15.0
+
+# Multi-hub sends run concurrently; the caller gets whatever finished within
+# the deadline. Failed hubs are retried in the background after each delay.
+FANOUT_DEADLINE_SECONDS = 3.0
+FANOUT_RETRY_DELAYS_SECONDS = (1.0, 5.0)
+
+# Hubs an agent had open when it drained; the next agent reconnects them.
+AGENT_HANDOFF_TTL_SECONDS = 10 * 60
+AGENT_DRAIN_TIMEOUT_SECONDS = 20.0
+
+
+def in_process_agents_enabled() -> bool:
+    """
+    Whether web/Celery processes may own hub sockets and pipeline runners.
+    When off, only `manage.py run_live_feed_agent` does; everyone else routes
+    through Redis.
+    """
+    return bool(getattr(settings, 'LIVE_FEED_IN_PROCESS_AGENTS', True))
+
 
 @dataclass
 class HubState:
@@ -65,17 +112,201 @@ class CostCounters:
     messages_received: int = 0
 
 
+@dataclass
+class PendingPublish:
+    item: dict
+    category_id: int
+    title: str
+    stored: bool
+    fanout: Optional[dict] = None
+    fanout_version: int = 0
+    fanout_limit: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+class PublishCoalescer:
+    """
+    Buffers publishes per target for a short window so a burst goes out as one
+    `publish_items` frame per hub with a single merged snapshot. One flusher
+    thread per process; callers wait on the returned future.
+    """
+
+    def __init__(self, manager: 'LiveFeedHubManager',
+                 window: float = PUBLISH_COALESCE_WINDOW_SECONDS,
+                 max_items: int = PUBLISH_COALESCE_MAX_ITEMS):
+        self.manager = manager
+        self.window = window
+        self.max_items = max_items
+        self._buffers: Dict[str, List[PendingPublish]] = {}
+        self._flushing = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, target: str, pending: PendingPublish) -> Future:
+        with self._cond:
+            self._buffers.setdefault(target, []).append(pending)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-feed-publish-flusher', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return pending.future
+
+    def pending_depths(self) -> Dict[str, int]:
+        with self._cond:
+            return {target: len(batch) for target, batch in self._buffers.items() if batch}
+
+    def drain(self, timeout: float) -> bool:
+        """Wait until everything submitted so far has been sent. False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._flushing and not any(self._buffers.values()),
+                timeout,
+            )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not any(self._buffers.values()):
+                    self._cond.wait()
+                oldest = min(batch[0].enqueued_at for batch in self._buffers.values() if batch)
+                deadline = oldest + self.window
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or any(len(batch) >= self.max_items for batch in self._buffers.values()):
+                        break
+                    self._cond.wait(remaining)
+                batches, self._buffers = self._buffers, {}
+                self._flushing = len(batches)
+
+            try:
+                for target, batch in batches.items():
+                    for start in range(0, len(batch), self.max_items):
+                        self._flush(target, batch[start:start + self.max_items])
+            finally:
+                with self._cond:
+                    self._flushing = 0
+                    self._cond.notify_all()
+
+    def _flush(self, target: str, batch: List[PendingPublish]):
+        try:
+            result = self.manager._send_publish_batch(target, batch)
+        except Exception as e:
+            logger.exception("Publish flush failed for %s", target)
+            result = {'success': False, 'error': str(e)}
+        latency_ms = (time.monotonic() - batch[0].enqueued_at) * 1000
+        self.manager._record_publish_flush(len(batch), latency_ms)
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+
+class HubFanout:
+    """
+    Runs one send per hub on a shared pool so a slow hub (reconnect wait,
+    routing enqueue) cannot hold up the others. `run` returns after every
+    send finished or the deadline passed, with `latency_ms` on each result;
+    sends still in flight keep going. Failures, including late ones, are
+    retried in the background when `retry` is set. A failed send may still
+    have reached the hub, so retried publishes rely on the hub dropping
+    (category_id, sequence_id) pairs it already broadcast.
+    """
+
+    def __init__(self, max_workers: int = len(HUBS) * 2,
+                 retry_delays: tuple = FANOUT_RETRY_DELAYS_SECONDS):
+        self.retry_delays = retry_delays
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='live-feed-fanout')
+
+    @staticmethod
+    def _timed(send) -> dict:
+        started = time.monotonic()
+        try:
+            result = dict(send())
+        except Exception as e:
+            logger.exception("Hub send failed")
+            result = {'success': False, 'error': str(e)}
+        result['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+        return result
+
+    def run(self, sends: Dict[str, Any], timeout: float = FANOUT_DEADLINE_SECONDS,
+            retry: bool = False) -> Dict[str, dict]:
+        started = time.monotonic()
+        futures = {hub: self._executor.submit(self._timed, send) for hub, send in sends.items()}
+        done, _ = wait(futures.values(), timeout=timeout)
+
+        results = {}
+        for hub, future in futures.items():
+            if future in done:
+                results[hub] = future.result()
+            else:
+                results[hub] = {
+                    'success': False,
+                    'timed_out': True,
+                    'error': f'No result within {timeout:g}s',
+                    'latency_ms': round((time.monotonic() - started) * 1000, 1),
+                }
+            if retry:
+                future.add_done_callback(partial(self._retry_if_failed, hub, sends[hub], 0))
+        return results
+
+    def _retry_if_failed(self, hub: str, send, attempt: int, future: Future):
+        result = future.result()
+        if result.get('success') or result.get('skipped'):
+            if attempt:
+                logger.info("Hub %s send succeeded on retry %d", hub, attempt)
+            return
+        if attempt >= len(self.retry_delays):
+            logger.warning("Hub %s send failed after %d retries: %s", hub, attempt, result.get('error'))
+            return
+
+        def resubmit():
+            retried = self._executor.submit(self._timed, send)
+            retried.add_done_callback(partial(self._retry_if_failed, hub, send, attempt + 1))
+
+        timer = threading.Timer(self.retry_delays[attempt], resubmit)
+        timer.daemon = True
+        timer.start()
+
+
+class ReplyWaiter:
+    """Tracks which hubs still owe a reply for one correlated request."""
+
+    def __init__(self, hubs):
+        self.pending = set(hubs)
+        self.answered: List[str] = []
+        self.event = threading.Event()
+        self._lock = threading.Lock()
+        if not self.pending:
+            self.event.set()
+
+    def resolve(self, hub: str):
+        with self._lock:
+            if hub in self.pending:
+                self.pending.discard(hub)
+                self.answered.append(hub)
+            if not self.pending:
+                self.event.set()
+
+    def drop(self, hub: str):
+        """Stop waiting on a hub the request never reached."""
+        with self._lock:
+            self.pending.discard(hub)
+            if not self.pending:
+                self.event.set()
+
+
 class HubConnection:
+    """
+    Per-hub state and message handling. The socket itself lives on the shared
+    `hub_engine` event loop; these callbacks run on its dispatch thread.
+    """
+
     def __init__(self, hub: str, manager: 'LiveFeedHubManager'):
         self.hub = hub
         self.manager = manager
-        self.ws = None
         self.state = HubState()
-        self._thread: Optional[threading.Thread] = None
-        self._stop_event = threading.Event()
-        self._reconnect_count = 0
         self._lock = threading.Lock()
-        self._reconnect_scheduled = False
+        self._stopped = True
 
     def _get_ws_url(self) -> str:
         worker_base = (getattr(settings, 'WORKER_BASE_URL', '') or '').rstrip('/')
@@ -92,152 +323,146 @@ class HubConnection:
         if self.state.connected or self.state.connecting:
             return False
 
+        auth_token = self._get_auth_token()
+        if not auth_token:
+            self.state.last_error = "LIVE_FEED_ADMIN_TOKEN not configured"
+            self.manager._release_hub_owner(self.hub)
+            self.manager._log_event(
+                self.hub, 'error', self.state.last_error,
+                level='error'
+            )
+            return False
+
+        headers = {
+            'Authorization': f'Token {auth_token}',
+            'X-Live-Feed-Hub': self.hub,
+        }
         self.state.connecting = True
-        self._reconnect_scheduled = False
-        self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run_connection, daemon=True)
-        self._thread.start()
-        return True
+        self._stopped = False
+        try:
+            return hub_engine.open(self.hub, self._get_ws_url(), headers, self)
+        except Exception as e:
+            logger.exception("Failed to start hub session for %s", self.hub)
+            self.state.connecting = False
+            self.state.last_error = str(e)
+            self.manager._release_hub_owner(self.hub)
+            return False
 
     def disconnect(self) -> bool:
-        self._stop_event.set()
-        if self.ws:
-            try:
-                self.ws.close()
-            except Exception:
-                pass
-        self._reconnect_scheduled = False
+        self._stopped = True
+        hub_engine.close(self.hub)
         self.state.connected = False
         self.state.connecting = False
         self.state.snapshot = None  # Clear snapshot to mimic user disconnect
-        self.manager._update_hub_redis(self.hub, self.state)
+        self.manager._update_hub_redis(self.hub, self.state, force=True)
         self.manager._release_hub_owner(self.hub)
         self.manager._log_event(
             self.hub, 'disconnect', 'Disconnected from hub'
         )
         return True
 
+    def abandon(self, current_fence=None):
+        """
+        The hub has seen a newer owner's fencing token, so this socket is a
+        stale owner's. Close it without touching shared state or the lease,
+        both of which now belong to the new owner.
+        """
+        self._stopped = True
+        hub_engine.close(self.hub)
+        with self._lock:
+            self.state.connected = False
+            self.state.connecting = False
+            self.state.snapshot = None
+        self.manager._hub_fences.pop(self.hub, None)
+        self.manager._log_event(
+            self.hub, 'disconnect',
+            'Closed stale connection: hub is fenced to a newer owner',
+            level='warning',
+            details={'fence': current_fence},
+        )
+
     def send(self, message: dict) -> bool:
-        if not self.state.connected or not self.ws:
+        if not self.state.connected:
             return False
-        try:
-            self.ws.send(json.dumps(message))
-            self.manager._increment_cost('messages_sent')
-            self._update_activity()
-            return True
-        except Exception as e:
-            logger.error("Failed to send to %s: %s", self.hub, e)
-            with self._lock:
-                self.state.connected = False
-                self.state.connecting = False
-                self.state.last_error = str(e)
-                self._reconnect_scheduled = False
-            try:
-                if self.ws:
-                    self.ws.close()
-            except Exception:
-                pass
-            self.manager._update_hub_redis(self.hub, self.state)
-            if not self._stop_event.is_set():
-                self._schedule_reconnect()
+        fence = self.manager._hub_fences.get(self.hub)
+        if fence:
+            message = {**message, 'fence': fence}
+        if not hub_engine.send(self.hub, json.dumps(message)):
             return False
+        self.manager._increment_cost('messages_sent', hub=self.hub)
+        self._update_activity()
+        return True
+
+    def _record_users(self):
+        self.manager.telemetry.gauge(self.hub, 'live_users', self.state.live_users)
+        self.manager.telemetry.gauge(self.hub, 'admin_users', self.state.admin_users)
 
     def _update_activity(self):
         self.state.last_activity = datetime.now(timezone.utc)
         self.manager.last_global_activity = self.state.last_activity
 
-    def _run_connection(self):
-        ws_url = self._get_ws_url()
-        auth_token = self._get_auth_token()
+    # hub_engine callbacks ---------------------------------------------------
 
-        if not auth_token:
+    def on_open(self):
+        with self._lock:
+            self.state.connected = True
             self.state.connecting = False
-            self.state.last_error = "LIVE_FEED_ADMIN_TOKEN not configured"
-            self.manager._release_hub_owner(self.hub)
-            self.manager._log_event(
-                self.hub, 'error', self.state.last_error,
-                level='error'
-            )
-            return
-
-        headers = {
-            'Authorization': f'Token {auth_token}',
-            'X-Live-Feed-Hub': self.hub,
-        }
+            self.state.connected_at = datetime.now(timezone.utc)
+            self.state.last_error = None
+        self._update_activity()
+        self.manager._increment_cost('connects', hub=self.hub)
+        self.manager._update_hub_redis(self.hub, self.state)
+        self.manager._refresh_hub_owner(self.hub)
+        logger.info("Connected to hub: %s", self.hub)
 
-        def on_open(ws):
-            with self._lock:
-                self.state.connected = True
-                self.state.connecting = False
-                self.state.connected_at = datetime.now(timezone.utc)
-                self.state.last_error = None
-                self._reconnect_count = 0
-                self._reconnect_scheduled = False
-            self._update_activity()
-            self.manager._increment_cost('connects')
-            self.manager._update_hub_redis(self.hub, self.state)
-            self.manager._refresh_hub_owner(self.hub)
-            logger.info("Connected to hub: %s", self.hub)
+    def on_message(self, message: str):
+        self._update_activity()
+        self.manager._increment_cost('messages_received', hub=self.hub)
+        try:
+            data = json.loads(message)
+            self._handle_message(data)
+        except json.JSONDecodeError:
+            logger.warning("Invalid JSON from %s: %s", self.hub, message[:100])
 
-        def on_message(ws, message):
-            self._update_activity()
-            self.manager._increment_cost('messages_received')
-            try:
-                data = json.loads(message)
-                self._handle_message(data)
-            except json.JSONDecodeError:
-                logger.warning("Invalid JSON from %s: %s", self.hub, message[:100])
-
-        def on_error(ws, error):
-            with self._lock:
-                self.state.last_error = str(error)
-            logger.error("WebSocket error on %s: %s", self.hub, error)
-
-        def on_close(ws, close_status_code, close_msg):
-            was_connected = self.state.connected
-            with self._lock:
-                self.state.connected = False
-                self.state.connecting = False
-            self.manager._update_hub_redis(self.hub, self.state)
+    def on_error(self, error: str):
+        with self._lock:
+            self.state.last_error = error
+        logger.error("WebSocket error on %s: %s", self.hub, error)
 
-            if was_connected:
-                # `code=None` usually means transport dropped without a clean
-                # WebSocket close frame (proxy/network blip). Avoid polluting
-                # activity logs with noisy reconnect events.
-                if close_status_code is None and not self._stop_event.is_set():
-                    logger.warning(
-                        "Connection to %s closed without close code; reconnecting",
-                        self.hub,
-                    )
-                else:
-                    self.manager._log_event(
-                        self.hub, 'disconnect',
-                        f'Connection closed (code={close_status_code})'
-                    )
+    def on_close(self, close_status_code: Optional[int], was_connected: bool):
+        with self._lock:
+            self.state.connected = False
+            self.state.connecting = False
+        self.manager._update_hub_redis(self.hub, self.state)
 
-            if not self._stop_event.is_set():
-                self._schedule_reconnect()
+        if was_connected:
+            # `code=None` usually means transport dropped without a clean
+            # WebSocket close frame (proxy/network blip). Avoid polluting
+            # activity logs with noisy reconnect events.
+            if close_status_code is None and not self._stopped:
+                logger.warning(
+                    "Connection to %s closed without close code; reconnecting",
+                    self.hub,
+                )
             else:
-                self.manager._release_hub_owner(self.hub)
+                self.manager._log_event(
+                    self.hub, 'disconnect',
+                    f'Connection closed (code={close_status_code})'
+                )
 
-        try:
-            self.ws = websocket.WebSocketApp(
-                ws_url,
-                header=headers,
-                on_open=on_open,
-                on_message=on_message,
-                on_error=on_error,
-                on_close=on_close,
-            )
-            self.ws.run_forever(ping_interval=30, ping_timeout=20)
-        except Exception as e:
-            logger.exception("WebSocket run failed for %s", self.hub)
-            self.state.connecting = False
-            self.state.last_error = str(e)
-            with self._lock:
-                self._reconnect_scheduled = False
+        if self._stopped:
             self.manager._release_hub_owner(self.hub)
 
+    def on_reconnect(self) -> bool:
+        if self._stopped:
+            return False
+        with self._lock:
+            if self.state.connected:
+                return False
+            self.state.connecting = True
+        self.manager._refresh_hub_owner(self.hub)
+        return True
+
     def _handle_message(self, data: dict):
         msg_type = data.get('type', '')
 
@@ -255,6 +480,7 @@ class HubConnection:
             self.state.snapshot = data.get('snapshot')
             self.state.live_users = data.get('live_users', 0)
             self.state.admin_users = data.get('admin_users', 0)
+            self._record_users()
             self.manager._update_hub_redis(self.hub, self.state)
             # Store initial fanout snapshot to Redis for API access
             if self.state.snapshot:
@@ -265,15 +491,25 @@ class HubConnection:
                 details={'live_users': self.state.live_users, 'admin_users': self.state.admin_users}
             )
 
-        elif msg_type in ('set_broadcast_ack', 'publish_item_ack'):
+        elif msg_type in ('set_broadcast_ack', 'publish_item_ack', 'publish_items_ack', 'sync_snapshot_ack'):
             self.state.live_users = data.get('live_users', self.state.live_users)
             self.state.admin_users = data.get('admin_users', self.state.admin_users)
+            self._record_users()
             self.manager._update_hub_redis(self.hub, self.state)
+            if data.get('duplicates'):
+                logger.info("Hub %s dropped %s already-broadcast item(s)", self.hub, data['duplicates'])
+            mismatched = data.get('mismatched') or []
+            if mismatched:
+                self.manager._handle_fanout_mismatch(self.hub, mismatched, data.get('versions') or {})
 
         elif msg_type == 'hub_users':
             self.state.live_users = data.get('live_users', 0)
             self.state.admin_users = data.get('admin_users', 0)
+            self._record_users()
             self.manager._update_hub_redis(self.hub, self.state)
+            request_id = data.get('request_id')
+            if request_id:
+                self.manager._complete_reply(self.hub, str(request_id), self.state)
 
         elif msg_type == 'snapshot':
             self.state.snapshot = data
@@ -287,36 +523,8 @@ class HubConnection:
                 self.hub, 'error', data.get('error', 'Unknown error'),
                 level='error'
             )
-
-    def _schedule_reconnect(self):
-        if self._stop_event.is_set():
-            return
-
-        delay = min(
-            RECONNECT_BASE_DELAY * (2 ** self._reconnect_count),
-            RECONNECT_MAX_DELAY
-        )
-        self._reconnect_count += 1
-
-        logger.info("Scheduling reconnect for %s in %.1fs", self.hub, delay)
-
-        def reconnect():
-            time.sleep(delay)
-            if not self._stop_event.is_set():
-                with self._lock:
-                    self._reconnect_scheduled = False
-                    if self.state.connected or self.state.connecting:
-                        return
-                    self.state.connecting = True
-                self.manager._refresh_hub_owner(self.hub)
-                self._run_connection()
-
-        with self._lock:
-            if self._reconnect_scheduled:
-                return
-            self._reconnect_scheduled = True
-
-        threading.Thread(target=reconnect, daemon=True).start()
+            if data.get('code') == 'stale_fence':
+                self.abandon(data.get('current'))
 
 
 class LiveFeedHubManager:
@@ -339,16 +547,40 @@ class LiveFeedHubManager:
         self.instance_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
         self.connections: Dict[str, HubConnection] = {}
         self.costs = CostCounters()
+        self.leases = RedisLease(self._redis, OWNER_TTL_SECONDS)
+        # Fencing token of each hub lease we hold; stamped on outbound frames.
+        self._hub_fences: Dict[str, int] = {}
+        self._written_hub_states: Dict[str, dict] = {}
+        self._hub_state_lock = threading.Lock()
+        self.replica = HubStateReplica(self._redis, self._load_hub_entries, on_reply=self._resolve_reply)
+        self._reply_waiters: Dict[str, ReplyWaiter] = {}
+        self._reply_lock = threading.Lock()
+        self._command_groups: set = set()
+        self.counters = CounterAggregator(
+            self._redis, REDIS_COSTS_PREFIX, SESSION_COSTS_TTL_SECONDS, on_flush=self._emit_cost_delta,
+        )
         self.last_global_activity: Optional[datetime] = None
         self._inactivity_thread: Optional[threading.Thread] = None
         self._stop_inactivity_check = threading.Event()
         self._command_thread: Optional[threading.Thread] = None
         self._stop_command_worker = threading.Event()
+        self.agent_mode = False
 
         for hub in HUBS:
             self.connections[hub] = HubConnection(hub, self)
+        self.publisher = PublishCoalescer(self)
+        self.fanout = HubFanout()
+        self.spool = PublishSpool(self._redis, consumer=self.instance_id)
+        self.telemetry = HubTelemetry(self._redis, sampler=self._sample_telemetry)
 
-        self._ensure_command_worker()
+        if self.owns_connections:
+            self._ensure_command_worker()
+            self.spool.start()
+
+    @property
+    def owns_connections(self) -> bool:
+        """False in client mode: this process never opens hub sockets itself."""
+        return self.agent_mode or in_process_agents_enabled()
 
     def _redis(self):
         return get_redis_connection("default")
@@ -377,8 +609,8 @@ class LiveFeedHubManager:
         return f"{REDIS_KEY_PREFIX}{hub}{REDIS_OWNER_SUFFIX}"
 
     @staticmethod
-    def _command_queue_key(instance_id: str) -> str:
-        return f"{REDIS_COMMAND_PREFIX}{instance_id}"
+    def _command_stream_key(hub: str) -> str:
+        return f"{REDIS_COMMAND_PREFIX}hub:{hub}"
 
     @staticmethod
     def _instance_heartbeat_key(instance_id: str) -> str:
@@ -399,29 +631,66 @@ class LiveFeedHubManager:
             'messages_received',
         )
 
-    def _increment_cost(self, field: str, amount: int = 1):
+    def _increment_cost(self, field: str, amount: int = 1, hub: str = 'all'):
+        # Buffered; CounterAggregator flushes to Redis every few seconds.
         if field in self._cost_fields():
             setattr(self.costs, field, getattr(self.costs, field) + amount)
-        try:
-            r = self._redis()
-            r.hincrby(self._costs_key(), field, int(amount))
-            r.expire(self._costs_key(), SESSION_COSTS_TTL_SECONDS)
-        except Exception:
-            pass
+            self.counters.incr(hub, field, amount)
+        if field in TELEMETRY_COUNTERS and hub in HUBS:
+            self.telemetry.incr(hub, field, amount)
+
+    def _sample_telemetry(self) -> Dict[str, Dict[str, int]]:
+        """User counts of the hubs this process holds open, polled every telemetry flush."""
+        return {
+            hub: {'live_users': conn.state.live_users, 'admin_users': conn.state.admin_users}
+            for hub, conn in self.connections.items()
+            if conn.state.connected
+        }
 
-    def _read_costs(self) -> dict:
+    def get_telemetry(self, resolution: str, hub: str = 'all', points: Optional[int] = None) -> dict:
+        hubs = list(HUBS) if hub == 'all' else [hub]
+        try:
+            series = self.telemetry.read(hubs, resolution, points)
+        except Exception as e:
+            logger.warning("Telemetry read failed: %s", e)
+            series = {hub_name: [] for hub_name in hubs}
+        return {'resolution': resolution, 'hubs': series}
+
+    def _emit_cost_delta(self, pipe, totals, minutes):
+        """Queue a `costs` dashboard event on the counter flush MULTI."""
+        fields = self._cost_fields()
+        live_feed_events.emit('costs', {
+            'delta': {field: totals[field] for field in fields if totals[field]},
+            'minutes': {
+                str(minute): {field: counts[field] for field in fields if counts[field]}
+                for minute, counts in minutes.items()
+            },
+        }, pipe=pipe)
+
+    def _read_costs(self) -> tuple:
+        """
+        Totals and the dashboard event id they are current as of. Buffered
+        counters are flushed first, and every flush adds its `costs` event in
+        the same MULTI, so a client applying only later events never double
+        counts.
+        """
+        self.counters.flush()
         key = self._costs_key()
         try:
-            raw = self._redis().hgetall(key)
+            pipe = self._redis().pipeline()
+            pipe.hgetall(key)
+            pipe.xrevrange(live_feed_events.key, count=1)
+            raw, latest = pipe.execute()
+            event_id = live_feed_events.entry_id(latest)
         except Exception:
-            raw = {}
+            raw, event_id = {}, None
 
         if raw:
             decoded = {
                 self._decode_redis_value(k): self._to_int(self._decode_redis_value(v), 0)
                 for k, v in raw.items()
             }
-            return {field: int(decoded.get(field, 0)) for field in self._cost_fields()}
+            return {field: int(decoded.get(field, 0)) for field in self._cost_fields()}, event_id
 
         return {
             'connects': self.costs.connects,
@@ -430,7 +699,7 @@ class LiveFeedHubManager:
             'broadcasts': self.costs.broadcasts,
             'messages_sent': self.costs.messages_sent,
             'messages_received': self.costs.messages_received,
-        }
+        }, event_id
 
     def _get_hub_owner(self, hub: str) -> Optional[str]:
         try:
@@ -441,47 +710,62 @@ class LiveFeedHubManager:
         return owner or None
 
     def _claim_hub_owner(self, hub: str) -> bool:
-        key = self._owner_key(hub)
         try:
-            r = self._redis()
-            current = self._decode_redis_value(r.get(key)).strip()
-            if current == self.instance_id:
-                r.expire(key, OWNER_TTL_SECONDS)
-                return True
-            return bool(r.set(key, self.instance_id, nx=True, ex=OWNER_TTL_SECONDS))
+            token, fresh = self.leases.acquire(self._owner_key(hub), self.instance_id)
         except Exception:
             return False
+        if not token:
+            return False
+        self._hub_fences[hub] = token
+        if fresh:
+            self.replica.publish(hub, owner=self.instance_id)
+        return True
 
     def _refresh_hub_owner(self, hub: str):
-        key = self._owner_key(hub)
         try:
-            r = self._redis()
-            current = self._decode_redis_value(r.get(key)).strip()
-            if current in ("", self.instance_id):
-                r.set(key, self.instance_id, ex=OWNER_TTL_SECONDS)
+            token, fresh = self.leases.renew(self._owner_key(hub), self.instance_id)
         except Exception:
-            pass
+            return
+        if not token:
+            # Lost to another instance. Keep the old fence on our frames so the
+            # hub rejects them rather than treating them as unfenced.
+            logger.warning("Hub %s lease lost to another instance", hub)
+            return
+        self._hub_fences[hub] = token
+        if fresh:
+            self.replica.publish(hub, owner=self.instance_id)
 
     def _release_hub_owner(self, hub: str):
-        key = self._owner_key(hub)
         try:
-            r = self._redis()
-            current = self._decode_redis_value(r.get(key)).strip()
-            if current == self.instance_id:
-                r.delete(key)
+            released = self.leases.release(self._owner_key(hub), self.instance_id)
         except Exception:
-            pass
+            return
+        self._hub_fences.pop(hub, None)
+        if released:
+            self.replica.publish(hub, owner='')
 
     def _enqueue_command(self, target_instance: str, command: dict) -> bool:
+        """
+        Append a command to the hub's stream. Whichever instance owns the hub
+        when it is read consumes it, so an ownership change mid-flight does
+        not strand the command with the old owner.
+        """
         target = str(target_instance or '').strip()
-        if not target:
+        hub = command.get('hub')
+        if not target or hub not in HUBS:
             return False
-        queue = self._command_queue_key(target)
-        payload = json.dumps(command)
+        stream = self._command_stream_key(hub)
+        fields = {
+            'payload': json.dumps(command),
+            'target': target,
+            'sender': self.instance_id,
+            'enqueued_at': str(int(time.time() * 1000)),
+        }
         try:
-            r = self._redis()
-            r.lpush(queue, payload)
-            r.expire(queue, COMMAND_QUEUE_TTL_SECONDS)
+            pipe = self._redis().pipeline()
+            pipe.xadd(stream, fields, maxlen=COMMAND_STREAM_MAXLEN, approximate=True)
+            pipe.expire(stream, COMMAND_QUEUE_TTL_SECONDS)
+            pipe.execute()
             return True
         except Exception:
             return False
@@ -508,12 +792,9 @@ class LiveFeedHubManager:
     def _clear_stale_owner(self, hub: str, expected_owner: str):
         if not expected_owner:
             return
-        key = self._owner_key(hub)
         try:
-            r = self._redis()
-            current = self._decode_redis_value(r.get(key)).strip()
-            if current == expected_owner:
-                r.delete(key)
+            if self.leases.release(self._owner_key(hub), expected_owner):
+                self.replica.publish(hub, owner='')
         except Exception:
             pass
 
@@ -529,78 +810,237 @@ class LiveFeedHubManager:
         )
         self._command_thread.start()
 
+    def _owned_hubs(self) -> List[str]:
+        if self.agent_mode:
+            # The agent serves every hub, including ones nobody has claimed yet.
+            return list(HUBS)
+        entries = self.replica.get()
+        return [
+            hub for hub, conn in self.connections.items()
+            if conn.state.connected or conn.state.connecting
+            or (entries.get(hub) or {}).get('owner') == self.instance_id
+        ]
+
+    def _ensure_command_group(self, r, stream: str):
+        if stream in self._command_groups:
+            return
+        try:
+            # id=0: commands queued before the group existed are still delivered.
+            r.xgroup_create(stream, COMMAND_GROUP, id='0', mkstream=True)
+        except Exception as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._command_groups.add(stream)
+
     def _run_command_worker(self):
-        queue = self._command_queue_key(self.instance_id)
+        last_reclaim = 0.0
         while not self._stop_command_worker.is_set():
             self._refresh_instance_heartbeat()
-            try:
-                item = self._redis().brpop(queue, timeout=1)
-            except Exception:
-                time.sleep(1)
+            owned = self._owned_hubs()
+            if not owned:
+                self._stop_command_worker.wait(1)
                 continue
 
-            if not item:
+            streams = {self._command_stream_key(hub): '>' for hub in owned}
+            try:
+                r = self._redis()
+                for stream in streams:
+                    self._ensure_command_group(r, stream)
+
+                if time.monotonic() - last_reclaim >= COMMAND_RECLAIM_INTERVAL_SECONDS:
+                    last_reclaim = time.monotonic()
+                    for stream in streams:
+                        self._reclaim_commands(r, stream)
+
+                reply = r.xreadgroup(
+                    COMMAND_GROUP, self.instance_id, streams,
+                    count=COMMAND_BATCH_SIZE, block=COMMAND_BLOCK_MS,
+                )
+            except Exception as e:
+                if 'NOGROUP' in str(e):
+                    # Stream expired and took its group with it; recreate next pass.
+                    self._command_groups.clear()
+                else:
+                    time.sleep(1)
                 continue
 
+            for stream, entries in reply or []:
+                self._process_command_entries(r, self._decode_redis_value(stream), entries)
+
+    def _reclaim_commands(self, r, stream: str):
+        """Take over pending commands left by consumers whose heartbeat has expired."""
+        try:
+            summary = r.xpending(stream, COMMAND_GROUP)
+        except Exception:
+            return
+        dead = [
+            self._decode_redis_value(consumer.get('name'))
+            for consumer in (summary or {}).get('consumers') or []
+            if self._decode_redis_value(consumer.get('name')) != self.instance_id
+            and not self._is_instance_alive(self._decode_redis_value(consumer.get('name')))
+        ]
+        if not dead:
+            return
+
+        reclaimed = 0
+        for consumer in dead:
+            # Only the dead consumer's own entries: an XAUTOCLAIM on the whole
+            # group would also steal slow entries from live consumers.
+            while True:
+                pending = r.xpending_range(
+                    stream, COMMAND_GROUP, min='-', max='+', count=COMMAND_BATCH_SIZE, consumername=consumer,
+                )
+                ids = [entry['message_id'] for entry in pending or []]
+                if not ids:
+                    # Deleting a consumer drops its PEL, so only once it's empty.
+                    try:
+                        r.xgroup_delconsumer(stream, COMMAND_GROUP, consumer)
+                    except Exception:
+                        pass
+                    break
+                # min_idle_time makes a concurrent reclaim by another instance
+                # a no-op for entries this one has just taken.
+                claimed = r.xclaim(stream, COMMAND_GROUP, self.instance_id, COMMAND_RECLAIM_MIN_IDLE_MS, ids)
+                entries = [(entry_id, fields or {}) for entry_id, fields in claimed or []]
+                if not entries:
+                    # Still too fresh or taken by someone else; retry next pass.
+                    break
+                reclaimed += len(entries)
+                self._process_command_entries(r, stream, entries, reclaimed=True)
+
+        if reclaimed:
+            self._log_event(
+                'all', 'received',
+                f'Reclaimed {reclaimed} routed command(s) from dead instance(s)',
+                level='warning',
+                details={'stream': stream, 'dead_consumers': dead},
+            )
+
+    def _process_command_entries(self, r, stream: str, entries: list, reclaimed: bool = False):
+        if not entries:
+            return
+        now_ms = int(time.time() * 1000)
+        processed = 0
+        expired = 0
+        latency_total = 0
+        last_latency = 0
+        for entry_id, fields in entries:
+            decoded = {
+                self._decode_redis_value(k): self._decode_redis_value(v)
+                for k, v in (fields or {}).items()
+            }
+            enqueued_at = self._to_int(decoded.get('enqueued_at', '0'))
+            if enqueued_at and now_ms - enqueued_at > COMMAND_MAX_AGE_SECONDS * 1000:
+                expired += 1
+                continue
             try:
-                _, raw_payload = item
-                payload = json.loads(self._decode_redis_value(raw_payload))
-            except Exception:
+                payload = json.loads(decoded.get('payload') or '')
+            except ValueError:
                 continue
+            try:
+                self._execute_command(payload)
+            except Exception:
+                logger.exception("Routed command failed: %s", payload.get('action'))
+            done_ms = int(time.time() * 1000)
+            if enqueued_at:
+                last_latency = done_ms - enqueued_at
+                latency_total += last_latency
+            processed += 1
 
-            action = payload.get('action')
-            hub = payload.get('hub')
-            if hub not in HUBS:
-                continue
+        try:
+            pipe = r.pipeline()
+            pipe.xack(stream, COMMAND_GROUP, *[entry_id for entry_id, _ in entries])
+            pipe.hincrby(REDIS_COMMAND_METRICS_KEY, 'processed', processed)
+            pipe.hincrby(REDIS_COMMAND_METRICS_KEY, 'expired', expired)
+            pipe.hincrby(REDIS_COMMAND_METRICS_KEY, 'latency_ms_total', latency_total)
+            if reclaimed:
+                pipe.hincrby(REDIS_COMMAND_METRICS_KEY, 'reclaimed', len(entries))
+            if processed:
+                pipe.hset(REDIS_COMMAND_METRICS_KEY, 'last_latency_ms', last_latency)
+            pipe.expire(REDIS_COMMAND_METRICS_KEY, SESSION_COSTS_TTL_SECONDS)
+            pipe.execute()
+        except Exception:
+            pass
+
+    def get_command_metrics(self) -> dict:
+        """Routed command throughput and end-to-end latency (enqueue -> hub send)."""
+        try:
+            r = self._redis()
+            pipe = r.pipeline(transaction=False)
+            pipe.hgetall(REDIS_COMMAND_METRICS_KEY)
+            for hub in HUBS:
+                pipe.xlen(self._command_stream_key(hub))
+            replies = pipe.execute()
+        except Exception:
+            return {}
+        decoded = {
+            self._decode_redis_value(k): self._decode_redis_value(v)
+            for k, v in (replies[0] or {}).items()
+        }
+        processed = self._to_int(decoded.get('processed', '0'))
+        latency_total = self._to_int(decoded.get('latency_ms_total', '0'))
+        return {
+            'processed': processed,
+            'expired': self._to_int(decoded.get('expired', '0')),
+            'reclaimed': self._to_int(decoded.get('reclaimed', '0')),
+            'avg_latency_ms': round(latency_total / processed, 1) if processed else 0,
+            'last_latency_ms': self._to_int(decoded.get('last_latency_ms', '0')),
+            'stream_lengths': dict(zip(HUBS, replies[1:])),
+        }
+
+    def _execute_command(self, payload: dict):
+        action = payload.get('action')
+        hub = payload.get('hub')
+        if hub not in HUBS:
+            return
+
+        if action == 'connect':
+            self.connect_hub(hub, _routed=True)
+        elif action == 'disconnect':
+            self.disconnect_hub(hub, _routed=True)
+        elif action == 'publish':
+            message = payload.get('message')
+            if isinstance(message, dict):
+                result = self.send_to_hub(hub, message, _routed=True)
+                if result.get('success'):
+                    return
+
+                self._log_event(
+                    hub,
+                    'publish',
+                    'Routed publish failed on owner; attempting reconnect + retry',
+                    level='warning',
+                    details={'reason': result.get('error', 'unknown')},
+                )
 
-            if action == 'connect':
                 self.connect_hub(hub, _routed=True)
-            elif action == 'disconnect':
-                self.disconnect_hub(hub, _routed=True)
-            elif action == 'publish':
-                message = payload.get('message')
-                if isinstance(message, dict):
-                    result = self.send_to_hub(hub, message, _routed=True)
-                    if result.get('success'):
-                        continue
+                deadline = time.time() + 2.0
+                while time.time() < deadline:
+                    conn = self.connections.get(hub)
+                    if conn and conn.state.connected:
+                        break
+                    time.sleep(0.1)
 
+                retry = self.send_to_hub(hub, message, _routed=True)
+                if retry.get('success'):
                     self._log_event(
                         hub,
                         'publish',
-                        'Routed publish failed on owner; attempting reconnect + retry',
-                        level='warning',
-                        details={'reason': result.get('error', 'unknown')},
+                        'Routed publish succeeded after reconnect retry',
+                        level='info',
+                    )
+                else:
+                    self._log_event(
+                        hub,
+                        'error',
+                        'Routed publish failed after reconnect retry',
+                        level='error',
+                        details={'reason': retry.get('error', 'unknown')},
                     )
 
-                    self.connect_hub(hub, _routed=True)
-                    deadline = time.time() + 2.0
-                    while time.time() < deadline:
-                        conn = self.connections.get(hub)
-                        if conn and conn.state.connected:
-                            break
-                        time.sleep(0.1)
-
-                    retry = self.send_to_hub(hub, message, _routed=True)
-                    if retry.get('success'):
-                        self._log_event(
-                            hub,
-                            'publish',
-                            'Routed publish succeeded after reconnect retry',
-                            level='info',
-                        )
-                    else:
-                        self._log_event(
-                            hub,
-                            'error',
-                            'Routed publish failed after reconnect retry',
-                            level='error',
-                            details={'reason': retry.get('error', 'unknown')},
-                        )
-
-    def _update_hub_redis(self, hub: str, state: HubState):
-        r = self._redis()
-        key = f"{REDIS_KEY_PREFIX}{hub}:state"
-        data = {
+    @staticmethod
+    def _hub_state_mapping(state: HubState) -> dict:
+        return {
             'connected': '1' if state.connected else '0',
             'connecting': '1' if state.connecting else '0',
             'live_users': str(state.live_users),
@@ -609,56 +1049,140 @@ class LiveFeedHubManager:
             'last_activity': state.last_activity.isoformat() if state.last_activity else '',
             'last_error': state.last_error or '',
         }
-        r.hset(key, mapping=data)
-        r.expire(key, HUB_STATE_TTL_SECONDS)
 
-    def _get_hub_state_redis(self, hub: str) -> Optional[dict]:
+    def _update_hub_redis(self, hub: str, state: HubState, force: bool = False) -> bool:
         """
-        Read hub state from Redis so status is shared across Django workers.
-        Returns None if state is not present or Redis is unavailable.
+        Write hub state only when it differs from what this process last
+        wrote. `last_activity` moves on every frame, so it is not part of the
+        diff; it rides along with real changes and the periodic refresh in
+        _refresh_hub_states. Returns True if Redis was written.
         """
+        data = self._hub_state_mapping(state)
+        with self._hub_state_lock:
+            previous = self._written_hub_states.get(hub)
+            unchanged = previous is not None and all(
+                previous.get(field) == value
+                for field, value in data.items()
+                if field != 'last_activity'
+            )
+            if unchanged and not force:
+                return False
+            self._written_hub_states[hub] = data
+
         key = f"{REDIS_KEY_PREFIX}{hub}:state"
         try:
-            raw = self._redis().hgetall(key)
+            pipe = self._redis().pipeline()
+            pipe.hset(key, mapping=data)
+            pipe.expire(key, HUB_STATE_TTL_SECONDS)
+            self.replica.publish(hub, state=data, pipe=pipe)
+            live_feed_events.emit('hub', self._hub_event(hub, state, data), pipe=pipe)
+            pipe.execute()
         except Exception:
-            return None
+            with self._hub_state_lock:
+                if self._written_hub_states.get(hub) is data:
+                    del self._written_hub_states[hub]
+            raise
+        return True
 
-        if not raw:
-            return None
+    def _hub_event(self, hub: str, state: HubState, data: dict) -> dict:
+        """Dashboard `hub` event; the writer of a live state is its owner."""
+        owner = self.instance_id if state.connected or state.connecting else ''
+        return {'hub': hub, 'state': self._compose_hub_state(hub, {'state': data, 'owner': owner})}
 
-        decoded = {
-            self._decode_redis_value(k): self._decode_redis_value(v)
-            for k, v in raw.items()
-        }
-        connected = self._to_bool(decoded.get('connected', '0'))
-        connecting = self._to_bool(decoded.get('connecting', '0'))
-        owner = self._get_hub_owner(hub)
-        if (connected or connecting) and not owner:
-            connected = False
-            connecting = False
+    def _refresh_hub_states(self, hubs: List[str]):
+        """Rewrite state and TTL for the given hubs in one pipeline."""
+        if not hubs:
+            return
+        pipe = self._redis().pipeline()
+        written = {}
+        for hub in hubs:
+            data = self._hub_state_mapping(self.connections[hub].state)
+            key = f"{REDIS_KEY_PREFIX}{hub}:state"
+            pipe.hset(key, mapping=data)
+            pipe.expire(key, HUB_STATE_TTL_SECONDS)
+            self.replica.publish(hub, state=data, pipe=pipe)
+            live_feed_events.emit('hub', self._hub_event(hub, self.connections[hub].state, data), pipe=pipe)
+            written[hub] = data
+        pipe.execute()
+        with self._hub_state_lock:
+            self._written_hub_states.update(written)
+
+    def _load_hub_entries(self) -> Dict[str, dict]:
+        """Read every hub's state hash and owner in one pipeline (replica reload)."""
+        pipe = self._redis().pipeline(transaction=False)
+        for hub in HUBS:
+            pipe.hgetall(f"{REDIS_KEY_PREFIX}{hub}:state")
+            pipe.get(self._owner_key(hub))
+        replies = pipe.execute()
+
+        entries = {}
+        for index, hub in enumerate(HUBS):
+            raw_state, raw_owner = replies[2 * index], replies[2 * index + 1]
+            state = {
+                self._decode_redis_value(k): self._decode_redis_value(v)
+                for k, v in (raw_state or {}).items()
+            }
+            entries[hub] = {
+                'state': state or None,
+                'owner': self._decode_redis_value(raw_owner).strip(),
+            }
+        return entries
+
+    def _compose_hub_state(self, hub: str, entry: Optional[dict]) -> dict:
+        """
+        Shared hub state from a replica entry so status is consistent across
+        Django workers; falls back to this process's connection state.
+        """
+        entry = entry or {}
+        decoded = entry.get('state')
+        owner = entry.get('owner') or ''
+        if decoded:
+            connected = self._to_bool(decoded.get('connected', '0'))
+            connecting = self._to_bool(decoded.get('connecting', '0'))
+            if (connected or connecting) and not owner:
+                connected = False
+                connecting = False
+
+            return {
+                'name': HUBS[hub]['name'],
+                'location': HUBS[hub]['location'],
+                'connected': connected,
+                'connecting': connecting,
+                'live_users': self._to_int(decoded.get('live_users', '0')),
+                'admin_users': self._to_int(decoded.get('admin_users', '0')),
+                'connected_at': decoded.get('connected_at') or None,
+                'last_activity': decoded.get('last_activity') or None,
+                'last_error': decoded.get('last_error') or None,
+                'owner': owner,
+            }
 
+        conn = self.connections[hub]
         return {
             'name': HUBS[hub]['name'],
             'location': HUBS[hub]['location'],
-            'connected': connected,
-            'connecting': connecting,
-            'live_users': self._to_int(decoded.get('live_users', '0')),
-            'admin_users': self._to_int(decoded.get('admin_users', '0')),
-            'connected_at': decoded.get('connected_at') or None,
-            'last_activity': decoded.get('last_activity') or None,
-            'last_error': decoded.get('last_error') or None,
+            'connected': conn.state.connected,
+            'connecting': conn.state.connecting,
+            'live_users': conn.state.live_users,
+            'admin_users': conn.state.admin_users,
+            'connected_at': conn.state.connected_at.isoformat() if conn.state.connected_at else None,
+            'last_activity': conn.state.last_activity.isoformat() if conn.state.last_activity else None,
+            'last_error': conn.state.last_error,
+            'owner': owner,
         }
 
     def _store_snapshot(self, hub: str, snapshot: dict):
-        r = self._redis()
-        key = f"{REDIS_KEY_PREFIX}{hub}:snapshot"
-        r.set(key, json.dumps(snapshot))
+        pipe = self._redis().pipeline()
+        pipe.set(f"{REDIS_KEY_PREFIX}{hub}:snapshot", json.dumps(snapshot))
+        live_feed_events.emit('snapshot', {'hub': hub, 'snapshot': snapshot}, pipe=pipe)
+        pipe.execute()
 
     def _store_feed_item(self, hub: str, item: dict):
-        r = self._redis()
         key = f"{REDIS_KEY_PREFIX}{hub}:items"
-        r.lpush(key, json.dumps(item))
-        r.ltrim(key, 0, 999)
+        pipe = self._redis().pipeline()
+        pipe.lpush(key, json.dumps(item))
+        pipe.ltrim(key, 0, 999)
+        live_feed_events.emit('item', {'hub': hub, 'item': item}, pipe=pipe)
+        pipe.execute()
 
     def _get_feed_items(self, hub: str, limit: int = 100) -> list:
         r = self._redis()
@@ -667,9 +1191,10 @@ class LiveFeedHubManager:
         return [json.loads(item) for item in items]
 
     def _clear_hub_data(self, hub: str):
-        r = self._redis()
-        r.delete(f"{REDIS_KEY_PREFIX}{hub}:snapshot")
-        r.delete(f"{REDIS_KEY_PREFIX}{hub}:items")
+        pipe = self._redis().pipeline()
+        pipe.delete(f"{REDIS_KEY_PREFIX}{hub}:snapshot", f"{REDIS_KEY_PREFIX}{hub}:items")
+        live_feed_events.emit('snapshot', {'hub': hub, 'snapshot': None, 'cleared': True}, pipe=pipe)
+        pipe.execute()
 
     def _log_event(self, hub: str, event_type: str, message: str,
                    level: str = 'info', details: dict = None):
@@ -687,10 +1212,19 @@ class LiveFeedHubManager:
             details=details
         )
 
+    def _route_to_agent(self, hub: str, command: dict) -> dict:
+        """Client mode: hand the command to the hub's owner, or to whichever agent reads it first."""
+        owner = self._get_hub_owner(hub) or 'agent'
+        queued = self._enqueue_command(owner, command)
+        return {'success': queued, 'routed': queued, 'owner': owner}
+
     def connect_hub(self, hub: str, _routed: bool = False) -> dict:
         if hub not in self.connections:
             return {'success': False, 'error': f'Unknown hub: {hub}'}
 
+        if not _routed and not self.owns_connections:
+            return self._route_to_agent(hub, {'action': 'connect', 'hub': hub})
+
         if not _routed:
             owner = self._get_hub_owner(hub)
             if owner and owner != self.instance_id:
@@ -744,6 +1278,9 @@ class LiveFeedHubManager:
         if hub not in self.connections:
             return {'success': False, 'error': f'Unknown hub: {hub}'}
 
+        if not _routed and not self.owns_connections:
+            return self._route_to_agent(hub, {'action': 'disconnect', 'hub': hub})
+
         if not _routed:
             owner = self._get_hub_owner(hub)
             if owner and owner != self.instance_id:
@@ -758,7 +1295,7 @@ class LiveFeedHubManager:
         if not conn.state.connected and not conn.state.connecting:
             # Ensure shared status does not stay stale in Redis.
             try:
-                self._update_hub_redis(hub, conn.state)
+                self._update_hub_redis(hub, conn.state, force=True)
             except Exception:
                 pass
             self._release_hub_owner(hub)
@@ -766,7 +1303,7 @@ class LiveFeedHubManager:
 
         self._clear_hub_data(hub)
         conn.disconnect()
-        self._increment_cost('disconnects')
+        self._increment_cost('disconnects', hub=hub)
         return {'success': True}
 
     def disconnect_all(self) -> dict:
@@ -776,30 +1313,9 @@ class LiveFeedHubManager:
         return results
 
     def get_hub_states(self) -> Dict[str, dict]:
-        states = {}
-        for hub, conn in self.connections.items():
-            redis_state = self._get_hub_state_redis(hub)
-            owner = self._get_hub_owner(hub)
-            if redis_state is not None:
-                states[hub] = {
-                    **redis_state,
-                    'owner': owner or '',
-                }
-                continue
-
-            states[hub] = {
-                'name': HUBS[hub]['name'],
-                'location': HUBS[hub]['location'],
-                'connected': conn.state.connected,
-                'connecting': conn.state.connecting,
-                'live_users': conn.state.live_users,
-                'admin_users': conn.state.admin_users,
-                'connected_at': conn.state.connected_at.isoformat() if conn.state.connected_at else None,
-                'last_activity': conn.state.last_activity.isoformat() if conn.state.last_activity else None,
-                'last_error': conn.state.last_error,
-                'owner': owner or '',
-            }
-        return states
+        """Hub states from the in-process replica; no Redis round trip on the hot path."""
+        entries = self.replica.get()
+        return {hub: self._compose_hub_state(hub, entries.get(hub)) for hub in self.connections}
 
     def get_snapshot(self, hub: str) -> Optional[dict]:
         if hub not in self.connections:
@@ -826,6 +1342,9 @@ class LiveFeedHubManager:
             'message': message,
         }
 
+        if not _routed and not self.owns_connections:
+            return self._route_to_agent(hub, command)
+
         if not _routed:
             owner = self._get_hub_owner(hub)
             if owner and owner != self.instance_id:
@@ -863,11 +1382,12 @@ class LiveFeedHubManager:
         success = conn.send(message)
         return {'success': success}
 
-    def send_to_all(self, message: dict, _routed: bool = False) -> dict:
-        results = {}
-        for hub in HUBS:
-            results[hub] = self.send_to_hub(hub, message, _routed=_routed)
-        return results
+    def send_to_all(self, message: dict, _routed: bool = False,
+                    timeout: float = FANOUT_DEADLINE_SECONDS) -> dict:
+        return self.fanout.run({
+            hub: partial(self.send_to_hub, hub, message, _routed=_routed)
+            for hub in HUBS
+        }, timeout=timeout)
 
     def send_to_connected(self, message: dict) -> dict:
         """Send message only to hubs that are already connected (no auto-connect)."""
@@ -881,14 +1401,66 @@ class LiveFeedHubManager:
                 results[hub] = {'success': False, 'error': 'Not connected', 'skipped': True}
         return results
 
-    def request_live_users(self, hub: str = 'all') -> dict:
+    def request_live_users(self, hub: str = 'all', request_id: Optional[str] = None,
+                           timeout: float = FANOUT_DEADLINE_SECONDS) -> dict:
         """
         Ask connected hub sockets to return current live/admin user counts.
+        Returns after `timeout` even if a send is still in flight.
         """
         message = {'type': 'get_live_users'}
+        if request_id:
+            message['request_id'] = request_id
         if hub == 'all':
-            return self.send_to_all(message)
-        return {hub: self.send_to_hub(hub, message)}
+            return self.send_to_all(message, timeout=timeout)
+        return self.fanout.run({hub: partial(self.send_to_hub, hub, message)}, timeout=timeout)
+
+    def refresh_live_users(self, hub: str = 'all', timeout: float = LIVE_USERS_REPLY_TIMEOUT_SECONDS) -> dict:
+        """
+        Request fresh user counts and wait until every hub the request reached
+        has answered, or `timeout` passes. The timeout covers the sends too.
+        Replies are matched by request_id; the owning instance forwards them
+        over the hub state channel, so this works whichever process holds the
+        sockets.
+        """
+        # The replica subscriber must be listening before replies can arrive.
+        self.replica.get()
+        request_id = f"{self.instance_id}:{uuid.uuid4().hex[:12]}"
+        waiter = ReplyWaiter(HUBS if hub == 'all' else [hub])
+        with self._reply_lock:
+            self._reply_waiters[request_id] = waiter
+        started = time.monotonic()
+        deadline = started + timeout
+        try:
+            results = self.request_live_users(hub, request_id=request_id, timeout=timeout)
+            for hub_name, result in results.items():
+                # A send cut off by the deadline may still land; report it as timed out.
+                if not result.get('success') and not result.get('timed_out'):
+                    waiter.drop(hub_name)
+            waiter.event.wait(max(0.0, deadline - time.monotonic()))
+            return {
+                'request_id': request_id,
+                'answered': sorted(waiter.answered),
+                'timed_out': sorted(waiter.pending),
+                'waited_ms': round((time.monotonic() - started) * 1000, 1),
+            }
+        finally:
+            with self._reply_lock:
+                self._reply_waiters.pop(request_id, None)
+
+    def _resolve_reply(self, request_id: str, hub: str):
+        with self._reply_lock:
+            waiter = self._reply_waiters.get(request_id)
+        if waiter:
+            waiter.resolve(hub)
+
+    def _complete_reply(self, hub: str, request_id: str, state: HubState):
+        requester = request_id.split(':', 1)[0]
+        if requester == self.instance_id:
+            self._resolve_reply(request_id, hub)
+            return
+        # Forward with the fresh state so the requester's replica is current
+        # when its waiter wakes up.
+        self.replica.publish(hub, state=self._hub_state_mapping(state), request_id=request_id)
 
     def _store_published_item(self, category_id: int, sequence_id: int, title: str,
                                impact: int, timestamp: str, hub: str, payload: dict) -> Optional[LiveFeedPublishedItem]:
@@ -910,26 +1482,20 @@ class LiveFeedHubManager:
                 hub=hub,
                 payload=payload,
             )
-            LiveFeedPublishedItem.cleanup_if_needed()
+            if LiveFeedPublishedItem.cleanup_if_needed():
+                fanout_window.invalidate_all()
             return item
         except Exception as e:
             logger.error("Failed to store published item: %s", e)
             return None
 
     def _build_initial_fanout_snapshot(self, category_id: int, limit: Optional[int] = None) -> Optional[dict]:
-        """Build the initial fanout snapshot for a category from recent published items."""
+        """Build the initial fanout snapshot for a category from its Redis fanout window."""
         try:
-            category = Categories.objects.filter(id=category_id).first()
-            if not category:
-                logger.error("Failed to build initial fanout snapshot: Category not found")
+            fanout_items = fanout_window.get(category_id, limit=limit)
+            if not fanout_items:
                 return None
 
-            items = LiveFeedPublishedItem.get_initial_fanout_items(category, limit=limit)
-            if not items:
-                return None
-
-            fanout_items = [item.to_fanout_dict() for item in items]
-
             return {
                 'type': 'snapshot',
                 'category': {
@@ -945,7 +1511,17 @@ class LiveFeedHubManager:
         Manually re-seed category snapshot from stored published items.
         Sends only to currently connected hub sockets.
         """
-        snapshot = self._build_initial_fanout_snapshot(category_id=category_id, limit=limit)
+        versions = {}
+        if limit is None:
+            try:
+                snapshot, versions = self._versioned_snapshot(fanout_window.read([category_id]))
+            except Exception as e:
+                logger.error("Failed to build initial fanout snapshot: %s", e)
+                snapshot = None
+        else:
+            # A custom-size snapshot does not match any window version, so the
+            # hub drops its versions and the next publish resyncs.
+            snapshot = self._build_initial_fanout_snapshot(category_id=category_id, limit=limit)
         if not snapshot:
             return {'success': False, 'error': 'No published items available for initial fanout'}
 
@@ -955,6 +1531,8 @@ class LiveFeedHubManager:
             'type': 'set_broadcast',
             'snapshot': snapshot,
         }
+        if versions:
+            message['versions'] = {str(cid): version for cid, version in versions.items()}
         states = self.get_hub_states()
 
         if hub == 'all':
@@ -966,13 +1544,15 @@ class LiveFeedHubManager:
             if not target_hubs:
                 return {'success': False, 'error': 'No connected hubs available', 'item_count': item_count}
 
-            results = {hub_name: self.send_to_hub(hub_name, message) for hub_name in target_hubs}
+            results = self.fanout.run({
+                hub_name: partial(self._send_broadcast, hub_name, message, versions)
+                for hub_name in target_hubs
+            }, retry=True)
             successful_hubs = [hub_name for hub_name, result in results.items() if result.get('success')]
             failed_hubs = [hub_name for hub_name, result in results.items() if not result.get('success')]
             success = bool(successful_hubs)
 
             if success:
-                self._increment_cost('broadcasts', amount=len(successful_hubs))
                 self._log_event(
                     'all',
                     'broadcast',
@@ -982,6 +1562,7 @@ class LiveFeedHubManager:
                         'item_count': item_count,
                         'successful_hubs': successful_hubs,
                         'failed_hubs': failed_hubs,
+                        'latency_ms': {hub_name: result['latency_ms'] for hub_name, result in results.items()},
                     },
                 )
             else:
@@ -1010,10 +1591,9 @@ class LiveFeedHubManager:
         if not bool((states.get(hub) or {}).get('connected')):
             return {'success': False, 'error': f'Hub {hub} not connected', 'item_count': item_count}
 
-        result = self.send_to_hub(hub, message)
+        result = self._send_broadcast(hub, message, versions)
         success = bool(result.get('success'))
         if success:
-            self._increment_cost('broadcasts')
             self._log_event(
                 hub,
                 'broadcast',
@@ -1027,10 +1607,42 @@ class LiveFeedHubManager:
             'error': '' if success else str(result.get('error') or 'Failed to send snapshot'),
         }
 
+    def _send_broadcast(self, hub: str, message: dict, versions: Dict[int, int]) -> dict:
+        result = self.send_to_hub(hub, message)
+        if result.get('success'):
+            self._set_hub_fanout_versions(hub, versions, replace=True)
+            self._increment_cost('broadcasts', hub=hub)
+        return result
+
     def publish_item(self, hub: str, category_id: int, title: str,
                      impact: int = 0, timestamp: str = None) -> dict:
-        sequence_id = int(datetime.now(timezone.utc).timestamp() * 1000)
-        item_timestamp = timestamp or datetime.now(timezone.utc).isoformat()
+        future = self.publish_item_async(
+            hub=hub, category_id=category_id, title=title, impact=impact, timestamp=timestamp,
+        )
+        try:
+            return future.result(timeout=PUBLISH_RESULT_TIMEOUT_SECONDS)
+        except Exception as e:
+            return {'success': False, 'error': f'Publish did not complete: {e}'}
+
+    def publish_item_async(self, hub: str, category_id: int, title: str,
+                           impact: int = 0, timestamp: str = None) -> Future:
+        """
+        Spool the item for the background DB writer, add it to the fanout
+        window and queue it for the next coalesced flush, so delivery never
+        waits on Postgres. The future resolves to the same result dict
+        publish_item() returns, shared by every item in the flushed batch.
+        """
+        # Coerced here so the spooled row can't fail on an unparseable value.
+        parsed_timestamp = self.spool.parse_timestamp(timestamp)
+        item_timestamp = timestamp or parsed_timestamp.isoformat()
+
+        fanout = LiveFeedPublishedItem(
+            title=title,
+            impact=impact,
+            timestamp=parsed_timestamp,
+        ).to_fanout_dict()
+        # One round trip allocates the id and appends to the fanout window.
+        sequence_id, fanout_version, fanout_limit = fanout_window.publish(category_id, fanout)
 
         item = {
             'type': 'message',
@@ -1042,27 +1654,173 @@ class LiveFeedHubManager:
             item['impact'] = impact
         item['timestamp'] = item_timestamp
 
-        # Store the published item in the database
-        stored_item = self._store_published_item(
-            category_id=category_id,
-            sequence_id=sequence_id,
-            title=title,
-            impact=impact,
-            timestamp=item_timestamp,
-            hub=hub,
-            payload=item,
+        record = {
+            'category_id': category_id,
+            'sequence_id': sequence_id,
+            'title': title,
+            'impact': impact,
+            'timestamp': parsed_timestamp.isoformat(),
+            'hub': hub,
+            'payload': item,
+            'fanout': fanout,
+        }
+
+        pending = PendingPublish(
+            item=item, category_id=category_id, title=title, stored=True, fanout=fanout,
+            fanout_version=fanout_version, fanout_limit=fanout_limit,
         )
+        # A cold window is rebuilt from the DB, which may not have this row
+        # yet; the writer appends it again once it is stored.
+        record['cold'] = not pending.fanout_version
+
+        if not self.spool.append(record):
+            # Redis refused the spool entry: fall back to a synchronous insert.
+            pending.stored = self._store_published_item(
+                category_id=category_id,
+                sequence_id=sequence_id,
+                title=title,
+                impact=impact,
+                timestamp=item_timestamp,
+                hub=hub,
+                payload=item,
+            ) is not None
+        return self.publisher.submit(hub, pending)
 
-        message = {
-            'type': 'publish_item',
-            'item': item,
+    def _fanout_versions_key(self, hub: str) -> str:
+        return f"{REDIS_KEY_PREFIX}{hub}{REDIS_FANOUT_VERSIONS_SUFFIX}"
+
+    def _get_hub_fanout_versions(self, hubs: List[str]) -> Dict[str, Dict[int, int]]:
+        """Fanout window version each hub is known to hold, per category."""
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            for hub in hubs:
+                pipe.hgetall(self._fanout_versions_key(hub))
+            replies = pipe.execute()
+        except Exception:
+            replies = [{} for _ in hubs]
+        return {
+            hub: {
+                self._to_int(self._decode_redis_value(k)): self._to_int(self._decode_redis_value(v))
+                for k, v in (raw or {}).items()
+            }
+            for hub, raw in zip(hubs, replies)
         }
 
-        # Build and include initial fanout snapshot if item was stored successfully
-        if stored_item:
-            snapshot = self._build_initial_fanout_snapshot(category_id)
+    def _set_hub_fanout_versions(self, hub: str, versions: Dict[int, int], replace: bool = False):
+        try:
+            key = self._fanout_versions_key(hub)
+            pipe = self._redis().pipeline()
+            if replace:
+                pipe.delete(key)
+            if versions:
+                pipe.hset(key, mapping={str(cid): int(version) for cid, version in versions.items()})
+                pipe.expire(key, SESSION_COSTS_TTL_SECONDS)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _versioned_snapshot(windows: Dict[int, tuple]) -> tuple:
+        """(snapshot, versions) for the non-empty windows, or (None, {})."""
+        category = {str(cid): items for cid, (_, items) in windows.items() if items}
+        if not category:
+            return None, {}
+        versions = {cid: version for cid, (version, items) in windows.items() if items and version}
+        return {'type': 'snapshot', 'category': category}, versions
+
+    def _build_publish_messages(self, hubs: List[str], batch: List[PendingPublish]) -> Dict[str, tuple]:
+        """
+        One frame per hub for the whole batch. A category travels as a delta
+        (its new fanout entries plus base_version) when the hub is known to
+        hold the base; otherwise the full window is sent with its version.
+        Returns {hub: (message, versions_after_send)}.
+        """
+        items = [pending.item for pending in batch]
+        if len(items) == 1:
+            base_message = {'type': 'publish_item', 'item': items[0]}
+        else:
+            base_message = {'type': 'publish_items', 'items': items}
+
+        stored_by_category: Dict[int, List[PendingPublish]] = {}
+        for pending in batch:
+            if pending.stored:
+                stored_by_category.setdefault(pending.category_id, []).append(pending)
+        if not stored_by_category:
+            return {hub: (dict(base_message), {}) for hub in hubs}
+
+        deltas = {}
+        for category_id, pendings in stored_by_category.items():
+            versions = [pending.fanout_version for pending in pendings]
+            # Versions are consecutive unless another publisher appended in between.
+            if versions[0] and versions == list(range(versions[0], versions[0] + len(versions))):
+                deltas[category_id] = {
+                    'base_version': versions[0] - 1,
+                    'version': versions[-1],
+                    'limit': pendings[-1].fanout_limit,
+                    'items': [pending.fanout for pending in pendings],
+                }
+
+        known_versions = self._get_hub_fanout_versions(hubs) if deltas else {}
+        full_by_hub = {
+            hub: [
+                category_id for category_id in stored_by_category
+                if category_id not in deltas
+                or known_versions.get(hub, {}).get(category_id) != deltas[category_id]['base_version']
+            ]
+            for hub in hubs
+        }
+        full_category_ids = {category_id for category_ids in full_by_hub.values() for category_id in category_ids}
+        try:
+            windows = fanout_window.read(full_category_ids) if full_category_ids else {}
+        except Exception as e:
+            logger.error("Failed to build fanout snapshot: %s", e)
+            windows = {}
+
+        messages = {}
+        for hub in hubs:
+            message = dict(base_message)
+            sent_versions = {}
+            delta = {
+                str(category_id): deltas[category_id]
+                for category_id in stored_by_category
+                if category_id in deltas and category_id not in full_by_hub[hub]
+            }
+            if delta:
+                message['delta'] = delta
+                sent_versions.update({int(cid): entry['version'] for cid, entry in delta.items()})
+            snapshot, versions = self._versioned_snapshot({
+                category_id: windows[category_id]
+                for category_id in full_by_hub[hub]
+                if category_id in windows
+            })
             if snapshot:
                 message['snapshot'] = snapshot
+                message['versions'] = {str(cid): version for cid, version in versions.items()}
+                sent_versions.update(versions)
+            messages[hub] = (message, sent_versions)
+        return messages
+
+    def _send_publish_message(self, hub: str, message: dict, versions: Dict[int, int]) -> dict:
+        result = self.send_to_hub(hub, message)
+        if result.get('success') and versions:
+            # Optimistic: the hub reports back if it could not apply the frame.
+            self._set_hub_fanout_versions(hub, versions)
+        return result
+
+    @staticmethod
+    def _fanout_mode(message: dict) -> str:
+        if 'snapshot' in message:
+            return 'snapshot'
+        if 'delta' in message:
+            return 'delta'
+        return 'none'
+
+    def _send_publish_batch(self, hub: str, batch: List[PendingPublish]) -> dict:
+        category_ids = sorted({pending.category_id for pending in batch})
+        if len(batch) == 1:
+            label = f'"{batch[0].title[:50]}"'
+        else:
+            label = f'{len(batch)} items'
 
         if hub == 'all':
             # Send only to hubs that are connected in shared state. The live
@@ -1070,53 +1828,232 @@ class LiveFeedHubManager:
             # WebSocket, so route through send_to_hub instead of checking only
             # this manager instance's local connections.
             states = self.get_hub_states()
-            results = {}
-            for hub_name in HUBS:
-                if bool((states.get(hub_name) or {}).get('connected')):
-                    results[hub_name] = self.send_to_hub(hub_name, message)
-                else:
-                    results[hub_name] = {'success': False, 'error': 'Not connected', 'skipped': True}
+            target_hubs = [
+                hub_name for hub_name in HUBS
+                if bool((states.get(hub_name) or {}).get('connected'))
+            ]
+            messages = self._build_publish_messages(target_hubs, batch) if target_hubs else {}
+            sent = self.fanout.run({
+                hub_name: partial(self._send_publish_message, hub_name, *messages[hub_name])
+                for hub_name in messages
+            }, retry=True)
+            results = {
+                hub_name: sent.get(hub_name) or {'success': False, 'error': 'Not connected', 'skipped': True}
+                for hub_name in HUBS
+            }
             successful_hubs = [hub_name for hub_name, result in results.items() if result.get('success')]
             skipped_hubs = [hub_name for hub_name, result in results.items() if result.get('skipped')]
             failed_hubs = [hub_name for hub_name, result in results.items() if not result.get('success') and not result.get('skipped')]
             success = bool(successful_hubs)
             if success:
-                self._increment_cost('publishes')
+                self._increment_cost('publishes', amount=len(batch), hub=hub)
                 self._log_event(
                     'all', 'publish',
-                    f'Published to {len(successful_hubs)} hub(s): "{title[:50]}"',
+                    f'Published to {len(successful_hubs)} hub(s): {label}',
                     details={
-                        'category_id': category_id,
+                        'category_ids': category_ids,
+                        'item_count': len(batch),
                         'successful_hubs': successful_hubs,
                         'skipped_hubs': skipped_hubs,
                         'failed_hubs': failed_hubs,
-                        'fanout_updated': snapshot is not None if stored_item else False,
+                        'fanout_modes': {
+                            hub_name: self._fanout_mode(message)
+                            for hub_name, (message, _) in messages.items()
+                        },
+                        'latency_ms': {hub_name: result['latency_ms'] for hub_name, result in sent.items()},
                     }
                 )
             return {'success': success, 'results': results}
         else:
-            result = self.send_to_hub(hub, message)
+            message, versions = self._build_publish_messages([hub], batch)[hub]
+            result = self._send_publish_message(hub, message, versions)
             if result.get('success'):
-                self._increment_cost('publishes')
+                self._increment_cost('publishes', amount=len(batch), hub=hub)
                 self._log_event(
                     hub, 'publish',
-                    f'Published: "{title[:50]}"',
+                    f'Published: {label}',
                     details={
-                        'category_id': category_id,
-                        'fanout_updated': snapshot is not None if stored_item else False,
+                        'category_ids': category_ids,
+                        'item_count': len(batch),
+                        'fanout_mode': self._fanout_mode(message),
                     }
                 )
             return result
 
+    def _handle_fanout_mismatch(self, hub: str, category_ids: list, reported_versions: dict):
+        """
+        The hub could not apply a delta because it holds a different window
+        version. Record what it actually has and resend the full windows.
+        """
+        category_ids = [self._to_int(str(cid)) for cid in category_ids]
+        category_ids = [cid for cid in category_ids if cid > 0]
+        if not category_ids:
+            return
+        reported = {
+            cid: self._to_int(str(reported_versions.get(str(cid), 0)))
+            for cid in category_ids
+        }
+        self._set_hub_fanout_versions(hub, reported)
+        self.resync_hub_fanout(hub, category_ids)
+
+    def resync_hub_fanout(self, hub: str, category_ids: List[int]) -> dict:
+        """Write full fanout windows to a hub without re-broadcasting them to clients."""
+        try:
+            snapshot, versions = self._versioned_snapshot(fanout_window.read(category_ids))
+        except Exception as e:
+            logger.error("Failed to read fanout windows for resync: %s", e)
+            return {'success': False, 'error': str(e)}
+        if not snapshot:
+            return {'success': False, 'error': 'No published items available for resync'}
+
+        message = {
+            'type': 'sync_snapshot',
+            'snapshot': snapshot,
+            'versions': {str(cid): version for cid, version in versions.items()},
+        }
+        result = self._send_publish_message(hub, message, versions)
+        self._log_event(
+            hub, 'broadcast' if result.get('success') else 'error',
+            f'Resynced fanout snapshot for categories={sorted(versions)}',
+            level='info' if result.get('success') else 'error',
+            details={'category_ids': sorted(versions), 'versions': versions},
+        )
+        return result
+
+    def _record_publish_flush(self, item_count: int, latency_ms: float):
+        try:
+            pipe = self._redis().pipeline()
+            pipe.hincrby(REDIS_PUBLISH_METRICS_KEY, 'flushes', 1)
+            pipe.hincrby(REDIS_PUBLISH_METRICS_KEY, 'items', int(item_count))
+            pipe.hincrbyfloat(REDIS_PUBLISH_METRICS_KEY, 'latency_ms_total', float(latency_ms))
+            pipe.hset(REDIS_PUBLISH_METRICS_KEY, mapping={
+                'last_latency_ms': f'{latency_ms:.1f}',
+                'last_batch_size': str(item_count),
+                'last_flush_at': datetime.now(timezone.utc).isoformat(),
+            })
+            pipe.expire(REDIS_PUBLISH_METRICS_KEY, SESSION_COSTS_TTL_SECONDS)
+            pipe.execute()
+        except Exception:
+            pass
+
+    def get_publish_metrics(self) -> dict:
+        """Coalescer counters (shared across processes) plus this process's queue depths."""
+        try:
+            raw = self._redis().hgetall(REDIS_PUBLISH_METRICS_KEY)
+        except Exception:
+            raw = {}
+        decoded = {
+            self._decode_redis_value(k): self._decode_redis_value(v)
+            for k, v in (raw or {}).items()
+        }
+        flushes = self._to_int(decoded.get('flushes', '0'))
+        items = self._to_int(decoded.get('items', '0'))
+        try:
+            latency_total = float(decoded.get('latency_ms_total') or 0)
+        except ValueError:
+            latency_total = 0.0
+        return {
+            'flushes': flushes,
+            'items': items,
+            'avg_batch_size': round(items / flushes, 2) if flushes else 0,
+            'avg_flush_latency_ms': round(latency_total / flushes, 1) if flushes else 0,
+            'last_flush_latency_ms': float(decoded.get('last_latency_ms') or 0),
+            'last_batch_size': self._to_int(decoded.get('last_batch_size', '0')),
+            'last_flush_at': decoded.get('last_flush_at') or None,
+            'pending': self.publisher.pending_depths(),
+            'outbound_queue': hub_engine.queue_depths(),
+            'spool': self.spool.stats(),
+        }
+
     def get_costs(self) -> dict:
-        return self._read_costs()
+        """
+        Lifetime totals plus per-minute rates. `rates` averages the last
+        COST_RATE_WINDOW_MINUTES minutes; `series` is one row per minute for
+        charting, oldest first.
+        """
+        costs, event_id = self._read_costs()
+        try:
+            series = self.counters.read_buckets(COST_SERIES_MINUTES, self._cost_fields())
+        except Exception:
+            series = []
+        recent = series[-COST_RATE_WINDOW_MINUTES:]
+        costs['rates'] = {
+            field: round(sum(row[field] for row in recent) / len(recent), 2) if recent else 0
+            for field in self._cost_fields()
+        }
+        costs['series'] = series
+        costs['event_id'] = event_id
+        return costs
 
     def reset_costs(self):
         self.costs = CostCounters()
         try:
-            self._redis().delete(self._costs_key())
+            self.counters.clear(list(HUBS) + ['all'])
         except Exception:
             pass
+        live_feed_events.emit('costs_reset', {})
+
+    def start_agent(self):
+        """
+        Run as the dedicated agent: consume every hub's command stream and
+        reopen the hubs the previous agent handed off when it drained.
+        """
+        self.agent_mode = True
+        self._ensure_command_worker()
+        self._ensure_inactivity_monitor()
+        self.spool.start()
+
+        try:
+            pipe = self._redis().pipeline()
+            pipe.smembers(REDIS_AGENT_HANDOFF_KEY)
+            pipe.delete(REDIS_AGENT_HANDOFF_KEY)
+            handoff = sorted(self._decode_redis_value(hub) for hub in pipe.execute()[0] or ())
+        except Exception as e:
+            logger.warning("Agent handoff read failed: %s", e)
+            handoff = []
+        for hub in handoff:
+            if hub in HUBS:
+                self.connect_hub(hub)
+        if handoff:
+            self._log_event('all', 'connect', f'Agent resumed {len(handoff)} hub(s) from handoff', details={'hubs': handoff})
+
+    def drain(self, timeout: float = AGENT_DRAIN_TIMEOUT_SECONDS) -> List[str]:
+        """
+        Graceful agent shutdown: stop taking routed commands, let queued
+        publishes and outbound frames go out, then close the sockets and
+        release ownership so the next agent can claim the hubs straight away.
+        Returns the hubs that were open (recorded for the next agent).
+        """
+        deadline = time.monotonic() + timeout
+        self._stop_command_worker.set()
+        if self._command_thread is not None:
+            self._command_thread.join(COMMAND_BLOCK_MS / 1000 + 1)
+        self._stop_inactivity_check.set()
+
+        if not self.publisher.drain(max(0.0, deadline - time.monotonic())):
+            logger.warning("Agent drain: publish queue not empty at deadline: %s", self.publisher.pending_depths())
+        while any(hub_engine.queue_depths().values()) and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        open_hubs = [
+            hub for hub, conn in self.connections.items()
+            if conn.state.connected or conn.state.connecting
+        ]
+        if open_hubs:
+            try:
+                pipe = self._redis().pipeline()
+                pipe.sadd(REDIS_AGENT_HANDOFF_KEY, *open_hubs)
+                pipe.expire(REDIS_AGENT_HANDOFF_KEY, AGENT_HANDOFF_TTL_SECONDS)
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Agent handoff write failed: %s", e)
+        for hub in open_hubs:
+            self.disconnect_hub(hub, _routed=True)
+
+        # Anything still spooled is replayed by the next agent's writer.
+        self.spool.stop(max(0.0, deadline - time.monotonic()))
+        self.counters.flush()
+        return open_hubs
 
     def _ensure_inactivity_monitor(self):
         if self._inactivity_thread and self._inactivity_thread.is_alive():
@@ -1136,13 +2073,16 @@ class LiveFeedHubManager:
             if self._stop_inactivity_check.is_set():
                 break
 
-            for hub, conn in self.connections.items():
-                if conn.state.connected or conn.state.connecting:
-                    self._refresh_hub_owner(hub)
-                    try:
-                        self._update_hub_redis(hub, conn.state)
-                    except Exception:
-                        pass
+            active_hubs = [
+                hub for hub, conn in self.connections.items()
+                if conn.state.connected or conn.state.connecting
+            ]
+            for hub in active_hubs:
+                self._refresh_hub_owner(hub)
+            try:
+                self._refresh_hub_states(active_hubs)
+            except Exception:
+                pass
 
             any_connected = any(
                 conn.state.connected for conn in self.connections.values()
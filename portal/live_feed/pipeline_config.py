@@ -0,0 +1,169 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django_redis import get_redis_connection
+
+from .models import LiveFeedPipeline
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_CONFIG_CHANNEL = 'live_feed:pipeline:config'
+PIPELINE_CONFIG_VERSION_SUFFIX = ':config_version'
+PIPELINE_CONFIG_MAX_BACKOFF_SECONDS = 30.0
+# Runners reload at least this often even if no change notification arrives.
+PIPELINE_CONFIG_SAFETY_REFRESH_SECONDS = 60.0
+# Saves touching any of these bump the pipeline's config version.
+RUNTIME_FIELDS = frozenset({'should_run', 'default_impact', 'config', 'category', 'source'})
+
+
+@dataclass(frozen=True)
+class PipelineRuntimeConfig:
+    """
+    What a runner needs from its LiveFeedPipeline row, read in one query.
+    Immutable: a change is picked up by loading a new snapshot, never by
+    editing this one. `config` is a private copy and must not be mutated.
+    """
+    pipeline_id: int
+    source: str
+    category_id: int
+    should_run: bool
+    default_impact: int
+    config: dict = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def load(cls, pipeline_id: int) -> Optional['PipelineRuntimeConfig']:
+        row = (
+            LiveFeedPipeline.objects
+            .filter(id=pipeline_id)
+            .values('source', 'category_id', 'should_run', 'default_impact', 'config')
+            .first()
+        )
+        if not row:
+            return None
+        raw_impact = row.get('default_impact')
+        return cls(
+            pipeline_id=int(pipeline_id),
+            source=str(row['source']),
+            category_id=int(row['category_id']),
+            should_run=bool(row['should_run']),
+            default_impact=max(0, min(2, int(2 if raw_impact is None else raw_impact))),
+            config=row['config'] if isinstance(row.get('config'), dict) else {},
+        )
+
+    def is_stale(self, max_age: float = PIPELINE_CONFIG_SAFETY_REFRESH_SECONDS) -> bool:
+        return time.monotonic() - self.loaded_at >= max_age
+
+
+class PipelineConfigNotifier:
+    """
+    Change notifications for pipeline runtime config. A committed save that
+    touches RUNTIME_FIELDS bumps `live_feed:pipeline:{id}:config_version` and
+    publishes {pipeline_id, version} on PIPELINE_CONFIG_CHANNEL; processes
+    running pipelines subscribe and tell the runner to reload. Pub/sub is
+    lossy, so runners also reload every PIPELINE_CONFIG_SAFETY_REFRESH_SECONDS.
+    """
+
+    def __init__(self, channel: str = PIPELINE_CONFIG_CHANNEL):
+        self.channel = channel
+        self._listeners: List[Callable[[int, int], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _redis(self):
+        return get_redis_connection("default")
+
+    @staticmethod
+    def version_key(pipeline_id: int) -> str:
+        return f'live_feed:pipeline:{int(pipeline_id)}{PIPELINE_CONFIG_VERSION_SUFFIX}'
+
+    def bump(self, pipeline_id: int) -> int:
+        try:
+            r = self._redis()
+            version = int(r.incr(self.version_key(pipeline_id)))
+            r.publish(self.channel, json.dumps({'pipeline_id': int(pipeline_id), 'version': version}))
+            return version
+        except Exception as e:
+            logger.warning("Pipeline config bump failed for pipeline=%s: %s", pipeline_id, e)
+            return 0
+
+    def subscribe(self, listener: Callable[[int, int], None]):
+        """Call `listener(pipeline_id, version)` on every change; starts the subscriber thread."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='live-feed-pipeline-config', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _dispatch(self, data: Any):
+        try:
+            message = json.loads(data)
+            pipeline_id = int(message['pipeline_id'])
+            version = int(message.get('version') or 0)
+        except (TypeError, ValueError, KeyError):
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(pipeline_id, version)
+            except Exception:
+                logger.exception("Pipeline config listener failed")
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self._dispatch(message.get('data'))
+            except Exception as e:
+                logger.warning("Pipeline config subscriber error: %s", e)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, PIPELINE_CONFIG_MAX_BACKOFF_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def connect_signals(self):
+        """Bump on admin saves; runner status writes use .update() and don't fire these."""
+        post_save.connect(self._on_pipeline_saved, sender=LiveFeedPipeline, dispatch_uid='live_feed_pipeline_config_save')
+        post_delete.connect(self._on_pipeline_deleted, sender=LiveFeedPipeline, dispatch_uid='live_feed_pipeline_config_delete')
+
+    def _bump_on_commit(self, pipeline_id: int):
+        try:
+            transaction.on_commit(lambda: self.bump(pipeline_id))
+        except Exception as e:
+            logger.warning("Pipeline config bump not scheduled for pipeline=%s: %s", pipeline_id, e)
+
+    def _on_pipeline_saved(self, sender, instance, update_fields=None, **kwargs):
+        if update_fields is not None and not RUNTIME_FIELDS.intersection(update_fields):
+            return
+        self._bump_on_commit(instance.id)
+
+    def _on_pipeline_deleted(self, sender, instance, **kwargs):
+        self._bump_on_commit(instance.id)
+
+
+pipeline_config_notifier = PipelineConfigNotifier()
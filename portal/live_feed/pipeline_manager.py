@@ -1,22 +1,27 @@
 from __future__ import annotations
 
+import itertools
 import json
 import logging
 import os
 import threading
 import time
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
 from django.db import close_old_connections
-from django.db.models import F
 from django_redis import get_redis_connection
 from websocket import WebSocketTimeoutException
 
-from .manager import hub_manager
+from .lease import RedisLease
+from .manager import PUBLISH_RESULT_TIMEOUT_SECONDS, hub_manager, in_process_agents_enabled
 from .models import LiveFeedPipeline, LiveFeedPipelineLog
+from .pipeline_config import PipelineRuntimeConfig, pipeline_config_notifier
+from .pipeline_stats import pipeline_stats
 from ..openai.jobs import enqueue_pipeline_translation_job, openai_is_available, resolve_pipeline_openai_mode
 from .pipelines import (
     build_pipeline_translation_request,
@@ -38,6 +43,21 @@ RECONNECT_BASE_DELAY = 2.0
 RECONNECT_MAX_DELAY = 45.0
 POLL_INTERVAL_SECONDS = 20.0
 DISCOVERY_INTERVAL_SECONDS = 300.0
+FETCH_POOL_MAX_WORKERS = 16
+
+# Live-item fetches from every runner share one pool; each source's
+# `fetch_concurrency` caps how many of its fetches run at once.
+_fetch_executor = ThreadPoolExecutor(max_workers=FETCH_POOL_MAX_WORKERS, thread_name_prefix='lf-pipeline-fetch')
+_fetch_slots: dict[str, threading.BoundedSemaphore] = {}
+_fetch_slots_lock = threading.Lock()
+
+
+def _fetch_slot(source: str, limit: int) -> threading.BoundedSemaphore:
+    with _fetch_slots_lock:
+        slot = _fetch_slots.get(source)
+        if slot is None:
+            slot = _fetch_slots[source] = threading.BoundedSemaphore(max(1, limit))
+        return slot
 
 
 class RestartPipelineLoop(Exception):
@@ -63,12 +83,18 @@ class LiveFeedPipelineRunner:
         self.manager = manager
         self.pipeline_id = int(pipeline_id)
         self.stop_event = threading.Event()
+        # Set when the agent drains: the pipeline should keep running elsewhere.
+        self.handoff = False
+        # Set when another instance took the lease; it owns status from then on.
+        self.lease_lost = False
         self.thread = threading.Thread(target=self.run, daemon=True, name=f'lf-pipeline-{pipeline_id}')
         self.ws = None
         self.stats = PipelineStats()
         self.known_ids: set[int] = set()
         self.last_slug = ''
         self.pending_redirect_slug: str | None = None
+        self.runtime: PipelineRuntimeConfig | None = None
+        self._runtime_changed = threading.Event()
 
     def start(self):
         self.thread.start()
@@ -84,15 +110,28 @@ class LiveFeedPipelineRunner:
     def is_alive(self) -> bool:
         return self.thread.is_alive()
 
-    def _pipeline(self) -> LiveFeedPipeline | None:
-        return LiveFeedPipeline.objects.filter(id=self.pipeline_id).select_related('category').first()
+    def invalidate_runtime(self):
+        """Called on a config change notification; the next read reloads."""
+        self._runtime_changed.set()
+
+    def _runtime_config(self) -> PipelineRuntimeConfig | None:
+        """Current snapshot, reloaded only after a change notification or once it is stale."""
+        runtime = self.runtime
+        if runtime is None or self._runtime_changed.is_set() or runtime.is_stale():
+            self._runtime_changed.clear()
+            runtime = self.runtime = PipelineRuntimeConfig.load(self.pipeline_id)
+        return runtime
 
     def _refresh_owner(self):
-        self.manager.refresh_owner(self.pipeline_id)
+        if self.manager.refresh_owner(self.pipeline_id):
+            return
+        self.lease_lost = True
+        self.stop_event.set()
+        logger.warning("Pipeline %s lease lost to another instance; stopping", self.pipeline_id)
 
     def _check_should_run(self) -> bool:
-        record = LiveFeedPipeline.objects.filter(id=self.pipeline_id).values('should_run').first()
-        return bool(record and record['should_run'])
+        runtime = self._runtime_config()
+        return bool(runtime and runtime.should_run)
 
     @staticmethod
     def _has_connected_hubs() -> bool:
@@ -146,32 +185,11 @@ class LiveFeedPipelineRunner:
 
     def _increment_seen(self):
         self.stats.seen += 1
-        LiveFeedPipeline.objects.filter(id=self.pipeline_id).update(
-            total_seen=F('total_seen') + 1,
-            last_activity_at=datetime.now(timezone.utc),
-        )
+        pipeline_stats.incr(self.pipeline_id, 'total_seen')
 
     def _increment_published(self):
         self.stats.published += 1
-        LiveFeedPipeline.objects.filter(id=self.pipeline_id).update(
-            total_published=F('total_published') + 1,
-            last_activity_at=datetime.now(timezone.utc),
-        )
-
-    def _current_default_impact(self, fallback: int = 2) -> int:
-        row = LiveFeedPipeline.objects.filter(id=self.pipeline_id).values('default_impact').first()
-        if not row:
-            return max(0, min(2, int(fallback)))
-        raw_impact = row.get('default_impact')
-        if raw_impact is None:
-            raw_impact = fallback
-        return max(0, min(2, int(raw_impact)))
-
-    def _current_pipeline_config(self, fallback: Any = None) -> dict[str, Any]:
-        row = LiveFeedPipeline.objects.filter(id=self.pipeline_id).values('config').first()
-        if row and isinstance(row.get('config'), dict):
-            return row['config']
-        return fallback if isinstance(fallback, dict) else {}
+        pipeline_stats.incr(self.pipeline_id, 'total_published')
 
     @staticmethod
     def _resolve_only_breaking_news(config: Any, fallback: bool = True) -> bool:
@@ -189,162 +207,247 @@ class LiveFeedPipelineRunner:
             return False
         return bool(fallback)
 
+    def _fetch_live_items(self, client, source: str, child_ids: list[int]):
+        """
+        Yield (child_id, item) in `child_ids` order while keeping up to
+        `client.fetch_concurrency` fetches in flight. The deque of futures is
+        the reorder buffer: a fast later fetch waits for the earlier ones. A
+        fetch error is raised at its place in the order.
+        """
+        limit = max(1, int(getattr(client, 'fetch_concurrency', 1) or 1))
+        slot = _fetch_slot(source, limit)
+
+        def fetch(child_id: int):
+            if self.stop_event.is_set():
+                return None
+            return client.fetch_live_item(child_id=child_id)
+
+        def take_slot(wait: bool) -> bool:
+            # The source slot is taken before submitting, so only runnable
+            # fetches occupy the shared pool's threads.
+            if not wait:
+                return slot.acquire(blocking=False)
+            while not slot.acquire(timeout=0.5):
+                if self.stop_event.is_set():
+                    return False
+            return True
+
+        remaining = iter(child_ids)
+        in_flight = deque()
+        try:
+            while True:
+                while len(in_flight) < limit and not self.stop_event.is_set():
+                    child_id = next(remaining, None)
+                    if child_id is None:
+                        break
+                    # With fetches already in flight, yield those rather than wait.
+                    if not take_slot(wait=not in_flight):
+                        remaining = itertools.chain((child_id,), remaining)
+                        break
+                    try:
+                        future = _fetch_executor.submit(fetch, child_id)
+                    except BaseException:
+                        slot.release()
+                        raise
+                    # Also runs for a future cancelled below.
+                    future.add_done_callback(lambda _: slot.release())
+                    in_flight.append((child_id, future))
+                if not in_flight:
+                    return
+                child_id, future = in_flight.popleft()
+                yield child_id, future.result()
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+
     def _process_child_ids(
         self,
         client,
         *,
-        pipeline: LiveFeedPipeline,
+        runtime: PipelineRuntimeConfig,
         child_ids: list[int],
-        category_id: int,
         current_slug: str = '',
     ) -> str | None:
         """Process new child IDs. Returns redirect slug if closing item detected."""
-        default_impact = self._current_default_impact()
-        runtime_config = self._current_pipeline_config(pipeline.config)
+        category_id = runtime.category_id
+        default_impact = runtime.default_impact
+        runtime_config = runtime.config
         only_breaking_news = self._resolve_only_breaking_news(runtime_config, fallback=True)
         new_ids = [child_id for child_id in child_ids if child_id not in self.known_ids]
         if not new_ids:
             return None
 
         redirect_slug = None
-        for child_id in reversed(new_ids):
-            if self.stop_event.is_set() or not self._check_should_run():
-                return redirect_slug
+        # Publishes are queued and resolved after the scan so a burst of new
+        # children goes out as one coalesced frame per hub.
+        pending_publishes = []
+        try:
+            for child_id, item in self._fetch_live_items(client, runtime.source, list(reversed(new_ids))):
+                if self.stop_event.is_set() or not self._check_should_run():
+                    break
 
-            self.known_ids.add(child_id)
-            self._increment_seen()
+                self.known_ids.add(child_id)
+                self._increment_seen()
 
-            item = client.fetch_live_item(child_id=child_id)
-            if not item:
-                continue
+                if not item:
+                    continue
 
-            if current_slug and not redirect_slug:
-                detected_redirect = detect_closing_with_redirect(item, current_slug)
-                if detected_redirect:
-                    redirect_slug = detected_redirect
-                    self.manager.log(
-                        self.pipeline_id,
-                        event_type=LiveFeedPipelineLog.EventType.UPDATE,
-                        level=LiveFeedPipelineLog.LogLevel.INFO,
-                        message=f'Detected liveblog closing with redirect to: {redirect_slug}',
-                        details={'from_slug': current_slug, 'to_slug': redirect_slug, 'child_id': child_id},
-                    )
+                if current_slug and not redirect_slug:
+                    detected_redirect = detect_closing_with_redirect(item, current_slug)
+                    if detected_redirect:
+                        redirect_slug = detected_redirect
+                        self.manager.log(
+                            self.pipeline_id,
+                            event_type=LiveFeedPipelineLog.EventType.UPDATE,
+                            level=LiveFeedPipelineLog.LogLevel.INFO,
+                            message=f'Detected liveblog closing with redirect to: {redirect_slug}',
+                            details={'from_slug': current_slug, 'to_slug': redirect_slug, 'child_id': child_id},
+                        )
 
-            if only_breaking_news and not is_breaking_item(item):
-                continue
+                if only_breaking_news and not is_breaking_item(item):
+                    continue
 
-            title = str(item.get('title') or '').strip()
-            if not title:
-                continue
+                title = str(item.get('title') or '').strip()
+                if not title:
+                    continue
+
+                timestamp = item.get('date') or item.get('timestamp')
+                mode = resolve_pipeline_openai_mode(runtime.source, pipeline_config=runtime_config)
+                if mode != 'off' and openai_is_available():
+                    try:
+                        translation_request = build_pipeline_translation_request(
+                            runtime.source,
+                            title=title,
+                        )
+                        job, created = enqueue_pipeline_translation_job(
+                            pipeline_id=int(self.pipeline_id),
+                            source=runtime.source,
+                            source_item_id=str(child_id),
+                            category_id=category_id,
+                            impact=max(0, min(2, int(default_impact))),
+                            timestamp=(str(timestamp) if timestamp else ''),
+                            original_title=title,
+                            system_prompt=str(translation_request.get('system_prompt') or ''),
+                            user_payload=translation_request.get('user_payload') or {},
+                            response_schema=translation_request.get('response_schema') or {},
+                            pipeline_config=runtime_config,
+                        )
+                    except Exception as exc:
+                        self.manager.log(
+                            self.pipeline_id,
+                            event_type=LiveFeedPipelineLog.EventType.ERROR,
+                            level=LiveFeedPipelineLog.LogLevel.ERROR,
+                            message=f'Failed to queue translation job for child_id={child_id}: {exc}',
+                        )
+                        continue
+
+                    if created and job:
+                        self.manager.log(
+                            self.pipeline_id,
+                            event_type=LiveFeedPipelineLog.EventType.UPDATE,
+                            level=LiveFeedPipelineLog.LogLevel.INFO,
+                            message='Queued OpenAI translation job',
+                            details={
+                                'child_id': child_id,
+                                'openai_job_id': job.id,
+                                'mode': job.mode,
+                            },
+                        )
+                    else:
+                        self.manager.log(
+                            self.pipeline_id,
+                            event_type=LiveFeedPipelineLog.EventType.UPDATE,
+                            level=LiveFeedPipelineLog.LogLevel.DEBUG,
+                            message='Skipped duplicate OpenAI translation job',
+                            details={'child_id': child_id},
+                        )
+                    continue
 
-            timestamp = item.get('date') or item.get('timestamp')
-            mode = resolve_pipeline_openai_mode(pipeline.source, pipeline_config=runtime_config)
-            if mode != 'off' and openai_is_available():
+                impact = max(0, min(2, int(default_impact)))
+                future = hub_manager.publish_item_async(
+                    hub='all',
+                    category_id=category_id,
+                    title=title,
+                    impact=impact,
+                    timestamp=timestamp,
+                )
+                pending_publishes.append((future, child_id, title, impact))
+        finally:
+            # Items already handed to publish_item_async go out regardless;
+            # record them even when a fetch error ends the scan early.
+            for future, child_id, title, impact in pending_publishes:
                 try:
-                    translation_request = build_pipeline_translation_request(
-                        pipeline.source,
-                        title=title,
-                    )
-                    job, created = enqueue_pipeline_translation_job(
-                        pipeline_id=int(self.pipeline_id),
-                        source=str(pipeline.source),
-                        source_item_id=str(child_id),
-                        category_id=int(pipeline.category_id),
-                        impact=max(0, min(2, int(default_impact))),
-                        timestamp=(str(timestamp) if timestamp else ''),
-                        original_title=title,
-                        system_prompt=str(translation_request.get('system_prompt') or ''),
-                        user_payload=translation_request.get('user_payload') or {},
-                        response_schema=translation_request.get('response_schema') or {},
-                        pipeline_config=runtime_config,
-                    )
+                    publish_result = future.result(timeout=PUBLISH_RESULT_TIMEOUT_SECONDS)
                 except Exception as exc:
-                    self.manager.log(
-                        self.pipeline_id,
-                        event_type=LiveFeedPipelineLog.EventType.ERROR,
-                        level=LiveFeedPipelineLog.LogLevel.ERROR,
-                        message=f'Failed to queue translation job for child_id={child_id}: {exc}',
-                    )
-                    continue
+                    publish_result = {'success': False, 'error': f'Publish did not complete: {exc}'}
+                self._record_publish_result(
+                    publish_result,
+                    child_id=child_id,
+                    title=title,
+                    category_id=category_id,
+                    impact=impact,
+                    only_breaking_news=only_breaking_news,
+                )
 
-                if created and job:
-                    self.manager.log(
-                        self.pipeline_id,
-                        event_type=LiveFeedPipelineLog.EventType.UPDATE,
-                        level=LiveFeedPipelineLog.LogLevel.INFO,
-                        message='Queued OpenAI translation job',
-                        details={
-                            'child_id': child_id,
-                            'openai_job_id': job.id,
-                            'mode': job.mode,
-                        },
-                    )
-                else:
-                    self.manager.log(
-                        self.pipeline_id,
-                        event_type=LiveFeedPipelineLog.EventType.UPDATE,
-                        level=LiveFeedPipelineLog.LogLevel.DEBUG,
-                        message='Skipped duplicate OpenAI translation job',
-                        details={'child_id': child_id},
-                    )
-                continue
+        return redirect_slug
 
-            publish_result = hub_manager.publish_item(
-                hub='all',
-                category_id=category_id,
-                title=title,
-                impact=max(0, min(2, int(default_impact))),
-                timestamp=timestamp,
+    def _record_publish_result(
+        self,
+        publish_result: dict,
+        *,
+        child_id: int,
+        title: str,
+        category_id: int,
+        impact: int,
+        only_breaking_news: bool,
+    ):
+        success = bool(publish_result.get('success'))
+        result_map = publish_result.get('results') if isinstance(publish_result, dict) else {}
+        successful_hubs = []
+        failed_hubs = []
+        if isinstance(result_map, dict):
+            for hub_name, hub_result in result_map.items():
+                if isinstance(hub_result, dict) and hub_result.get('success'):
+                    successful_hubs.append(hub_name)
+                else:
+                    failed_hubs.append(hub_name)
+        if success:
+            self._increment_published()
+            self.manager.log(
+                self.pipeline_id,
+                event_type=LiveFeedPipelineLog.EventType.PUBLISH,
+                level=LiveFeedPipelineLog.LogLevel.INFO,
+                message=f'Published title: "{title[:120]}"',
+                details={
+                    'child_id': child_id,
+                    'category_id': category_id,
+                    'impact': impact,
+                    'only_breaking_news': only_breaking_news,
+                    'successful_hubs': successful_hubs,
+                    'failed_hubs': failed_hubs,
+                },
             )
-            success = bool(publish_result.get('success'))
-            result_map = publish_result.get('results') if isinstance(publish_result, dict) else {}
-            successful_hubs = []
-            failed_hubs = []
-            if isinstance(result_map, dict):
-                for hub_name, hub_result in result_map.items():
-                    if isinstance(hub_result, dict) and hub_result.get('success'):
-                        successful_hubs.append(hub_name)
-                    else:
-                        failed_hubs.append(hub_name)
-            if success:
-                self._increment_published()
-                self.manager.log(
-                    self.pipeline_id,
-                    event_type=LiveFeedPipelineLog.EventType.PUBLISH,
-                    level=LiveFeedPipelineLog.LogLevel.INFO,
-                    message=f'Published title: "{title[:120]}"',
-                    details={
-                        'child_id': child_id,
-                        'category_id': category_id,
-                        'impact': max(0, min(2, int(default_impact))),
-                        'only_breaking_news': only_breaking_news,
-                        'successful_hubs': successful_hubs,
-                        'failed_hubs': failed_hubs,
-                    },
-                )
-                if failed_hubs:
-                    self.manager.log(
-                        self.pipeline_id,
-                        event_type=LiveFeedPipelineLog.EventType.UPDATE,
-                        level=LiveFeedPipelineLog.LogLevel.WARNING,
-                        message='Partial publish: some hubs did not receive item',
-                        details={'child_id': child_id, 'failed_hubs': failed_hubs},
-                    )
-            else:
+            if failed_hubs:
                 self.manager.log(
                     self.pipeline_id,
-                    event_type=LiveFeedPipelineLog.EventType.ERROR,
-                    level=LiveFeedPipelineLog.LogLevel.ERROR,
-                    message='Failed to publish title to hubs',
-                    details={
-                        'child_id': child_id,
-                        'category_id': category_id,
-                        'only_breaking_news': only_breaking_news,
-                        'result': publish_result,
-                    },
+                    event_type=LiveFeedPipelineLog.EventType.UPDATE,
+                    level=LiveFeedPipelineLog.LogLevel.WARNING,
+                    message='Partial publish: some hubs did not receive item',
+                    details={'child_id': child_id, 'failed_hubs': failed_hubs},
                 )
-        
-        return redirect_slug
+        else:
+            self.manager.log(
+                self.pipeline_id,
+                event_type=LiveFeedPipelineLog.EventType.ERROR,
+                level=LiveFeedPipelineLog.LogLevel.ERROR,
+                message='Failed to publish title to hubs',
+                details={
+                    'child_id': child_id,
+                    'category_id': category_id,
+                    'only_breaking_news': only_breaking_news,
+                    'result': publish_result,
+                },
+            )
 
     def run(self):
         close_old_connections()
@@ -365,11 +468,11 @@ class LiveFeedPipelineRunner:
                 if not self._check_should_run():
                     break
 
-                pipeline = self._pipeline()
-                if not pipeline:
+                runtime = self._runtime_config()
+                if not runtime:
                     break
                 try:
-                    client = get_pipeline_client(pipeline.source)
+                    client = get_pipeline_client(runtime.source)
                 except ValueError as exc:
                     raise RuntimeError(str(exc)) from exc
 
@@ -451,9 +554,8 @@ class LiveFeedPipelineRunner:
                     else:
                         redirect = self._process_child_ids(
                             client,
-                            pipeline=pipeline,
+                            runtime=runtime,
                             child_ids=current_children,
-                            category_id=int(pipeline.category_id),
                             current_slug=target.slug,
                         )
                         self.known_ids.update(current_children)
@@ -496,9 +598,8 @@ class LiveFeedPipelineRunner:
                                 child_ids = extract_children_from_ws_message(message)
                                 redirect = self._process_child_ids(
                                     client,
-                                    pipeline=pipeline,
+                                    runtime=self._runtime_config() or runtime,
                                     child_ids=child_ids,
-                                    category_id=int(pipeline.category_id),
                                     current_slug=target.slug,
                                 )
                                 self.known_ids.update(child_ids)
@@ -515,9 +616,8 @@ class LiveFeedPipelineRunner:
                             polled_children = client.fetch_children_only(slug=target.slug)
                             redirect = self._process_child_ids(
                                 client,
-                                pipeline=pipeline,
+                                runtime=self._runtime_config() or runtime,
                                 child_ids=polled_children,
-                                category_id=int(pipeline.category_id),
                                 current_slug=target.slug,
                             )
                             self.known_ids.update(polled_children)
@@ -567,14 +667,21 @@ class LiveFeedPipelineRunner:
                         self.ws = None
         finally:
             close_old_connections()
+            pipeline_stats.flush()
             snapshot = LiveFeedPipeline.objects.filter(id=self.pipeline_id).values('should_run', 'last_error').first()
             should_run = bool(snapshot and snapshot.get('should_run'))
             preserved_error = str((snapshot or {}).get('last_error') or '')
-            self._set_status(
-                LiveFeedPipeline.Status.STOPPED if not should_run else LiveFeedPipeline.Status.ERROR,
-                error=preserved_error if not should_run else 'Pipeline stopped unexpectedly',
-                stopped=True,
-            )
+            if self.lease_lost:
+                # The instance that took the lease reports status from now on.
+                pass
+            elif should_run and self.handoff:
+                self._set_status(LiveFeedPipeline.Status.STARTING, stopped=True)
+            else:
+                self._set_status(
+                    LiveFeedPipeline.Status.STOPPED if not should_run else LiveFeedPipeline.Status.ERROR,
+                    error=preserved_error if not should_run else 'Pipeline stopped unexpectedly',
+                    stopped=True,
+                )
             self.manager.release_owner(self.pipeline_id)
             self.manager.log(
                 self.pipeline_id,
@@ -606,6 +713,13 @@ class LiveFeedPipelineManager:
         self._stop_event = threading.Event()
         self._runners: dict[int, LiveFeedPipelineRunner] = {}
         self._lock = threading.Lock()
+        self.agent_mode = False
+        self.leases = RedisLease(self._redis, OWNER_TTL_SECONDS)
+
+    @property
+    def runs_pipelines(self) -> bool:
+        """False in client mode: runners only exist in the live feed agent."""
+        return self.agent_mode or in_process_agents_enabled()
 
     @staticmethod
     def _decode(value: Any) -> str:
@@ -624,9 +738,12 @@ class LiveFeedPipelineManager:
         return get_redis_connection('default')
 
     def start_monitor(self):
+        if not self.runs_pipelines:
+            return
         if self._monitor_thread and self._monitor_thread.is_alive():
             return
         self._stop_event.clear()
+        pipeline_config_notifier.subscribe(self._on_config_changed)
         self._monitor_thread = threading.Thread(
             target=self._run_monitor,
             daemon=True,
@@ -641,6 +758,25 @@ class LiveFeedPipelineManager:
         for runner in runners:
             runner.stop()
 
+    def drain(self, timeout: float) -> int:
+        """
+        Agent shutdown: stop reconciling and stop local runners without
+        clearing should_run, so the next agent picks them up. Returns the
+        number of runners stopped.
+        """
+        deadline = time.monotonic() + timeout
+        self._stop_event.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(max(0.0, min(MONITOR_INTERVAL_SECONDS + 1, deadline - time.monotonic())))
+        with self._lock:
+            runners = list(self._runners.values())
+        for runner in runners:
+            runner.handoff = True
+            runner.stop()
+        for runner in runners:
+            runner.thread.join(max(0.0, deadline - time.monotonic()))
+        return len(runners)
+
     def get_owner(self, pipeline_id: int) -> str:
         key = self._owner_key(pipeline_id)
         try:
@@ -649,34 +785,26 @@ class LiveFeedPipelineManager:
             return ''
 
     def claim_owner(self, pipeline_id: int) -> bool:
-        key = self._owner_key(pipeline_id)
         try:
-            redis = self._redis()
-            current = self._decode(redis.get(key)).strip()
-            if current == self.instance_id:
-                redis.expire(key, OWNER_TTL_SECONDS)
-                return True
-            return bool(redis.set(key, self.instance_id, nx=True, ex=OWNER_TTL_SECONDS))
+            token, _ = self.leases.acquire(self._owner_key(pipeline_id), self.instance_id)
         except Exception:
             return False
+        return bool(token)
 
-    def refresh_owner(self, pipeline_id: int):
-        key = self._owner_key(pipeline_id)
+    def refresh_owner(self, pipeline_id: int) -> bool:
+        """
+        Extend our lease. False only when another instance holds it; a Redis
+        error keeps the runner going, as a brief outage shouldn't stop it.
+        """
         try:
-            redis = self._redis()
-            current = self._decode(redis.get(key)).strip()
-            if current in ('', self.instance_id):
-                redis.set(key, self.instance_id, ex=OWNER_TTL_SECONDS)
+            token, _ = self.leases.renew(self._owner_key(pipeline_id), self.instance_id)
         except Exception:
-            pass
+            return True
+        return bool(token)
 
     def release_owner(self, pipeline_id: int):
-        key = self._owner_key(pipeline_id)
         try:
-            redis = self._redis()
-            current = self._decode(redis.get(key)).strip()
-            if current == self.instance_id:
-                redis.delete(key)
+            self.leases.release(self._owner_key(pipeline_id), self.instance_id)
         except Exception:
             pass
 
@@ -693,8 +821,17 @@ class LiveFeedPipelineManager:
         )
 
     def request_reconcile(self):
+        if not self.runs_pipelines:
+            # The agent's monitor picks the change up on its next pass.
+            return
         self._reconcile_once()
 
+    def _on_config_changed(self, pipeline_id: int, version: int):
+        with self._lock:
+            runner = self._runners.get(int(pipeline_id))
+        if runner:
+            runner.invalidate_runtime()
+
     def stop_local_runner(self, pipeline_id: int):
         with self._lock:
             runner = self._runners.get(int(pipeline_id))
@@ -0,0 +1,113 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from django.db import close_old_connections
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .models import LiveFeedPipeline
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_STATS_FLUSH_INTERVAL_SECONDS = 2.0
+PIPELINE_STATS_FIELDS = ('total_seen', 'total_published')
+
+
+class PipelineStatsAggregator:
+    """
+    In-process buffer for LiveFeedPipeline counters. `incr` adds to a
+    per-pipeline Counter; a background thread writes each pipeline's deltas
+    every `interval` seconds as one UPDATE using F() increments, instead of
+    one row-locking UPDATE per item. `last_activity_at` only moves forward
+    (GREATEST), so a late flush can't rewind a newer status write.
+
+    Runners flush when they stop; anything still buffered is flushed at
+    exit. Admin views add `pending()` to the row for live totals, which only
+    covers increments made in the same process.
+    """
+
+    def __init__(self, interval: float = PIPELINE_STATS_FLUSH_INTERVAL_SECONDS):
+        self.interval = interval
+        self._deltas: Dict[int, Counter] = {}
+        self._activity: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def incr(self, pipeline_id: int, field: str, amount: int = 1):
+        if field not in PIPELINE_STATS_FIELDS:
+            raise ValueError(f'Unknown pipeline stats field: {field}')
+        pipeline_id = int(pipeline_id)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._deltas.setdefault(pipeline_id, Counter())[field] += int(amount)
+            self._activity[pipeline_id] = now
+        if self._thread is None or not self._thread.is_alive():
+            self._ensure_thread()
+
+    def pending(self, pipeline_id: int) -> dict:
+        """Unflushed deltas for one pipeline, plus its latest activity time (or None)."""
+        pipeline_id = int(pipeline_id)
+        with self._lock:
+            counts = Counter(self._deltas.get(pipeline_id) or {})
+            last_activity = self._activity.get(pipeline_id)
+        pending = {field: int(counts.get(field, 0)) for field in PIPELINE_STATS_FIELDS}
+        pending['last_activity_at'] = last_activity
+        return pending
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='live-feed-pipeline-stats', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Pipeline stats flush failed: %s", e)
+            finally:
+                close_old_connections()
+
+    def flush(self) -> int:
+        """Write buffered deltas. Returns the number of pipelines updated."""
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._deltas = self._deltas, {}
+                activity, self._activity = self._activity, {}
+            written = 0
+            for pipeline_id, counts in deltas.items():
+                updates = {field: F(field) + amount for field, amount in counts.items() if amount}
+                last_activity = activity.get(pipeline_id)
+                if last_activity is not None:
+                    updates['last_activity_at'] = Greatest(F('last_activity_at'), Value(last_activity))
+                if not updates:
+                    continue
+                try:
+                    LiveFeedPipeline.objects.filter(id=pipeline_id).update(**updates)
+                    written += 1
+                except Exception as e:
+                    # Merge back so the next flush retries; Counters don't grow with the backlog.
+                    self._restore(pipeline_id, counts, last_activity)
+                    logger.warning("Pipeline stats flush failed for pipeline=%s (kept): %s", pipeline_id, e)
+            return written
+
+    def _restore(self, pipeline_id: int, counts: Counter, last_activity: Optional[datetime]):
+        with self._lock:
+            self._deltas.setdefault(pipeline_id, Counter()).update(counts)
+            if last_activity is not None:
+                current = self._activity.get(pipeline_id)
+                self._activity[pipeline_id] = max(current, last_activity) if current else last_activity
+
+
+pipeline_stats = PipelineStatsAggregator()
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 import json
+import http.client
 import re
-import urllib.error
 import urllib.parse
-import urllib.request
 from typing import Any
 
 from django.conf import settings
@@ -163,6 +162,8 @@ def extract_children_from_ws_message(message: dict[str, Any]) -> list[int]:
 
 
 class AlJazeeraLiveClient(BasePipelineClient):
+    fetch_concurrency = 4
+
     def __init__(
         self,
         *,
@@ -203,15 +204,13 @@ class AlJazeeraLiveClient(BasePipelineClient):
             "variables": json.dumps(variables, separators=(",", ":")),
         }
         url = f"{GRAPHQL_ENDPOINT}?{urllib.parse.urlencode(params, quote_via=urllib.parse.quote)}"
-        request = urllib.request.Request(url, headers=self._headers(), method="GET")
         try:
-            with urllib.request.urlopen(request, timeout=self.http_timeout) as response:
-                body = response.read().decode("utf-8", errors="replace")
-        except urllib.error.HTTPError as exc:
-            detail = exc.read().decode("utf-8", errors="replace")
-            raise RuntimeError(f"GraphQL HTTP {exc.code}: {detail[:350]}") from exc
-        except urllib.error.URLError as exc:
+            response = self.http.get(url, headers=self._headers(), timeout=self.http_timeout)
+        except (OSError, http.client.HTTPException, ValueError) as exc:
             raise RuntimeError(f"GraphQL URL error: {exc}") from exc
+        body = response.text()
+        if response.status >= 400:
+            raise RuntimeError(f"GraphQL HTTP {response.status}: {body[:350]}")
 
         try:
             return json.loads(body)
@@ -236,7 +235,7 @@ class AlJazeeraLiveClient(BasePipelineClient):
         return parts[-1] if parts else ""
 
     def fetch_homepage_live_links(self) -> list[str]:
-        request = urllib.request.Request(
+        response = self.http.get(
             BASE_URL + "/",
             headers={
                 "User-Agent": self.user_agent,
@@ -244,10 +243,11 @@ class AlJazeeraLiveClient(BasePipelineClient):
                 "Referer": BASE_URL + "/",
                 "Accept-Language": "en-US,en;q=0.9",
             },
-            method="GET",
+            timeout=self.http_timeout,
         )
-        with urllib.request.urlopen(request, timeout=self.http_timeout) as response:
-            html = response.read().decode("utf-8", errors="replace")
+        if response.status >= 400:
+            raise RuntimeError(f"Homepage HTTP {response.status}")
+        html = response.text()
         links = [self.normalize_liveblog_link(match.group(0)) for match in LIVEBLOG_LINK_RE.finditer(html)]
         seen: set[str] = set()
         out: list[str] = []
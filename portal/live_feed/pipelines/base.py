@@ -5,6 +5,8 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any
 
+from .http_pool import PooledHTTPClient, shared_http_client
+
 
 @dataclass(frozen=True)
 class PipelineSourceDefinition:
@@ -22,6 +24,10 @@ class LiveTarget:
 
 class BasePipelineClient(ABC):
     ws_timeout: float
+    # Keep-alive pool shared by every client in the process.
+    http: PooledHTTPClient = shared_http_client
+    # Live items a pipeline may fetch at once; shared by all pipelines of a source.
+    fetch_concurrency: int = 1
 
     @abstractmethod
     def discover_latest_live_target(self) -> LiveTarget:
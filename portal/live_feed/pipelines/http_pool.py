@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    import brotli
+except ImportError:  # optional: br is only advertised when it can be decoded
+    brotli = None
+
+DEFAULT_MAX_PER_HOST = 8
+DEFAULT_TIMEOUT_SECONDS = 20.0
+# Servers commonly drop idle keep-alive sockets after ~60s; retire ours first.
+DEFAULT_IDLE_TIMEOUT_SECONDS = 50.0
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+# Errors meaning a reused keep-alive socket was already closed by the server.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+@dataclass
+class HTTPResult:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    reused: bool = False
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+@dataclass
+class _HostPool:
+    slots: threading.BoundedSemaphore
+    idle: list = field(default_factory=list)  # [(connection, last_used)], most recent last
+
+
+class PooledHTTPClient:
+    """
+    Thread-safe keep-alive HTTP/1.1 client on http.client. Connections are
+    pooled per (scheme, host, port) and reused LIFO; `max_per_host` caps
+    concurrent requests to one host, and callers wait for a free slot up to
+    the request timeout. Responses are read fully and decoded from
+    gzip/deflate (and br when `brotli` is installed).
+
+    A GET that fails on a reused socket the server had already closed is
+    retried once on a fresh connection.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+    ):
+        self.max_per_host = max(1, int(max_per_host))
+        self.timeout = float(timeout)
+        self.idle_timeout = float(idle_timeout)
+        self._pools: dict[tuple[str, str, int], _HostPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, key: tuple[str, str, int]) -> _HostPool:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _HostPool(slots=threading.BoundedSemaphore(self.max_per_host))
+            return pool
+
+    @staticmethod
+    def _split(url: str) -> tuple[tuple[str, str, int], str]:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        return (scheme, parts.hostname, port), target
+
+    def _checkout(self, key: tuple[str, str, int], pool: _HostPool, timeout: float, fresh: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            while pool.idle and not fresh:
+                conn, last_used = pool.idle.pop()
+                if now - last_used < self.idle_timeout:
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, port, timeout=timeout), False
+
+    def _checkin(self, pool: _HostPool, conn):
+        with self._lock:
+            pool.idle.append((conn, time.monotonic()))
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        timeout: float | None = None,
+    ) -> HTTPResult:
+        timeout = self.timeout if timeout is None else float(timeout)
+        key, target = self._split(url)
+        pool = self._pool(key)
+        if not pool.slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No free connection to {key[1]} within {timeout:g}s")
+        try:
+            request_headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+            conn, reused = self._checkout(key, pool, timeout)
+            try:
+                return self._send(pool, conn, reused, method, target, request_headers, body)
+            except STALE_CONNECTION_ERRORS:
+                if not reused or method.upper() != "GET":
+                    raise
+            conn, _ = self._checkout(key, pool, timeout, fresh=True)
+            return self._send(pool, conn, False, method, target, request_headers, body)
+        finally:
+            pool.slots.release()
+
+    def get(self, url: str, **kwargs) -> HTTPResult:
+        """GET, following up to MAX_REDIRECTS redirects as urlopen did."""
+        for _ in range(MAX_REDIRECTS):
+            result = self.request("GET", url, **kwargs)
+            location = result.headers.get("location")
+            if result.status not in REDIRECT_STATUSES or not location:
+                return result
+            url = urllib.parse.urljoin(url, location)
+        return self.request("GET", url, **kwargs)
+
+    def _send(self, pool: _HostPool, conn, reused: bool, method: str, target: str,
+              headers: dict[str, str], body: bytes | None) -> HTTPResult:
+        try:
+            conn.request(method, target, body=body, headers=headers)
+            response = conn.getresponse()
+            raw = response.read()
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(pool, conn)
+        return HTTPResult(
+            status=response.status,
+            headers={name.lower(): value for name, value in response.getheaders()},
+            body=self._decode(raw, response.getheader("Content-Encoding", "")),
+            reused=reused,
+        )
+
+    @staticmethod
+    def _decode(raw: bytes, content_encoding: str) -> bytes:
+        for encoding in reversed([part.strip().lower() for part in content_encoding.split(",") if part.strip()]):
+            if encoding in ("gzip", "x-gzip"):
+                raw = gzip.decompress(raw)
+            elif encoding == "deflate":
+                try:
+                    raw = zlib.decompress(raw)
+                except zlib.error:
+                    raw = zlib.decompress(raw, -zlib.MAX_WBITS)  # raw deflate, no zlib header
+            elif encoding == "br" and brotli is not None:
+                raw = brotli.decompress(raw)
+            elif encoding != "identity":
+                raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+        return raw
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            for conn, _ in pool.idle:
+                conn.close()
+
+
+shared_http_client = PooledHTTPClient()
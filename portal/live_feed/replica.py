@@ -0,0 +1,155 @@
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HUB_STATE_CHANNEL = 'live_feed:hub_states'
+HUB_STATE_REPLICA_REFRESH_SECONDS = 15.0
+HUB_STATE_REPLICA_MAX_BACKOFF_SECONDS = 30.0
+
+
+class HubStateReplica:
+    """
+    In-process mirror of the shared hub state (`:state` hash and `:owner`
+    key per hub). Writers publish every change on HUB_STATE_CHANNEL; a
+    subscriber thread applies them here, and a pipelined full reload runs
+    every `refresh_interval` seconds to catch anything pub/sub can't see
+    (owner keys expiring, messages missed while disconnected).
+
+    Entries are raw: {hub: {'state': {field: str} or None, 'owner': str}}.
+    A message may carry a `request_id`, which is handed to `on_reply` after
+    the state is applied so request/reply callers can stop waiting.
+    """
+
+    def __init__(self, redis_factory: Callable, loader: Callable[[], Dict[str, dict]],
+                 channel: str = HUB_STATE_CHANNEL,
+                 refresh_interval: float = HUB_STATE_REPLICA_REFRESH_SECONDS,
+                 on_reply: Optional[Callable[[str, str], None]] = None):
+        self._redis = redis_factory
+        self._loader = loader
+        self._on_reply = on_reply
+        self.channel = channel
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._subscribed = False
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def get(self) -> Dict[str, dict]:
+        self._ensure_thread()
+        stale = time.monotonic() - self._loaded_at > self.refresh_interval
+        if not self._loaded_at or (stale and not self._subscribed):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Hub state replica refresh failed: %s", e)
+        with self._lock:
+            return {hub: dict(entry) for hub, entry in self._entries.items()}
+
+    def refresh(self):
+        entries = self._loader()
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+
+    def apply(self, hub: str, *, state: Optional[dict] = None, owner: Optional[str] = None):
+        with self._lock:
+            entry = dict(self._entries.get(hub) or {'state': None, 'owner': ''})
+            if state is not None:
+                entry['state'] = dict(state)
+            if owner is not None:
+                entry['owner'] = owner
+            self._entries[hub] = entry
+
+    @staticmethod
+    def encode(hub: str, *, state: Optional[dict] = None, owner: Optional[str] = None,
+               request_id: Optional[str] = None) -> str:
+        message = {'hub': hub}
+        if state is not None:
+            message['state'] = state
+        if owner is not None:
+            message['owner'] = owner
+        if request_id:
+            message['request_id'] = request_id
+        return json.dumps(message)
+
+    def publish(self, hub: str, *, state: Optional[dict] = None, owner: Optional[str] = None,
+                request_id: Optional[str] = None, pipe=None):
+        """Apply locally and broadcast to other processes (on `pipe` if given)."""
+        self.apply(hub, state=state, owner=owner)
+        payload = self.encode(hub, state=state, owner=owner, request_id=request_id)
+        if pipe is not None:
+            pipe.publish(self.channel, payload)
+            return
+        try:
+            self._redis().publish(self.channel, payload)
+        except Exception as e:
+            logger.debug("Hub state publish failed for %s: %s", hub, e)
+
+    def _on_message(self, data):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        hub = str(message.get('hub') or '')
+        if not hub:
+            return
+        state = message.get('state')
+        owner = message.get('owner')
+        self.apply(
+            hub,
+            state=state if isinstance(state, dict) else None,
+            owner=str(owner) if owner is not None else None,
+        )
+        request_id = message.get('request_id')
+        if request_id and self._on_reply:
+            self._on_reply(str(request_id), hub)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='live-feed-hub-state-replica', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._subscribed = True
+                # Load after subscribing so no change falls between the two.
+                self.refresh()
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self._on_message(message.get('data'))
+                    if time.monotonic() - self._loaded_at >= self.refresh_interval:
+                        self.refresh()
+            except Exception as e:
+                self._subscribed = False
+                logger.warning("Hub state replica subscriber error: %s", e)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, HUB_STATE_REPLICA_MAX_BACKOFF_SECONDS)
+            finally:
+                self._subscribed = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
@@ -0,0 +1,305 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from dateutil.parser import parse as parse_datetime
+from django.db import close_old_connections
+
+from portal.models import Categories
+from .fanout import fanout_window
+from .models import LiveFeedPublishedItem
+
+logger = logging.getLogger(__name__)
+
+REDIS_PUBLISH_SPOOL_KEY = 'live_feed:publish:spool'
+SPOOL_GROUP = 'spool-writers'
+SPOOL_BATCH_SIZE = 200
+SPOOL_BLOCK_MS = 1000
+# Entries a writer has held this long are assumed orphaned (crashed or
+# restarted process) and replayed by whichever writer sees them first.
+SPOOL_RECLAIM_MIN_IDLE_MS = 30_000
+SPOOL_RECLAIM_INTERVAL_SECONDS = 10
+# cleanup_if_needed() counts the whole table; once a minute is plenty.
+SPOOL_CLEANUP_INTERVAL_SECONDS = 60
+# A record that fails to insert this many times is moved to the dead-letter
+# stream and acked, so one bad row can't hold the spool back forever.
+SPOOL_MAX_DELIVERIES = 5
+REDIS_PUBLISH_SPOOL_DEAD_KEY = 'live_feed:publish:spool:dead'
+SPOOL_DEAD_MAXLEN = 1000
+# Writers register as pid-uuid consumers, so every restart leaves one behind;
+# those with nothing pending are deleted once idle this long.
+SPOOL_CONSUMER_MAX_IDLE_MS = 10 * 60 * 1000
+
+
+class PublishSpool:
+    """
+    Durable hand-off between the publish fast path and Postgres. Publishers
+    XADD the row they would have inserted and send to hubs straight away; a
+    writer thread reads the stream through a consumer group, bulk-inserts,
+    then XACKs and XDELs. Anything not yet acked (writer crash, restart,
+    DB outage) stays pending and is replayed by a later pass, so a row is
+    only dropped once it is in the table or its category no longer exists.
+
+    Replays may repeat a batch that was inserted but not acked, so a batch
+    skips rows already stored with the same (category, sequence_id, hub).
+    """
+
+    def __init__(self, redis_factory: Callable, consumer: str,
+                 key: str = REDIS_PUBLISH_SPOOL_KEY, batch_size: int = SPOOL_BATCH_SIZE):
+        self._redis = redis_factory
+        self.consumer = consumer
+        self.key = key
+        self.batch_size = batch_size
+        self._group_ready = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_cleanup = 0.0
+
+    @staticmethod
+    def _decode(value) -> str:
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='ignore')
+        return '' if value is None else str(value)
+
+    def append(self, record: dict) -> bool:
+        """Spool one row (LiveFeedPublishedItem fields plus `cold`). False if Redis refused it."""
+        try:
+            self._redis().xadd(self.key, {'item': json.dumps(record, separators=(',', ':'), default=str)})
+            return True
+        except Exception as e:
+            logger.warning("Publish spool append failed: %s", e)
+            return False
+
+    def depth(self) -> int:
+        try:
+            return int(self._redis().xlen(self.key))
+        except Exception:
+            return 0
+
+    # Writer ---------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='live-feed-publish-spool', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the batch in hand; unwritten entries stay spooled for the next writer."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_group(self, r):
+        if self._group_ready:
+            return
+        try:
+            r.xgroup_create(self.key, SPOOL_GROUP, id='0', mkstream=True)
+        except Exception as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_ready = True
+
+    def _run(self):
+        last_reclaim = 0.0
+        while not self._stop.is_set():
+            try:
+                r = self._redis()
+                self._ensure_group(r)
+                if time.monotonic() - last_reclaim >= SPOOL_RECLAIM_INTERVAL_SECONDS:
+                    last_reclaim = time.monotonic()
+                    self._reclaim(r)
+                reply = r.xreadgroup(
+                    SPOOL_GROUP, self.consumer, {self.key: '>'},
+                    count=self.batch_size, block=SPOOL_BLOCK_MS,
+                )
+                for _, entries in reply or []:
+                    self._write(r, entries)
+                self._cleanup_if_due()
+            except Exception as e:
+                if 'NOGROUP' in str(e):
+                    self._group_ready = False
+                    continue
+                logger.warning("Publish spool writer error: %s", e)
+                self._stop.wait(1)
+            finally:
+                close_old_connections()
+
+    def _reclaim(self, r):
+        start_id = '0-0'
+        while not self._stop.is_set():
+            reply = r.xautoclaim(
+                self.key, SPOOL_GROUP, self.consumer,
+                min_idle_time=SPOOL_RECLAIM_MIN_IDLE_MS, start_id=start_id, count=self.batch_size,
+            )
+            start_id, entries = reply[0], reply[1]
+            self._write(r, entries)
+            if self._decode(start_id) in ('0-0', ''):
+                break
+        self._delete_idle_consumers(r)
+
+    def _delete_idle_consumers(self, r):
+        try:
+            consumers = r.xinfo_consumers(self.key, SPOOL_GROUP)
+        except Exception:
+            return
+        for consumer in consumers or []:
+            name = self._decode(consumer.get('name'))
+            if name == self.consumer or int(consumer.get('pending') or 0):
+                continue
+            if int(consumer.get('idle') or 0) < SPOOL_CONSUMER_MAX_IDLE_MS:
+                continue
+            try:
+                # Only with an empty PEL: deleting a consumer drops its pending entries.
+                r.xgroup_delconsumer(self.key, SPOOL_GROUP, name)
+            except Exception:
+                pass
+
+    def _write(self, r, entries: list):
+        if not entries:
+            return
+        done_ids = []
+        batch = []  # [(entry_id, record)]
+        for entry_id, fields in entries:
+            done_ids.append(entry_id)
+            if not fields:
+                continue
+            raw = {self._decode(k): self._decode(v) for k, v in fields.items()}.get('item')
+            try:
+                batch.append((entry_id, json.loads(raw)))
+            except (TypeError, ValueError):
+                logger.error("Dropping unreadable spooled publish: %r", raw)
+
+        try:
+            stored = self._store([record for _, record in batch])
+        except Exception as e:
+            # One bad row fails the whole bulk insert; retry row by row so the
+            # rest still land and only the bad ones stay pending.
+            logger.warning("Publish spool batch insert failed, retrying per row: %s", e)
+            stored = []
+            db_reachable = None
+            for entry_id, record in batch:
+                try:
+                    stored.extend(self._store([record]))
+                except Exception as row_error:
+                    if db_reachable is None:
+                        db_reachable = self._db_reachable()
+                    # During an outage every row fails; that says nothing about the row.
+                    if not db_reachable or not self._dead_letter_if_exhausted(r, entry_id, record, row_error):
+                        done_ids.remove(entry_id)
+
+        # Only after the rows are committed: entries left out stay pending
+        # for the next reclaim.
+        if done_ids:
+            pipe = r.pipeline()
+            pipe.xack(self.key, SPOOL_GROUP, *done_ids)
+            pipe.xdel(self.key, *done_ids)
+            pipe.execute()
+
+        for record in stored:
+            if record.get('cold'):
+                # The window was rebuilt from the DB while this row was still
+                # spooled; add it now that it is stored. No-op if still cold.
+                fanout_window.append(record['category_id'], record['fanout'])
+
+    @staticmethod
+    def _db_reachable() -> bool:
+        try:
+            Categories.objects.exists()
+            return True
+        except Exception:
+            return False
+
+    def _dead_letter_if_exhausted(self, r, entry_id, record: dict, error: Exception) -> bool:
+        """True if the record has used up its deliveries and was moved to the dead-letter stream."""
+        try:
+            pending = r.xpending_range(self.key, SPOOL_GROUP, min=entry_id, max=entry_id, count=1)
+            deliveries = int(pending[0]['times_delivered']) if pending else 0
+        except Exception:
+            return False
+        if deliveries < SPOOL_MAX_DELIVERIES:
+            logger.warning("Spooled publish %s failed (delivery %d): %s", self._decode(entry_id), deliveries, error)
+            return False
+        try:
+            r.xadd(
+                REDIS_PUBLISH_SPOOL_DEAD_KEY,
+                {'item': json.dumps(record, separators=(',', ':'), default=str), 'error': str(error)[:500]},
+                maxlen=SPOOL_DEAD_MAXLEN, approximate=True,
+            )
+        except Exception:
+            return False
+        logger.error("Dead-lettered spooled publish %s after %d deliveries: %s",
+                     self._decode(entry_id), deliveries, error)
+        return True
+
+    def _store(self, records: List[dict]) -> List[dict]:
+        if not records:
+            return []
+        category_ids = {int(record['category_id']) for record in records}
+        known = set(Categories.objects.filter(id__in=category_ids).values_list('id', flat=True))
+        existing = set(
+            LiveFeedPublishedItem.objects
+            .filter(sequence_id__in={int(record['sequence_id']) for record in records})
+            .values_list('category_id', 'sequence_id', 'hub')
+        )
+
+        rows, stored = [], []
+        for record in records:
+            category_id = int(record['category_id'])
+            if category_id not in known:
+                logger.error("Dropping spooled publish for missing category %s", category_id)
+                continue
+            identity = (category_id, int(record['sequence_id']), record['hub'])
+            if identity in existing:
+                continue
+            existing.add(identity)
+            rows.append(LiveFeedPublishedItem(
+                category_id=category_id,
+                sequence_id=int(record['sequence_id']),
+                title=str(record.get('title') or ''),
+                impact=int(record.get('impact') or 0),
+                timestamp=self.parse_timestamp(record.get('timestamp')),
+                hub=record['hub'],
+                payload=record.get('payload') or {},
+            ))
+            stored.append(record)
+        if rows:
+            LiveFeedPublishedItem.objects.bulk_create(rows, batch_size=self.batch_size)
+        return stored
+
+    def _cleanup_if_due(self):
+        if time.monotonic() - self._last_cleanup < SPOOL_CLEANUP_INTERVAL_SECONDS:
+            return
+        self._last_cleanup = time.monotonic()
+        if LiveFeedPublishedItem.cleanup_if_needed():
+            fanout_window.invalidate_all()
+
+    @staticmethod
+    def parse_timestamp(value: Optional[str]) -> datetime:
+        """Aware datetime for an upstream timestamp; now() if it is missing or unparseable."""
+        if value:
+            try:
+                parsed = parse_datetime(str(value))
+            except (ValueError, OverflowError):
+                parsed = None
+            if parsed is not None:
+                return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc)
+
+    def stats(self) -> Dict[str, int]:
+        pending = 0
+        try:
+            summary = self._redis().xpending(self.key, SPOOL_GROUP)
+            pending = int((summary or {}).get('pending') or 0)
+        except Exception:
+            pass
+        dead = 0
+        try:
+            dead = int(self._redis().xlen(REDIS_PUBLISH_SPOOL_DEAD_KEY))
+        except Exception:
+            pass
+        return {'depth': self.depth(), 'pending': pending, 'dead': dead}
@@ -0,0 +1,189 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REDIS_TELEMETRY_PREFIX = 'live_feed:telemetry:'
+TELEMETRY_FLUSH_INTERVAL_SECONDS = 1.0
+TELEMETRY_MAX_BUFFERED_EVENTS = 100_000
+# name -> (seconds per bucket, buckets kept)
+TELEMETRY_RESOLUTIONS = {
+    '1s': (1, 300),
+    '1m': (60, 24 * 60),
+    '1h': (60 * 60, 30 * 24),
+}
+TELEMETRY_COUNTERS = ('messages_sent', 'messages_received')
+TELEMETRY_GAUGES = ('live_users', 'admin_users')
+
+# KEYS: one ring hash per resolution. ARGV: epoch second, counters JSON,
+# gauges JSON, then (bucket seconds, size) per key. Slot = bucket % size and
+# holds {"b": bucket, field: value}; a slot still holding an older bucket is
+# a full lap stale and starts over. Counters add, gauges keep the max, so
+# writes from several processes merge.
+RECORD_SCRIPT = """
+local ts = tonumber(ARGV[1])
+local counters = cjson.decode(ARGV[2])
+local gauges = cjson.decode(ARGV[3])
+for i, key in ipairs(KEYS) do
+    local seconds = tonumber(ARGV[2 + i * 2])
+    local size = tonumber(ARGV[3 + i * 2])
+    local bucket = math.floor(ts / seconds)
+    local slot = bucket % size
+    local raw = redis.call('HGET', key, slot)
+    local entry = raw and cjson.decode(raw) or nil
+    if not entry or entry.b ~= bucket then
+        entry = {b = bucket}
+    end
+    for name, amount in pairs(counters) do
+        entry[name] = (entry[name] or 0) + amount
+    end
+    for name, value in pairs(gauges) do
+        if not entry[name] or value > entry[name] then
+            entry[name] = value
+        end
+    end
+    redis.call('HSET', key, slot, cjson.encode(entry))
+    redis.call('EXPIRE', key, seconds * size)
+end
+return 1
+"""
+
+
+class HubTelemetry:
+    """
+    Per-hub time series in fixed-size Redis ring buffers, one hash per hub
+    and resolution (1s for five minutes, 1m for a day, 1h for 30 days), so
+    memory stays bounded however long the hubs run.
+
+    Recording is buffered like CounterAggregator: `incr`/`gauge` append to
+    a deque and a thread writes one script call per (hub, second) every
+    second. Counters (message rates) sum within a bucket; gauges (user
+    counts) keep the bucket's peak. `sampler` is polled on each flush for
+    current gauge values, so quiet hubs still get a continuous series.
+    Telemetry is best effort: a failed write is dropped, not retried.
+    """
+
+    def __init__(self, redis_factory: Callable, prefix: str = REDIS_TELEMETRY_PREFIX,
+                 interval: float = TELEMETRY_FLUSH_INTERVAL_SECONDS,
+                 sampler: Optional[Callable[[], Dict[str, Dict[str, int]]]] = None):
+        self._redis = redis_factory
+        self.prefix = prefix
+        self.interval = interval
+        self._sampler = sampler
+        self._events = deque(maxlen=TELEMETRY_MAX_BUFFERED_EVENTS)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def key(self, hub: str, resolution: str) -> str:
+        return f'{self.prefix}{hub}:{resolution}'
+
+    def incr(self, hub: str, field: str, amount: int = 1):
+        self._events.append((int(time.time()), hub, field, int(amount), False))
+        self._ensure_thread()
+
+    def gauge(self, hub: str, field: str, value: int):
+        self._events.append((int(time.time()), hub, field, int(value or 0), True))
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='live-feed-telemetry', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.debug("Telemetry flush failed: %s", e)
+
+    def _drain(self) -> list:
+        events = []
+        while True:
+            try:
+                events.append(self._events.popleft())
+            except IndexError:
+                return events
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            events = self._drain()
+            if self._sampler is not None:
+                now = int(time.time())
+                for hub, values in (self._sampler() or {}).items():
+                    events.extend((now, hub, field, int(value or 0), True) for field, value in values.items())
+            if not events:
+                return 0
+
+            buckets: Dict[tuple, tuple] = {}
+            for second, hub, field, value, is_gauge in events:
+                counters, gauges = buckets.setdefault((hub, second), (Counter(), {}))
+                if is_gauge:
+                    gauges[field] = max(gauges.get(field, value), value)
+                else:
+                    counters[field] += value
+
+            resolution_args = []
+            for seconds, size in TELEMETRY_RESOLUTIONS.values():
+                resolution_args.extend((seconds, size))
+            try:
+                pipe = self._redis().pipeline(transaction=False)
+                for (hub, second), (counters, gauges) in buckets.items():
+                    keys = [self.key(hub, name) for name in TELEMETRY_RESOLUTIONS]
+                    pipe.eval(
+                        RECORD_SCRIPT, len(keys), *keys,
+                        second, json.dumps(dict(counters)), json.dumps(gauges), *resolution_args,
+                    )
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Telemetry flush failed (%d events dropped): %s", len(events), e)
+                return 0
+            return len(events)
+
+    def read(self, hubs: Iterable[str], resolution: str, points: Optional[int] = None) -> Dict[str, List[dict]]:
+        """
+        {hub: [point, ...]} oldest first, one point per bucket up to now.
+        Empty buckets have zero counters and null gauges.
+        """
+        seconds, size = TELEMETRY_RESOLUTIONS[resolution]
+        points = max(1, min(int(points or size), size))
+        current = int(time.time()) // seconds
+        window = range(current - points + 1, current + 1)
+
+        hubs = list(hubs)
+        pipe = self._redis().pipeline(transaction=False)
+        for hub in hubs:
+            pipe.hmget(self.key(hub, resolution), [bucket % size for bucket in window])
+        replies = pipe.execute()
+
+        series = {}
+        for hub, values in zip(hubs, replies):
+            rows = []
+            for bucket, raw in zip(window, values):
+                entry = {}
+                if raw:
+                    try:
+                        entry = json.loads(raw)
+                    except (TypeError, ValueError):
+                        entry = {}
+                if entry.get('b') != bucket:
+                    entry = {}
+                row = {'t': datetime.fromtimestamp(bucket * seconds, tz=timezone.utc).isoformat()}
+                for field in TELEMETRY_COUNTERS:
+                    row[field] = int(entry.get(field) or 0)
+                for field in TELEMETRY_GAUGES:
+                    row[field] = entry.get(field)
+                rows.append(row)
+            series[hub] = rows
+        return series
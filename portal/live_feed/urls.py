@@ -17,6 +17,8 @@ urlpatterns = [
     path('api/stream/', views.api_stream, name='api_stream'),
     path('api/costs/', views.api_costs, name='api_costs'),
     path('api/costs/reset/', views.api_reset_costs, name='api_reset_costs'),
+    path('api/telemetry/', views.api_telemetry, name='api_telemetry'),
+    path('api/events/', views.api_events, name='api_events'),
     path('api/categories/', views.api_categories, name='api_categories'),
     path('api/published-items/', views.api_published_items, name='api_published_items'),
     path('api/published-items/delete/', views.api_published_items_delete, name='api_published_items_delete'),
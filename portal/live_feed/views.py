@@ -1,9 +1,8 @@
 import json
-import time
 from datetime import datetime, timezone
 from typing import Any
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods, require_GET, require_POST
 from django.contrib.admin.views.decorators import staff_member_required
 from django.template.response import TemplateResponse
@@ -12,8 +11,12 @@ from django.db import OperationalError, ProgrammingError
 
 from portal.models import Categories
 from .manager import hub_manager, HUBS
+from .events import live_feed_events
+from .fanout import fanout_window
 from .models import LiveFeedLog, LiveFeedPipeline, LiveFeedPipelineLog, LiveFeedPublishedItem
 from .pipeline_manager import pipeline_manager
+from .pipeline_stats import pipeline_stats
+from .telemetry import TELEMETRY_RESOLUTIONS
 from .pipelines import get_pipeline_sources, source_definition_map
 
 
@@ -29,6 +32,11 @@ def _pipeline_sources_payload():
 
 
 def _serialize_pipeline(pipeline: LiveFeedPipeline, source_map: dict[str, Any]) -> dict:
+    # Counts buffered in this process but not yet flushed to the row.
+    pending = pipeline_stats.pending(pipeline.id)
+    last_activity_at = pipeline.last_activity_at
+    if pending['last_activity_at'] and (not last_activity_at or pending['last_activity_at'] > last_activity_at):
+        last_activity_at = pending['last_activity_at']
     data = {
         'id': pipeline.id,
         'source': pipeline.source,
@@ -43,10 +51,10 @@ def _serialize_pipeline(pipeline: LiveFeedPipeline, source_map: dict[str, Any])
         'owner_instance': pipeline.owner_instance or '',
         'last_started_at': pipeline.last_started_at.isoformat() if pipeline.last_started_at else None,
         'last_stopped_at': pipeline.last_stopped_at.isoformat() if pipeline.last_stopped_at else None,
-        'last_activity_at': pipeline.last_activity_at.isoformat() if pipeline.last_activity_at else None,
+        'last_activity_at': last_activity_at.isoformat() if last_activity_at else None,
         'last_error': pipeline.last_error or '',
-        'total_seen': int(pipeline.total_seen or 0),
-        'total_published': int(pipeline.total_published or 0),
+        'total_seen': int(pipeline.total_seen or 0) + pending['total_seen'],
+        'total_published': int(pipeline.total_published or 0) + pending['total_published'],
         'updated_at': pipeline.updated_at.isoformat() if pipeline.updated_at else None,
     }
     return data
@@ -119,14 +127,18 @@ def pipeline_manager_view(request):
 @require_GET
 def api_hubs(request):
     refresh = request.GET.get('refresh', '').strip().lower() in {'1', 'true', 'yes'}
+    refresh_result = None
     if refresh:
         hub = request.GET.get('hub', 'all')
-        hub_manager.request_live_users(hub)
-        # Give socket handlers a brief moment to process hub_users replies.
-        time.sleep(0.3)
+        refresh_result = hub_manager.refresh_live_users(hub)
 
     states = hub_manager.get_hub_states()
-    return JsonResponse({'hubs': states})
+    return JsonResponse({
+        'hubs': states,
+        'refresh': refresh_result,
+        'publish_queue': hub_manager.get_publish_metrics(),
+        'command_bus': hub_manager.get_command_metrics(),
+    })
 
 @staff_member_required
 @require_POST
@@ -321,12 +333,41 @@ def api_costs(request):
     costs = hub_manager.get_costs()
     return JsonResponse(costs)
 
+@staff_member_required
+@require_GET
+def api_telemetry(request):
+    resolution = request.GET.get('resolution', '1m')
+    if resolution not in TELEMETRY_RESOLUTIONS:
+        return JsonResponse({'error': f'Unknown resolution: {resolution}'}, status=400)
+    hub = request.GET.get('hub', 'all')
+    if hub != 'all' and hub not in HUBS:
+        return JsonResponse({'error': f'Unknown hub: {hub}'}, status=400)
+    try:
+        points = int(request.GET['points']) if request.GET.get('points') else None
+    except ValueError:
+        points = None
+    return JsonResponse(hub_manager.get_telemetry(resolution, hub=hub, points=points))
+
 @staff_member_required
 @require_POST
 def api_reset_costs(request):
     hub_manager.reset_costs()
     return JsonResponse({'success': True})
 
+@staff_member_required
+@require_GET
+def api_events(request):
+    # EventSource sends Last-Event-ID on reconnect; the query param lets a
+    # fresh page resume from an id it already has.
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id', '')
+    response = StreamingHttpResponse(
+        live_feed_events.sse(last_event_id.strip()),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @staff_member_required
 @require_GET
 def api_categories(request):
@@ -751,8 +792,10 @@ def api_published_items_delete(request):
         id__in=ids,
         category__live_feed_type__gt=0,
     )
-    existing_ids = list(qs.values_list('id', flat=True))
+    existing = list(qs.values_list('id', 'category_id'))
+    existing_ids = [item_id for item_id, _ in existing]
     qs.delete()
+    fanout_window.invalidate(*{category_id for _, category_id in existing})
 
     existing_id_set = set(existing_ids)
     missing_ids = [item_id for item_id in ids if item_id not in existing_id_set]
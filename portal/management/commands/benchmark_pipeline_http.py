@@ -0,0 +1,124 @@
+import gzip
+import json
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40ms to every keep-alive request.
+    disable_nagle_algorithm = True
+    server: "_StubServer"
+
+    def setup(self):
+        # One call per TCP connection: stands in for the TCP+TLS handshake.
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        body = self.server.payload
+        headers = {"Content-Type": "application/json"}
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = self.server.payload_gzip
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, connect_delay: float, latency: float, payload_kb: int):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.connect_delay = connect_delay
+        self.latency = latency
+        self.connections = 0
+        self.lock = threading.Lock()
+        post = {"id": 1, "title": "Breaking update", "content": "x" * 512}
+        self.payload = json.dumps({"data": {"posts": [post] * max(1, payload_kb * 2)}}).encode()
+        self.payload_gzip = gzip.compress(self.payload)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the pooled pipeline HTTP client against one-shot urllib "
+        "requests, using a local stub GraphQL server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--connect-delay-ms", type=float, default=30.0,
+                            help="Delay per new connection, simulating the TCP+TLS handshake.")
+        parser.add_argument("--latency-ms", type=float, default=5.0, help="Server time per request.")
+        parser.add_argument("--payload-kb", type=int, default=16)
+
+    def handle(self, *args, **options):
+        from portal.live_feed.pipelines.http_pool import PooledHTTPClient
+
+        server = _StubServer(
+            options["connect_delay_ms"] / 1000, options["latency_ms"] / 1000, options["payload_kb"],
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/graphql?operationName=LiveBlogUpdateQuery"
+        self.stdout.write(
+            f"Stub {url} (connect delay {options['connect_delay_ms']:g}ms, "
+            f"latency {options['latency_ms']:g}ms, {len(server.payload) // 1024}KB payload)"
+        )
+
+        def urllib_get():
+            request = urllib.request.Request(url, headers={"Accept": "*/*"})
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.read()
+
+        pool = PooledHTTPClient(max_per_host=options["concurrency"], timeout=10)
+
+        try:
+            for label, fetch in (("urllib", urllib_get), ("pooled", lambda: pool.get(url).body)):
+                before = server.connections
+                stats = self._run(fetch, options["requests"], options["concurrency"])
+                self.stdout.write(
+                    f"{label:>7}: {stats['total']:.2f}s total, {stats['rps']:.0f} req/s, "
+                    f"p50 {stats['p50']:.1f}ms, p95 {stats['p95']:.1f}ms, "
+                    f"{server.connections - before} connection(s)"
+                )
+        finally:
+            pool.close()
+            server.shutdown()
+            server.server_close()
+
+    @staticmethod
+    def _run(fetch, count: int, concurrency: int) -> dict:
+        def timed(_):
+            started = time.perf_counter()
+            fetch()
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = sorted(executor.map(timed, range(count)))
+        total = time.perf_counter() - started
+        return {
+            "total": total,
+            "rps": count / total if total else 0,
+            "p50": statistics.median(latencies),
+            "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        }
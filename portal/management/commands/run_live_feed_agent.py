@@ -0,0 +1,55 @@
+import logging
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the live feed agent: owns every hub WebSocket, pipeline runner and "
+        "routed command consumer. Run one per deployment with "
+        "LIVE_FEED_IN_PROCESS_AGENTS=False on the web and Celery processes. "
+        "SIGTERM/SIGINT drain gracefully and hand running hubs to the next agent."
+    )
+
+    def add_arguments(self, parser):
+        from portal.live_feed.manager import AGENT_DRAIN_TIMEOUT_SECONDS
+
+        parser.add_argument(
+            "--drain-timeout",
+            type=float,
+            default=AGENT_DRAIN_TIMEOUT_SECONDS,
+            help="Seconds to wait for queued publishes and pipeline runners on shutdown.",
+        )
+
+    def handle(self, *args, **options):
+        from portal.live_feed.manager import hub_manager
+        from portal.live_feed.pipeline_manager import pipeline_manager
+
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write(f"Received {signal.Signals(signum).name}, draining...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        hub_manager.start_agent()
+        pipeline_manager.agent_mode = True
+        pipeline_manager.start_monitor()
+        self.stdout.write(self.style.SUCCESS(f"Live feed agent {hub_manager.instance_id} running"))
+
+        while not stop.wait(1.0):
+            pass
+
+        timeout = options["drain_timeout"]
+        stopped = pipeline_manager.drain(timeout)
+        handed_off = hub_manager.drain(timeout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Live feed agent stopped: {stopped} pipeline runner(s) released, "
+            f"{len(handed_off)} hub(s) handed off"
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-04-20 00:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction; building the GIN
+    # indexes this way doesn't block writes to `news` while they build.
+    atomic = False
+
+    dependencies = [
+        ('data', '0009_categories_name_en'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector('title', 'summary', config='simple'),
+                name='news_search_vector_gin',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['title'], name='news_title_trgm_gin', opclasses=['gin_trgm_ops'],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['summary'], name='news_summary_trgm_gin', opclasses=['gin_trgm_ops'],
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 
 
@@ -94,9 +96,18 @@ class News(models.Model):
     categoryid = models.ForeignKey(Categories, models.DO_NOTHING, db_column='categoryId', blank=True, null=True)  # Field name made lowercase.
     divisionid = models.ForeignKey(Divisions, models.DO_NOTHING, db_column='divisionId', blank=True, null=True)  # Field name made lowercase.
 
+    # Must match the expression used by the search queries exactly, or Postgres
+    # will not pick the GIN index.
+    SEARCH_CONFIG = 'simple'
+
     class Meta:
         db_table = 'news'
         verbose_name_plural = 'News'
+        indexes = [
+            GinIndex(SearchVector('title', 'summary', config='simple'), name='news_search_vector_gin'),
+            GinIndex(fields=['title'], opclasses=['gin_trgm_ops'], name='news_title_trgm_gin'),
+            GinIndex(fields=['summary'], opclasses=['gin_trgm_ops'], name='news_summary_trgm_gin'),
+        ]
 
     def __str__(self):
         return self.title
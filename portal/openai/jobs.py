@@ -5,10 +5,10 @@ from typing import Any
 from celery import current_app
 from django.conf import settings
 from django.db import transaction
-from django.db.models import F
 from django.utils import timezone
 
 from ..live_feed.manager import hub_manager
+from ..live_feed.pipeline_stats import pipeline_stats
 from ..models import LiveFeedPipeline, LiveFeedPipelineLog, OpenAIJob, OpenAIJobLog
 
 
@@ -289,10 +289,9 @@ def publish_completed_job(job_id: int) -> bool:
             job.publish_result = publish_result
             job.save(update_fields=['status', 'published_at', 'publish_result', 'updated_at'])
             if job.pipeline_id:
-                LiveFeedPipeline.objects.filter(id=job.pipeline_id).update(
-                    total_published=F('total_published') + 1,
-                    last_activity_at=timezone.now(),
-                )
+                # Counted only if the job row commits, as the old F() UPDATE was.
+                pipeline_id = job.pipeline_id
+                transaction.on_commit(lambda: pipeline_stats.incr(pipeline_id, 'total_published'))
                 pipeline = LiveFeedPipeline.objects.filter(id=job.pipeline_id).first()
                 if pipeline:
                     LiveFeedPipelineLog.log(
@@ -5,6 +5,7 @@ from datetime import timedelta
 from typing import Any
 
 from celery import shared_task
+from celery.signals import worker_process_shutdown
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
@@ -25,6 +26,13 @@ from .openai.jobs import (
     resolve_job_batch_timeout_minutes,
     resolve_job_realtime_model,
 )
+from .live_feed.pipeline_stats import pipeline_stats
+
+
+@worker_process_shutdown.connect
+def _flush_pipeline_stats(**kwargs):
+    # Prefork children exit without running atexit handlers.
+    pipeline_stats.flush()
 
 
 def _terminal(status: str) -> bool:
@@ -329,3 +337,15 @@ def openai_poll_batch_jobs():
                 job.error_message = 'Batch cancelled'
                 job.save(update_fields=['status', 'cancelled_at', 'error_message', 'updated_at'])
                 log_openai_job(job, 'Batch cancelled by provider', level=OpenAIJobLog.Level.WARNING)
+
+
+@shared_task(name='portal.tasks.rescore_ranked_feeds')
+def rescore_ranked_feeds():
+    from api.v1.resources import news_cache, video_cache
+
+    ranked = {}
+    for cache in (news_cache, video_cache):
+        if cache.ranking is None or not cache.ranking.time_dependent:
+            continue
+        ranked[cache.member_prefix] = cache.rescore()
+    return ranked
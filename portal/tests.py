@@ -1,3 +1,388 @@
-from django.test import TestCase
+import asyncio
+import base64
+import hashlib
+import struct
+import threading
+import time
+import unittest
+from unittest import mock
 
-# Create tests here in future.
+from portal.live_feed import engine
+from portal.live_feed.engine import (
+    OP_BINARY,
+    OP_CLOSE,
+    OP_CONTINUATION,
+    OP_PING,
+    OP_PONG,
+    OP_TEXT,
+    AsyncWebSocket,
+    HubEngine,
+    WebSocketClosed,
+)
+
+
+async def _server_handshake(reader, writer, status='101 Switching Protocols'):
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    key = ''
+    for line in head.split('\r\n')[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'sec-websocket-key':
+            key = value.strip()
+    accept = base64.b64encode(hashlib.sha1((key + engine.WS_GUID).encode()).digest()).decode()
+    writer.write((
+        f'HTTP/1.1 {status}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+        f'Sec-WebSocket-Accept: {accept}\r\n\r\n'
+    ).encode('latin-1'))
+    await writer.drain()
+
+
+def _server_frame(opcode, payload=b'', fin=True):
+    """Unmasked frame, as a server sends it."""
+    header = bytearray([(0x80 if fin else 0) | opcode])
+    if len(payload) < 126:
+        header.append(len(payload))
+    elif len(payload) < 65536:
+        header.append(126)
+        header += struct.pack('!H', len(payload))
+    else:
+        header.append(127)
+        header += struct.pack('!Q', len(payload))
+    return bytes(header) + payload
+
+
+async def _read_client_frame(reader):
+    """(fin, opcode, masked, payload) for one frame sent by the client."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack('!Q', await reader.readexactly(8))
+    masked = bool(second & 0x80)
+    mask = await reader.readexactly(4) if masked else b''
+    payload = await reader.readexactly(length)
+    if masked:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return bool(first & 0x80), first & 0x0F, masked, payload
+
+
+def _close_code(payload):
+    return struct.unpack('!H', payload[:2])[0]
+
+
+class AsyncWebSocketTests(unittest.IsolatedAsyncioTestCase):
+    async def _serve(self, script, status='101 Switching Protocols'):
+        """Start a one-shot server running `script(reader, writer)` after the handshake."""
+        self.server_done = asyncio.get_running_loop().create_future()
+
+        async def handle(reader, writer):
+            try:
+                await _server_handshake(reader, writer, status)
+                result = await script(reader, writer)
+                if not self.server_done.done():
+                    self.server_done.set_result(result)
+            except Exception as exc:
+                if not self.server_done.done():
+                    self.server_done.set_exception(exc)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        self.addAsyncCleanup(server.wait_closed)
+        self.addCleanup(server.close)
+        return f'ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/hub'
+
+    async def test_sent_frames_are_masked_with_the_right_length_encoding(self):
+        messages = ['hi', 'x' * 300, 'y' * 70000]
+
+        async def script(reader, writer):
+            return [await _read_client_frame(reader) for _ in messages]
+
+        ws = await AsyncWebSocket.connect(await self._serve(script))
+        for text in messages:
+            await ws.send_text(text)
+        frames = await asyncio.wait_for(self.server_done, 5)
+        await ws.close()
+
+        self.assertEqual([(True, OP_TEXT, True, text.encode()) for text in messages], frames)
+
+    async def test_fragmented_message_with_interleaved_ping(self):
+        async def script(reader, writer):
+            writer.write(_server_frame(OP_TEXT, b'hel', fin=False))
+            writer.write(_server_frame(OP_PING, b'p'))
+            writer.write(_server_frame(OP_CONTINUATION, 'lo é'.encode(), fin=True))
+            await writer.drain()
+            return await _read_client_frame(reader)
+
+        ws = await AsyncWebSocket.connect(await self._serve(script))
+        self.assertEqual('hello é', await asyncio.wait_for(ws.recv(), 5))
+        self.assertEqual((True, OP_PONG, True, b'p'), await asyncio.wait_for(self.server_done, 5))
+        await ws.close()
+
+    async def test_binary_message_is_returned_as_bytes(self):
+        async def script(reader, writer):
+            writer.write(_server_frame(OP_BINARY, b'\x00\xff'))
+            await writer.drain()
+            await reader.read()
+
+        ws = await AsyncWebSocket.connect(await self._serve(script))
+        self.assertEqual(b'\x00\xff', await asyncio.wait_for(ws.recv(), 5))
+        await ws.close()
+
+    async def test_server_close_reports_code_and_is_echoed(self):
+        async def script(reader, writer):
+            writer.write(_server_frame(OP_CLOSE, struct.pack('!H', 4001) + b'bye'))
+            await writer.drain()
+            return await _read_client_frame(reader)
+
+        ws = await AsyncWebSocket.connect(await self._serve(script))
+        with self.assertRaises(WebSocketClosed) as caught:
+            await asyncio.wait_for(ws.recv(), 5)
+        self.assertEqual((4001, 'bye'), (caught.exception.code, caught.exception.reason))
+        _, opcode, _, payload = await asyncio.wait_for(self.server_done, 5)
+        self.assertEqual((OP_CLOSE, 4001), (opcode, _close_code(payload)))
+
+    async def _assert_fails_with(self, frames, code):
+        async def script(reader, writer):
+            for frame in frames:
+                writer.write(frame)
+            await writer.drain()
+            return await _read_client_frame(reader)
+
+        ws = await AsyncWebSocket.connect(await self._serve(script))
+        with self.assertRaises(WebSocketClosed) as caught:
+            await asyncio.wait_for(ws.recv(), 5)
+        self.assertEqual(code, caught.exception.code)
+        _, opcode, _, payload = await asyncio.wait_for(self.server_done, 5)
+        self.assertEqual((OP_CLOSE, code), (opcode, _close_code(payload)))
+        await ws.close()
+
+    async def test_reserved_close_code_is_a_protocol_error(self):
+        await self._assert_fails_with([_server_frame(OP_CLOSE, struct.pack('!H', 1005))], 1002)
+
+    async def test_continuation_without_a_message_is_a_protocol_error(self):
+        await self._assert_fails_with([_server_frame(OP_CONTINUATION, b'x')], 1002)
+
+    async def test_new_message_inside_a_fragmented_one_is_a_protocol_error(self):
+        await self._assert_fails_with([
+            _server_frame(OP_TEXT, b'a', fin=False),
+            _server_frame(OP_TEXT, b'b'),
+        ], 1002)
+
+    async def test_oversized_or_fragmented_control_frames_are_protocol_errors(self):
+        await self._assert_fails_with([_server_frame(OP_PING, b'x' * 126)], 1002)
+        await self._assert_fails_with([_server_frame(OP_PONG, b'x', fin=False)], 1002)
+
+    async def test_invalid_utf8_text_closes_with_1007(self):
+        await self._assert_fails_with([_server_frame(OP_TEXT, b'\xff\xfe')], 1007)
+
+    async def test_message_over_the_size_limit_closes_with_1009(self):
+        with mock.patch.object(engine, 'MAX_MESSAGE_BYTES', 4):
+            await self._assert_fails_with([
+                _server_frame(OP_TEXT, b'abc', fin=False),
+                _server_frame(OP_CONTINUATION, b'def'),
+            ], 1009)
+
+    async def test_dropped_connection_raises_closed_without_code(self):
+        async def script(reader, writer):
+            writer.write(_server_frame(OP_TEXT, b'partial', fin=False)[:4])
+            await writer.drain()
+
+        ws = await AsyncWebSocket.connect(await self._serve(script))
+        with self.assertRaises(WebSocketClosed) as caught:
+            await asyncio.wait_for(ws.recv(), 5)
+        self.assertIsNone(caught.exception.code)
+        await ws.close()
+
+    async def test_rejected_handshake(self):
+        async def script(reader, writer):
+            return None
+
+        url = await self._serve(script, status='403 Forbidden')
+        with self.assertRaisesRegex(ConnectionError, '403'):
+            await AsyncWebSocket.connect(url)
+
+    async def test_connect_times_out_when_the_upgrade_never_answers(self):
+        async def handle(reader, writer):
+            await reader.read()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        self.addAsyncCleanup(server.wait_closed)
+        self.addCleanup(server.close)
+        url = f'ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/'
+        started = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            await AsyncWebSocket.connect(url, timeout=0.2)
+        self.assertLess(time.monotonic() - started, 2)
+
+    async def test_rejects_non_websocket_urls(self):
+        with self.assertRaises(ValueError):
+            await AsyncWebSocket.connect('http://127.0.0.1/')
+
+
+class _ThreadedServer:
+    """WebSocket server on its own loop thread, for driving HubEngine."""
+
+    def __init__(self, on_connection, handshake=True):
+        self.on_connection = on_connection
+        self.handshake = handshake
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, '127.0.0.1', 0))
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        started.wait(5)
+        self.url = f'ws://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/hub'
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            if self.handshake:
+                await _server_handshake(reader, writer)
+            await self.on_connection(self.connections, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def stop(self):
+        async def shutdown():
+            self.server.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+class _RecordingHandler:
+    def __init__(self, reconnect=True):
+        self.events = []
+        self.reconnect = reconnect
+        self.changed = threading.Condition()
+
+    def _record(self, *event):
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def on_open(self):
+        self._record('open')
+
+    def on_message(self, text):
+        self._record('message', text)
+
+    def on_error(self, error):
+        self._record('error', error)
+
+    def on_close(self, code, was_connected):
+        self._record('close', code, was_connected)
+
+    def on_reconnect(self):
+        self._record('reconnect')
+        return self.reconnect
+
+    def wait_for(self, predicate, timeout=5):
+        with self.changed:
+            self.changed.wait_for(lambda: predicate(self.events), timeout)
+        return list(self.events)
+
+
+@mock.patch.object(engine, 'RECONNECT_BASE_DELAY', 0.01)
+class HubEngineTests(unittest.TestCase):
+    def test_reconnects_after_the_server_closes(self):
+        async def on_connection(number, reader, writer):
+            if number == 1:
+                writer.write(_server_frame(OP_CLOSE, struct.pack('!H', 1011)))
+                await writer.drain()
+                await _read_client_frame(reader)
+                return
+            writer.write(_server_frame(OP_TEXT, b'welcome back'))
+            await writer.drain()
+            await reader.read()
+
+        server = _ThreadedServer(on_connection)
+        self.addCleanup(server.stop)
+        hubs = HubEngine()
+        handler = _RecordingHandler()
+        self.assertTrue(hubs.open('eu', server.url, {}, handler))
+        self.addCleanup(hubs.close, 'eu')
+
+        events = handler.wait_for(lambda events: ('message', 'welcome back') in events)
+        self.assertEqual(
+            [('open',), ('close', 1011, True), ('reconnect',), ('open',), ('message', 'welcome back')],
+            events,
+        )
+        self.assertTrue(hubs.is_connected('eu'))
+
+    def test_session_ends_when_the_handler_declines_to_reconnect(self):
+        async def on_connection(number, reader, writer):
+            writer.write(_server_frame(OP_CLOSE, struct.pack('!H', 1000)))
+            await writer.drain()
+
+        server = _ThreadedServer(on_connection)
+        self.addCleanup(server.stop)
+        hubs = HubEngine()
+        handler = _RecordingHandler(reconnect=False)
+        hubs.open('us', server.url, {}, handler)
+
+        handler.wait_for(lambda events: ('reconnect',) in events)
+        deadline = time.monotonic() + 5
+        while 'us' in hubs.queue_depths() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertNotIn('us', hubs.queue_depths())
+        self.assertEqual(1, server.connections)
+
+    def test_open_returns_at_once_and_reports_a_connect_timeout(self):
+        async def on_connection(number, reader, writer):
+            await reader.read()
+
+        # Accepts the TCP connection but never answers the upgrade.
+        server = _ThreadedServer(on_connection, handshake=False)
+        self.addCleanup(server.stop)
+        hubs = HubEngine()
+        handler = _RecordingHandler(reconnect=False)
+
+        with mock.patch.object(engine, 'CONNECT_TIMEOUT_SECONDS', 0.2):
+            started = time.monotonic()
+            self.assertTrue(hubs.open('asia', server.url, {}, handler))
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertFalse(hubs.send('asia', 'dropped while connecting'))
+            events = handler.wait_for(lambda events: ('reconnect',) in events)
+        self.assertEqual('error', events[0][0])
+        self.assertEqual([('close', None, False), ('reconnect',)], events[1:])
+        hubs.close('asia')
+
+    def test_queued_messages_are_sent_in_order(self):
+        received = []
+        done = threading.Event()
+
+        async def on_connection(number, reader, writer):
+            while len(received) < 3:
+                _, opcode, _, payload = await _read_client_frame(reader)
+                if opcode == OP_TEXT:
+                    received.append(payload.decode())
+            done.set()
+            await reader.read()
+
+        server = _ThreadedServer(on_connection)
+        self.addCleanup(server.stop)
+        hubs = HubEngine()
+        handler = _RecordingHandler()
+        hubs.open('eu', server.url, {}, handler)
+        self.addCleanup(hubs.close, 'eu')
+        handler.wait_for(lambda events: ('open',) in events)
+        for text in ('one', 'two', 'three'):
+            self.assertTrue(hubs.send('eu', text))
+        self.assertTrue(done.wait(5))
+        self.assertEqual(['one', 'two', 'three'], received)